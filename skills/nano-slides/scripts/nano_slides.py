@@ -2,13 +2,18 @@
 from __future__ import annotations
 
 import argparse
+import json
 import os
 import subprocess
 import sys
+import time
+import urllib.error
+import urllib.request
 from pathlib import Path
 
 
 DEFAULT_REPO = Path(os.environ.get("NANO_SLIDES_REPO", "/home/sl/github/nano-slides")).expanduser()
+DEFAULT_SERVICE = os.environ.get("NANO_SLIDES_SERVICE", "http://127.0.0.1:8765")
 
 
 def _repo_path(repo_arg: str | None) -> Path:
@@ -39,15 +44,19 @@ def _uv_run(repo: Path, argv: list[str]) -> int:
     return subprocess.call(cmd)
 
 
-def _latest_run_dir(repo: Path) -> Path | None:
-    base = repo / "generated_slides"
-    if not base.exists():
-        return None
-    candidates = [p for p in base.rglob("slide_*_0.*")]
-    if not candidates:
+def _catalog(repo: Path):
+    # tools/run_catalog.py only needs the standard library, so it is imported rather than run under uv.
+    sys.path.insert(0, str(repo / "tools"))
+    import run_catalog
+
+    return run_catalog, run_catalog.RunCatalog(repo / "generated_slides")
+
+
+def _latest_run_dir(repo: Path, backend: str | None = None, tier: str | None = None) -> Path | None:
+    if not (repo / "generated_slides").exists():
         return None
-    latest_file = max(candidates, key=lambda p: p.stat().st_mtime)
-    return latest_file.parent
+    _, catalog = _catalog(repo)
+    return catalog.latest(backend=backend, tier=tier)
 
 
 def cmd_generate(args: argparse.Namespace) -> int:
@@ -64,6 +73,8 @@ def cmd_generate(args: argparse.Namespace) -> int:
         argv += ["--mode", args.mode]
     if args.slides:
         argv += ["--slides", *[str(x) for x in args.slides]]
+    if args.preview:
+        argv += ["--preview"]
 
     rc = _uv_run(repo, argv)
     run_dir = _latest_run_dir(repo)
@@ -79,9 +90,9 @@ def cmd_enlarge(args: argparse.Namespace) -> int:
 
     run_dir = args.run_dir
     if args.latest:
-        latest = _latest_run_dir(repo)
+        latest = _latest_run_dir(repo, backend="gemini", tier="full")
         if not latest:
-            print("No generated slides found under generated_slides/", file=sys.stderr)
+            print("No full-quality runs found under generated_slides/", file=sys.stderr)
             return 1
         run_dir = str(latest)
 
@@ -93,10 +104,10 @@ def cmd_enlarge(args: argparse.Namespace) -> int:
     return _uv_run(repo, argv)
 
 
-def cmd_export_pptx(args: argparse.Namespace) -> int:
+def cmd_promote(args: argparse.Namespace) -> int:
     repo = _repo_path(args.repo)
     _require_repo(repo)
-    script = repo / "tools" / "export_pptx.py"
+    script = repo / "tools" / "generate_slides.py"
 
     run_dir = args.run_dir
     if args.latest:
@@ -105,6 +116,30 @@ def cmd_export_pptx(args: argparse.Namespace) -> int:
             print("No generated slides found under generated_slides/", file=sys.stderr)
             return 1
         run_dir = str(latest)
+    if not run_dir:
+        print("Pass --run-dir or --latest.", file=sys.stderr)
+        return 1
+
+    argv = ["python", str(script), "--promote", run_dir]
+    if args.size:
+        argv += ["--promote-size", args.size]
+    if args.slides:
+        argv += ["--slides", *[str(x) for x in args.slides]]
+    return _uv_run(repo, argv)
+
+
+def cmd_export_pptx(args: argparse.Namespace) -> int:
+    repo = _repo_path(args.repo)
+    _require_repo(repo)
+    script = repo / "tools" / "export_pptx.py"
+
+    run_dir = args.run_dir
+    if args.latest:
+        latest = _latest_run_dir(repo, backend="gemini", tier="full")
+        if not latest:
+            print("No full-quality runs found under generated_slides/", file=sys.stderr)
+            return 1
+        run_dir = str(latest)
     if not run_dir:
         print("export-pptx requires --run-dir or --latest", file=sys.stderr)
         return 2
@@ -127,6 +162,78 @@ def cmd_make_style(args: argparse.Namespace) -> int:
     argv = ["python", str(script), "--name", args.name, "--description", args.description]
     return _uv_run(repo, argv)
 
+
+def _service_request(url: str, path: str, payload: dict | None = None) -> dict:
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = urllib.request.Request(url.rstrip("/") + path, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            return json.loads(resp.read())
+    except urllib.error.HTTPError as e:
+        detail = json.loads(e.read() or b"{}").get("error", e.reason)
+        raise SystemExit(f"Render service error ({e.code}): {detail}")
+    except urllib.error.URLError as e:
+        raise SystemExit(f"Render service not reachable at {url} ({e.reason}); start it with: nano_slides.py serve")
+
+
+def _print_job(job: dict) -> None:
+    counts = ", ".join(f"{n} {status}" for status, n in sorted(job.get("counts", {}).items()))
+    print(f"Job {job['id']}: {job['status']} ({counts})")
+    print(f"Run dir: {job['output_dir']}")
+    if job.get("error"):
+        print(f"Error: {job['error']}")
+
+
+def _wait_for_job(url: str, job_id: str, interval: float) -> int:
+    last = None
+    while True:
+        job = _service_request(url, f"/jobs/{job_id}")
+        state = (job["status"], tuple(sorted(job.get("counts", {}).items())))
+        if state != last:
+            _print_job(job)
+            last = state
+        if job["status"] not in ("queued", "running"):
+            return 0 if job["status"] == "done" else 1
+        time.sleep(interval)
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    repo = _repo_path(args.repo)
+    _require_repo(repo)
+    script = repo / "tools" / "render_service.py"
+
+    argv = ["python", str(script), "--port", str(args.port)]
+    if args.rpm:
+        argv += ["--rpm", str(args.rpm)]
+    if args.concurrency:
+        argv += ["--concurrency", str(args.concurrency)]
+    return _uv_run(repo, argv)
+
+
+def cmd_submit(args: argparse.Namespace) -> int:
+    payload = {"yaml": str(Path(args.yaml).expanduser().resolve()), "style": args.style, "mode": args.mode, "slides": args.slides}
+    job = _service_request(args.service, "/jobs", payload)
+    if job.get("deduplicated"):
+        print("An identical job is already queued or running; attaching to it.")
+    _print_job(job)
+    if args.wait:
+        return _wait_for_job(args.service, job["id"], args.interval)
+    return 0
+
+
+def cmd_job(args: argparse.Namespace) -> int:
+    if args.wait:
+        return _wait_for_job(args.service, args.job_id, args.interval)
+    job = _service_request(args.service, f"/jobs/{args.job_id}")
+    _print_job(job)
+    for slide in job.get("slides", []):
+        line = f"  slide {slide['number']:>3}: {slide['status']}"
+        if slide.get("error"):
+            line += f" ({slide['error']})"
+        print(line)
+    return 0
+
+
 def cmd_latest(args: argparse.Namespace) -> int:
     repo = _repo_path(args.repo)
     _require_repo(repo)
@@ -144,12 +251,49 @@ def cmd_latest(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_runs(args: argparse.Namespace) -> int:
+    repo = _repo_path(args.repo)
+    _require_repo(repo)
+    run_catalog, catalog = _catalog(repo)
+    if args.runs_cmd == "list":
+        runs = catalog.runs(args.outline)
+        for entry in runs[-args.limit:] if args.limit else runs:
+            print(run_catalog.format_run(entry))
+        return 0
+    entry = catalog.show(args.run)
+    if entry is None:
+        print(f"No run {args.run} in the catalog.", file=sys.stderr)
+        return 1
+    print(json.dumps(dict(entry, path=str(catalog.run_dir(entry["run"]))), indent=2))
+    return 0
+
+
+def cmd_gc(args: argparse.Namespace) -> int:
+    repo = _repo_path(args.repo)
+    _require_repo(repo)
+    script = repo / "tools" / "run_gc.py"
+
+    argv = ["python", str(script), "--keep-last", str(args.keep_last)]
+    if args.no_keep_exported:
+        argv += ["--no-keep-exported"]
+    if args.dedupe:
+        argv += ["--dedupe"]
+    if args.dry_run:
+        argv += ["--dry-run"]
+    return _uv_run(repo, argv)
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         prog="nano_slides.py",
         description="Thin wrapper around /home/sl/github/nano-slides tools (generation, 4K upscaling, PPTX export).",
     )
     parser.add_argument("--repo", default=None, help="Path to nano-slides repo (default: $NANO_SLIDES_REPO or /home/sl/github/nano-slides)")
+    parser.add_argument(
+        "--service",
+        default=DEFAULT_SERVICE,
+        help="Render service URL for submit/job (default: $NANO_SLIDES_SERVICE or http://127.0.0.1:8765)",
+    )
 
     sub = parser.add_subparsers(dest="cmd", required=True)
 
@@ -158,6 +302,7 @@ def main() -> int:
     p_gen.add_argument("--style", default=None, help="Style pack name under styles/ or path to a style .md.")
     p_gen.add_argument("--mode", choices=["structured", "balanced", "expressive"], default=None)
     p_gen.add_argument("--slides", type=int, nargs="+", default=None)
+    p_gen.add_argument("--preview", action="store_true", help="Render with the fast, cheap preview model for early review.")
     p_gen.set_defaults(func=cmd_generate)
 
     p_enl = sub.add_parser("enlarge", help="Upscale slides to 4K for a run directory.")
@@ -166,6 +311,13 @@ def main() -> int:
     p_enl.add_argument("--slides", type=int, nargs="+", default=None)
     p_enl.set_defaults(func=cmd_enlarge)
 
+    p_prom = sub.add_parser("promote", help="Re-render selected slides of a preview run at full quality.")
+    p_prom.add_argument("--run-dir", default=None, help="Run directory path (or subdir under generated_slides/).")
+    p_prom.add_argument("--latest", action="store_true", help="Use the most recent run under generated_slides/.")
+    p_prom.add_argument("--size", choices=["1K", "2K", "4K"], default=None, help="Image size (default: 1K).")
+    p_prom.add_argument("--slides", type=int, nargs="+", default=None)
+    p_prom.set_defaults(func=cmd_promote)
+
     p_pptx = sub.add_parser("export-pptx", help="Export a run directory to an image-only PPTX.")
     p_pptx.add_argument("--run-dir", default=None, help="Run directory path (or subdir under generated_slides/).")
     p_pptx.add_argument("--latest", action="store_true", help="Use the most recent run under generated_slides/.")
@@ -179,9 +331,46 @@ def main() -> int:
     p_style.add_argument("--description", required=True, help="One-line description of the style.")
     p_style.set_defaults(func=cmd_make_style)
 
+    p_serve = sub.add_parser("serve", help="Run the long-lived render service (jobs persist across restarts).")
+    p_serve.add_argument("--port", type=int, default=8765)
+    p_serve.add_argument("--rpm", type=float, default=None, help="Requests-per-minute quota shared by all jobs.")
+    p_serve.add_argument("--concurrency", type=int, default=None)
+    p_serve.set_defaults(func=cmd_serve)
+
+    p_submit = sub.add_parser("submit", help="Queue a generation job on the render service.")
+    p_submit.add_argument("--yaml", required=True, help="Path to YAML outline file.")
+    p_submit.add_argument("--style", default=None, help="Style pack name under styles/ or path to a style .md.")
+    p_submit.add_argument("--mode", choices=["structured", "balanced", "expressive"], default=None)
+    p_submit.add_argument("--slides", type=int, nargs="+", default=None)
+    p_submit.add_argument("--wait", action="store_true", help="Poll until the job finishes.")
+    p_submit.add_argument("--interval", type=float, default=2.0, help="Seconds between polls with --wait.")
+    p_submit.set_defaults(func=cmd_submit)
+
+    p_job = sub.add_parser("job", help="Show (or wait for) a render service job.")
+    p_job.add_argument("job_id")
+    p_job.add_argument("--wait", action="store_true", help="Poll until the job finishes.")
+    p_job.add_argument("--interval", type=float, default=2.0, help="Seconds between polls with --wait.")
+    p_job.set_defaults(func=cmd_job)
+
     p_latest = sub.add_parser("latest", help="Print the most recent run directory (and common artefacts if present).")
     p_latest.set_defaults(func=cmd_latest)
 
+    p_runs = sub.add_parser("runs", help="List runs, or show one, from the run catalog.")
+    runs_sub = p_runs.add_subparsers(dest="runs_cmd", required=True)
+    p_runs_list = runs_sub.add_parser("list", help="List runs, newest last.")
+    p_runs_list.add_argument("--outline", default=None, help="Only runs of the outline with this yaml stem.")
+    p_runs_list.add_argument("-n", "--limit", type=int, default=20, help="Show at most this many runs (default: 20; 0 for all).")
+    p_runs_show = runs_sub.add_parser("show", help="Show one run's catalog entry.")
+    p_runs_show.add_argument("run", help="Run id (<yaml-stem>/<timestamp>) or run directory.")
+    p_runs.set_defaults(func=cmd_runs)
+
+    p_gc = sub.add_parser("gc", help="Delete old runs (keeping recent and exported ones) and unused blobs.")
+    p_gc.add_argument("--keep-last", type=int, default=5, help="Runs to keep per outline (default: 5).")
+    p_gc.add_argument("--no-keep-exported", action="store_true", help="Also delete old runs that were exported to PPTX.")
+    p_gc.add_argument("--dedupe", action="store_true", help="Add kept runs to the blob store first.")
+    p_gc.add_argument("--dry-run", action="store_true", help="Report what would be deleted without deleting anything.")
+    p_gc.set_defaults(func=cmd_gc)
+
     args = parser.parse_args()
     return int(args.func(args))
 
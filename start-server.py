@@ -5,21 +5,35 @@ HTTP server with live reload for running HTML slides
 
 import webbrowser
 import os
+import sys
 import argparse
-from livereload import Server
+from livereload.handlers import LiveReloadHandler
 
-def start_server(port=8080):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools"))
+
+from preview_assets import PreviewServer  # noqa: E402
+from run_watch import DEBOUNCE, RunWatcher  # noqa: E402
+
+def start_server(port=8080, run_dir=None, outline=None, debounce=DEBOUNCE, poll=False):
     """Start HTTP server with live reload"""
-    # Create livereload server (it includes HTTP server functionality)
-    server = Server()
+    # Only the active run is watched (inotify where available), so idle cost does not grow with past runs
+    watcher = RunWatcher(debounce=debounce, use_inotify=not poll)
+    # Images can be fetched resized or as WebP (?w=640, ?format=webp), with ETags and gzip
+    server = PreviewServer(watcher=watcher)
+    # The watcher already debounces bursts of writes into one reload
+    LiveReloadHandler.DEFAULT_RELOAD_TIME = 0
     
     # Watch for changes in HTML, CSS, JS files
     server.watch('*.html')
     server.watch('*.css')
     server.watch('js/**/*.js')
     server.watch('js/**/*.json')
-    server.watch('generated_slides/**/*')
     server.watch('css/**/*.css')
+    if outline:
+        server.watch(outline)
+    if run_dir and not os.path.isabs(run_dir) and not os.path.isdir(run_dir):
+        run_dir = os.path.join('generated_slides', run_dir)
+    watcher.watch_runs('generated_slides', run_dir)
     
     print(f"Server starting at http://localhost:{port}")
     print("Live reload enabled - files will auto-reload when changed")
@@ -34,12 +48,28 @@ def start_server(port=8080):
     except KeyboardInterrupt:
         print("\nServer stopped")
 
+def default_outline():
+    """Outline to watch: deck.yaml yaml > slides.yaml > sample outline (as generate_slides.py resolves it)"""
+    try:
+        import yaml
+        with open("deck.yaml", encoding="utf-8") as f:
+            outline = (yaml.safe_load(f) or {}).get("yaml")
+        if outline:
+            return outline
+    except Exception:
+        pass
+    return "slides.yaml" if os.path.exists("slides.yaml") else os.path.join("outlines", "sample_slides.yaml")
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Start HTML slide server with live reload")
     parser.add_argument("-p", "--port", type=int, default=8080, help="Server port (default: 8080)")
+    parser.add_argument("--run-dir", default=None, help="Run directory to watch, may be relative to generated_slides/ (default: the latest run, following new runs)")
+    parser.add_argument("--yaml", default=None, help="Outline file to watch (default: as in deck.yaml)")
+    parser.add_argument("--debounce", type=float, default=DEBOUNCE, help=f"Seconds of quiet before a reload is sent (default: {DEBOUNCE})")
+    parser.add_argument("--poll", action="store_true", help="Poll for changes instead of using inotify")
     args = parser.parse_args()
     
     # Get current script directory
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
     
-    start_server(args.port) 
+    start_server(args.port, args.run_dir, args.yaml or default_outline(), args.debounce, args.poll)
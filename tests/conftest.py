@@ -0,0 +1,107 @@
+"""
+A scratch copy of the project for end-to-end runs of tools/generate_slides.py.
+
+The tools write under <project>/generated_slides/ (runs, catalog, caches), so each
+test gets its own copy of tools/ and styles/ in tmp_path, with a small style reference
+image and an outline. Runs go through a subprocess whose genai client is
+fake_genai.FakeClient: no API key or network is needed.
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Guarded: draft_render's worker processes import the main module again.
+RUNNER = """\
+import os, runpy, sys
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "tools"))
+    import fake_genai, genai_client
+    genai_client.configure(factory=lambda: fake_genai.FakeClient(latency=0))
+    sys.argv = sys.argv[1:]
+    runpy.run_path(sys.argv[0], run_name="__main__")
+"""
+
+OUTLINE = """\
+slide: 1
+title: Opening
+visual: A lighthouse at dawn
+---
+slide: 2
+title: Problem
+visual: A ship in fog
+---
+slide: 3
+title: Approach
+visual: A chart of beams
+---
+slide: 4
+title: Closing
+visual: Calm harbour at night
+"""
+
+FINISHED = re.compile(r"^Finished Slide (\d+)(?: \((cached|draft)\))?$", re.MULTILINE)
+
+
+class Project:
+    def __init__(self, root: Path):
+        self.root = root
+        self.outline = root / "talk.yaml"
+        self.style_ref = root / "imgs" / "style_ref_modern_academic_0.jpg"
+        self._last_end = 0
+
+    @property
+    def runs_dir(self) -> Path:
+        return self.root / "generated_slides" / "talk"
+
+    def runs(self) -> list:
+        return sorted(p for p in self.runs_dir.iterdir() if p.is_dir()) if self.runs_dir.is_dir() else []
+
+    def generate(self, *args) -> str:
+        """Run generate_slides.py on the outline with args; returns its stdout."""
+        # Run directories are named to the second: start after the one the last run ended in.
+        while int(time.time()) == self._last_end:
+            time.sleep(0.05)
+        env = dict(os.environ, GEMINI_API_KEY="test")
+        env.pop("GOOGLE_API_KEY", None)
+        command = ["tools/generate_slides.py", "--yaml", str(self.outline), "--style", "modern_academic", "--no-cache"]
+        proc = subprocess.run(
+            [sys.executable, "run_fake.py", *command, *args],
+            cwd=self.root,
+            env=env,
+            capture_output=True,
+            text=True,
+            timeout=120,
+        )
+        self._last_end = int(time.time())
+        assert proc.returncode == 0, proc.stdout + proc.stderr
+        return proc.stdout
+
+
+def rendered(output: str) -> set:
+    """Slide numbers a run rendered (not served from the render cache)."""
+    return {int(num) for num, how in FINISHED.findall(output) if how != "cached"}
+
+
+@pytest.fixture
+def project(tmp_path):
+    pytest.importorskip("google.genai")
+    pytest.importorskip("dotenv")
+    from PIL import Image
+
+    for name in ("tools", "styles"):
+        shutil.copytree(ROOT / name, tmp_path / name, ignore=shutil.ignore_patterns("__pycache__"))
+    (tmp_path / "run_fake.py").write_text(RUNNER, encoding="utf-8")
+    project = Project(tmp_path)
+    project.style_ref.parent.mkdir()
+    Image.new("RGB", (32, 18), "navy").save(project.style_ref)
+    project.outline.write_text(OUTLINE, encoding="utf-8")
+    return project
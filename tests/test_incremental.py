@@ -0,0 +1,40 @@
+"""--incremental end to end with a fake client: only changed slides are rendered again."""
+
+from conftest import rendered
+
+
+def test_only_the_edited_slide_is_regenerated(project):
+    # The fake client returns the same image every time: keep the blob store from linking them all.
+    assert rendered(project.generate("--no-dedupe")) == {1, 2, 3, 4}
+
+    project.outline.write_text(project.outline.read_text().replace("A ship in fog", "A ship in a storm"))
+    output = project.generate("--incremental", "--no-dedupe")
+
+    assert rendered(output) == {2}
+    first, second = project.runs()
+    for num in (1, 3, 4):
+        # Reused slides are linked from the previous run, not re-rendered.
+        assert (second / f"slide_{num:02d}_0.jpg").samefile(first / f"slide_{num:02d}_0.jpg")
+    assert not (second / "slide_02_0.jpg").samefile(first / "slide_02_0.jpg")
+
+
+def test_changed_style_reference_regenerates_every_slide(project):
+    from PIL import Image
+
+    project.generate()
+    Image.new("RGB", (32, 18), "maroon").save(project.style_ref)
+    assert rendered(project.generate("--incremental")) == {1, 2, 3, 4}
+
+
+def test_tier_change_invalidates_reuse(project):
+    project.generate()
+    # A preview run never reuses full-quality renders...
+    assert rendered(project.generate("--preview", "--incremental")) == {1, 2, 3, 4}
+    # ...and a full run skips over the preview run to the last full one.
+    assert rendered(project.generate("--incremental")) == set()
+
+
+def test_backend_change_invalidates_reuse(project):
+    assert "Finished Slide 1 (draft)" in project.generate("--backend", "draft")
+    # Draft wireframes are never reused for a Gemini run.
+    assert rendered(project.generate("--incremental")) == {1, 2, 3, 4}
@@ -0,0 +1,90 @@
+"""Round trip of the streamed PPTX writer through python-pptx, and against the in-memory exporter."""
+
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pptx")
+from PIL import Image  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+# As when the tools are run as scripts: tools/ for their sibling imports, the root for `tools.`.
+for path in (ROOT, ROOT / "tools"):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from tools.pptx_stream import verify_pptx, write_pptx_streaming  # noqa: E402
+
+NOTES = {1: "Opening & welcome", 3: "Line one\nLine two <with> markup", 5: "Closing"}
+
+
+@pytest.fixture
+def slide_files(tmp_path):
+    """Five slides (numbers 1-5, one skipped), PNG and JPEG, with slide 4 repeating slide 1's image."""
+    files = {}
+    for num, (color, ext) in {1: ("red", "png"), 2: ("green", "jpg"), 3: ("blue", "png"), 5: ("white", "jpg")}.items():
+        path = tmp_path / f"slide_{num:02d}.{ext}"
+        Image.new("RGB", (64, 36), color).save(path)
+        files[num] = path
+    duplicate = tmp_path / "slide_04.png"
+    duplicate.write_bytes(files[1].read_bytes())
+    files[4] = duplicate
+    return files
+
+
+def _media(path):
+    with zipfile.ZipFile(path) as zf:
+        return sorted(name for name in zf.namelist() if name.startswith("ppt/media/"))
+
+
+def test_streamed_deck_round_trips(tmp_path, slide_files):
+    from pptx import Presentation
+
+    output = tmp_path / "deck.pptx"
+    stats = write_pptx_streaming(slide_files, output, NOTES)
+
+    assert stats == {"slides": 5, "media": 4, "shared_media": 1}
+    assert _media(output) == ["ppt/media/image1.png", "ppt/media/image2.jpg", "ppt/media/image3.png", "ppt/media/image4.jpg"]
+    assert not output.with_name(output.name + ".tmp").exists()
+
+    prs = Presentation(str(output))
+    assert len(prs.slides) == 5
+    for num, slide in zip(sorted(slide_files), prs.slides):
+        (picture,) = [shape for shape in slide.shapes if shape.shape_type == 13]
+        assert picture.image.blob == slide_files[num].read_bytes()
+        assert (picture.left, picture.top, picture.width, picture.height) == (0, 0, prs.slide_width, prs.slide_height)
+        assert slide.has_notes_slide == (num in NOTES)
+        if num in NOTES:
+            assert slide.notes_slide.notes_text_frame.text == NOTES[num]
+    assert verify_pptx(output, slide_files, NOTES) == []
+
+
+def test_verify_reports_mismatches(tmp_path, slide_files):
+    output = tmp_path / "deck.pptx"
+    write_pptx_streaming(slide_files, output, NOTES)
+    swapped = {**slide_files, 2: slide_files[3], 3: slide_files[2]}
+
+    problems = verify_pptx(output, swapped, {**NOTES, 5: "Other"})
+    assert problems == [
+        f"slide 2: picture bytes differ from {slide_files[3]}",
+        f"slide 3: picture bytes differ from {slide_files[2]}",
+        "slide 5: notes differ",
+    ]
+
+
+def test_streamed_deck_matches_in_memory_export(tmp_path, slide_files):
+    export_pptx = pytest.importorskip("tools.export_pptx")
+
+    streamed = tmp_path / "streamed.pptx"
+    in_memory = tmp_path / "in_memory.pptx"
+    write_pptx_streaming(slide_files, streamed, NOTES)
+    export_pptx._export_in_memory(slide_files, in_memory, NOTES)
+
+    with zipfile.ZipFile(streamed) as a, zipfile.ZipFile(in_memory) as b:
+        assert sorted(a.namelist()) == sorted(b.namelist())
+        for name in a.namelist():
+            # Only the package's creation/modification times may differ.
+            if name != "docProps/core.xml":
+                assert a.read(name) == b.read(name), name
@@ -0,0 +1,45 @@
+"""--resume end to end with a fake client, from a journal cut off part-way through a run."""
+
+import json
+
+import pytest
+
+from conftest import rendered
+
+
+def _kill_mid_run(run_dir, finished):
+    """Leave run_dir as if the process died while journaling the slide after `finished`."""
+    journal = run_dir / "journal.jsonl"
+    lines = journal.read_text().splitlines(keepends=True)
+    records = [json.loads(line) for line in lines]
+    kept = [line for line, r in zip(lines, records) if r["event"] == "run" or r.get("number") in finished]
+    (cut,) = [line for line, r in zip(lines, records) if r["event"] == "slide" and r["number"] not in finished]
+    journal.write_text("".join(kept) + cut[: len(cut) // 2])
+    (run_dir / "manifest.json").unlink()
+    return {r["number"]: r for r in records if r["event"] == "slide"}
+
+
+@pytest.mark.parametrize("backend", ["gemini", "draft"])
+def test_resume_renders_only_unfinished_slides(project, backend):
+    assert rendered(project.generate("--backend", backend)) == {1, 2, 3, 4}
+    (run_dir,) = project.runs()
+    journaled = _kill_mid_run(run_dir, finished={1, 2, 3})
+
+    # Slide 2 was journaled but its image is damaged; slide 3 was edited since.
+    image = run_dir / journaled[2]["files"][0]
+    damaged = image.read_bytes()[:100]
+    image.unlink()  # a new file: the old one is hard-linked into the blob store
+    image.write_bytes(damaged)
+    project.outline.write_text(project.outline.read_text().replace("A chart of beams", "A chart of tides"))
+
+    # The backend comes from the journal, not the command line.
+    output = project.generate("--resume", str(run_dir))
+
+    assert rendered(output) == {2, 3, 4}
+    assert ("(draft)" in output) == (backend == "draft")
+    assert project.runs() == [run_dir]
+    manifest = json.loads((run_dir / "manifest.json").read_text())
+    assert sorted(manifest["slides"]) == ["1", "2", "3", "4"]
+
+    # Now complete: a second resume has nothing left to render.
+    assert rendered(project.generate("--resume", str(run_dir))) == set()
@@ -0,0 +1,107 @@
+"""run_gc retention and space accounting over a small catalog of runs sharing blobs."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+# As when the tools are run as scripts: tools/ for their sibling imports, the root for `tools.`.
+for path in (ROOT, ROOT / "tools"):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from blob_store import BlobStore  # noqa: E402
+from run_catalog import RunCatalog  # noqa: E402
+from run_gc import collect, plan  # noqa: E402
+
+SHARED = b"shared slide " * 1000
+RUNS = ["20250101_000001", "20250101_000002", "20250101_000003", "20250101_000004"]
+
+
+@pytest.fixture
+def base(tmp_path):
+    """
+    Four runs of one outline, oldest first: exported, plain, still running (this
+    process), newest. The exported and the plain run share slide 1's blob.
+    """
+    base = tmp_path / "generated_slides"
+    catalog = RunCatalog(base)
+    store = BlobStore(base)
+    for i, name in enumerate(RUNS):
+        run_dir = base / "talk" / name
+        run_dir.mkdir(parents=True)
+        catalog.started(run_dir, tmp_path / "talk.yaml", "modern_academic", "balanced")
+        (run_dir / "slide_01_0.jpg").write_bytes(SHARED if i < 2 else f"slide 1 of run {i}".encode() * 500)
+        (run_dir / "slide_02_0.jpg").write_bytes(f"slide 2 of run {i}".encode() * 700)
+        (run_dir / "journal.jsonl").write_text("{}\n" * (i + 1))
+        store.ingest_run(run_dir)
+        if i != 2:
+            catalog.finished(run_dir, slides=2, generated=2, failed=0)
+    catalog.exported(base / "talk" / RUNS[0], tmp_path / "pptx" / f"{RUNS[0]}.pptx")
+    return base
+
+
+def _disk_bytes(base):
+    """Bytes held by runs and blobs, counting each inode once."""
+    seen = {}
+    for directory, _, files in os.walk(base):
+        if ".catalog" in Path(directory).parts:
+            continue
+        for name in files:
+            st = os.lstat(os.path.join(directory, name))
+            seen[(st.st_dev, st.st_ino)] = st.st_size
+    return sum(seen.values())
+
+
+def _snapshot(base):
+    return sorted((p.relative_to(base), p.stat().st_nlink) for p in base.rglob("*") if p.is_file())
+
+
+def test_plan_keeps_recent_running_and_exported_runs(base):
+    keep, drop = plan(RunCatalog(base), keep_last=1)
+    assert {entry["run"]: reason for entry, reason in keep} == {
+        f"talk/{RUNS[3]}": "recent",
+        f"talk/{RUNS[2]}": "running",
+        f"talk/{RUNS[0]}": "exported",
+    }
+    assert [entry["run"] for entry in drop] == [f"talk/{RUNS[1]}"]
+
+    _, drop = plan(RunCatalog(base), keep_last=1, keep_exported=False)
+    assert sorted(entry["run"] for entry in drop) == [f"talk/{RUNS[0]}", f"talk/{RUNS[1]}"]
+
+
+@pytest.mark.parametrize("keep_exported", [True, False])
+def test_dry_run_predicts_what_collect_frees(base, keep_exported):
+    catalog = RunCatalog(base)
+    store = BlobStore(base)
+    _, drop = plan(catalog, keep_last=1, keep_exported=keep_exported)
+
+    before = _snapshot(base)
+    predicted = collect(catalog, store, drop, dry_run=True)
+    assert _snapshot(base) == before
+
+    used = _disk_bytes(base)
+    actual = collect(catalog, store, drop)
+    assert used - _disk_bytes(base) == actual["reclaimed"] == predicted["reclaimed"] > 0
+    for key in ("runs", "files", "blobs"):
+        assert actual[key] == predicted[key], key
+
+    # The shared slide is freed only once neither run that uses it is left.
+    assert any(st.st_size == len(SHARED) for _, st in store.blobs()) == keep_exported
+
+
+def test_collect_leaves_kept_runs_intact(base):
+    catalog = RunCatalog(base)
+    keep, drop = plan(catalog, keep_last=1)
+    kept = {entry["run"]: sorted(p.read_bytes() for p in catalog.run_dir(entry["run"]).iterdir()) for entry, _ in keep}
+
+    collect(catalog, BlobStore(base), drop)
+
+    assert not (base / "talk" / RUNS[1]).exists()
+    for run, contents in kept.items():
+        assert sorted(p.read_bytes() for p in catalog.run_dir(run).iterdir()) == contents
+    assert [entry["run"] for entry in catalog.runs()] == [f"talk/{name}" for name in (RUNS[0], RUNS[2], RUNS[3])]
+    # Every blob left is still used by a kept run.
+    assert all(st.st_nlink > 1 for _, st in BlobStore(base).blobs())
@@ -0,0 +1,125 @@
+"""Error classification, the AIMD decrease, async slot hand-off and fair queueing of tools/scheduler.py."""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+# As when the tools are run as scripts: tools/ for their sibling imports, the root for `tools.`.
+for path in (ROOT, ROOT / "tools"):
+    if str(path) not in sys.path:
+        sys.path.append(str(path))
+
+from tools.scheduler import FairQueue, Scheduler, classify_error  # noqa: E402
+
+
+class APIError(Exception):
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+
+@pytest.mark.parametrize(
+    "exc, kind",
+    [
+        (Exception("status 429"), "throttle"),
+        (Exception("HTTP 503 from upstream"), "throttle"),
+        (Exception("429 RESOURCE_EXHAUSTED: quota exceeded"), "throttle"),
+        (Exception("Too Many Requests"), "throttle"),
+        (APIError("busy", code=429), "throttle"),
+        (APIError("bad gateway", code=502), "transient"),
+        (ConnectionError("connection reset"), "transient"),
+        # Bare numbers are slide numbers, sizes or ids, not status codes.
+        (Exception("slide 429 failed: prompt was blocked"), "fatal"),
+        (Exception("image of 5030 bytes is not a PNG"), "fatal"),
+        (Exception("request id 4291 rejected"), "fatal"),
+        (APIError("invalid argument", code=400), "fatal"),
+    ],
+)
+def test_classify_error(exc, kind):
+    assert classify_error(exc) == kind
+
+
+def _throttled():
+    raise Exception("status 429")
+
+
+def test_limit_decreases_once_per_burst():
+    log = []
+    scheduler = Scheduler(initial_concurrency=8, max_retries=0, base_backoff=0.05, log=log.append)
+
+    # Requests already in flight all come back throttled: one congestion signal.
+    for _ in range(4):
+        with pytest.raises(Exception, match="429"):
+            scheduler.call(_throttled)
+    assert scheduler.throttled == 4
+    assert scheduler.failures == 4
+    assert scheduler._current_limit() == 4
+    assert sum("decrease concurrency" in line for line in log) == 1
+
+    # A throttle after the burst window is a new signal.
+    time.sleep(0.1)
+    with pytest.raises(Exception, match="429"):
+        scheduler.call(_throttled)
+    assert scheduler._current_limit() == 2
+
+
+def test_granted_then_cancelled_waiter_releases_its_slot():
+    scheduler = Scheduler(initial_concurrency=1, max_concurrency=1, log=lambda message: None)
+
+    async def scenario():
+        await scheduler._acquire_async()
+        waiter = asyncio.create_task(scheduler._acquire_async())
+        await asyncio.sleep(0)
+        assert len(scheduler._waiters) == 1
+
+        # The slot is granted to the waiter, which is cancelled before it wakes up.
+        scheduler._release()
+        assert scheduler.in_flight == 1 and not scheduler._waiters
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert scheduler.in_flight == 0
+
+        # The slot is free for the next caller rather than leaked.
+        await asyncio.wait_for(scheduler._acquire_async(), timeout=1)
+        assert scheduler.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    scheduler = Scheduler(initial_concurrency=1, max_concurrency=1, log=lambda message: None)
+
+    async def scenario():
+        await scheduler._acquire_async()
+        waiter = asyncio.create_task(scheduler._acquire_async())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert not scheduler._waiters
+        assert scheduler.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def test_fair_queue_round_robin():
+    queue = FairQueue()
+    for key, item in [("a", 1), ("a", 2), ("a", 3), ("b", 1), ("c", 1), ("c", 2)]:
+        queue.put(key, item)
+    assert len(queue) == 6
+
+    order = []
+    while (job := queue.get()) is not None:
+        order.append(job)
+    assert order == [("a", 1), ("b", 1), ("c", 1), ("a", 2), ("c", 2), ("a", 3)]
+    assert len(queue) == 0
+
+    # A source that ran dry rejoins at the back.
+    queue.put("b", 2)
+    queue.put("a", 4)
+    assert [queue.get(), queue.get(), queue.get()] == [("b", 2), ("a", 4), None]
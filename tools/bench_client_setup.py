@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of per-request client setup overhead.
+
+Starts a local keep-alive HTTP stub that answers generateContent calls, then
+times N requests with (a) a fresh genai.Client per request, as the generators
+used to do, and (b) the shared client from genai_client.get_client(). Reports
+mean latency per request and how many TCP connections the stub accepted.
+
+Example:
+  python tools/bench_client_setup.py --requests 200
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import genai_client
+
+RESPONSE = json.dumps({"candidates": [{"content": {"role": "model", "parts": [{"text": "ok"}]}}]}).encode("utf-8")
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(RESPONSE)))
+        self.end_headers()
+        self.wfile.write(RESPONSE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _time_requests(n: int, fresh_client: bool) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        if fresh_client:
+            genai_client.reset_client()
+        client = genai_client.get_client()
+        client.models.generate_content(model="gemini-3-pro-image-preview", contents="ping")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-request genai client setup overhead against a local stub")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per variant (default: 200)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    genai_client.configure(base_url=f"http://127.0.0.1:{server.server_address[1]}/")
+
+    print(f"{'variant':<16} {'requests':>8} {'ms/request':>11} {'connections':>12}")
+    for name, fresh in (("client-per-call", True), ("shared-client", False)):
+        genai_client.reset_client()
+        _StubHandler.connections = 0
+        elapsed = _time_requests(args.requests, fresh)
+        print(f"{name:<16} {args.requests:>8} {1000 * elapsed / args.requests:>11.2f} {_StubHandler.connections:>12}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark the async and thread-pool generation engines against a local fake backend.
+
+Example:
+  python tools/bench_engines.py --slides 100 --latency 0.5 --concurrency 4 16 64
+"""
+
+import argparse
+import contextlib
+import io
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import fake_genai
+import genai_client
+import generate_slides
+
+
+def _synthetic_slides(count: int) -> list:
+    return [
+        {
+            "number": n,
+            "title": f"Benchmark slide {n}",
+            "subtitle": "",
+            "text": f"Key idea label: point {n}",
+            "text_raw": {},
+            "visual": "",
+            "notes": "",
+            "layout": "title_and_content",
+            "type": "content",
+            "style": None,
+            "asset_paths": [],
+            "style_refs": [],
+            "image_only": False,
+        }
+        for n in range(1, count + 1)
+    ]
+
+
+def run_engine(engine: str, slides: list, concurrency: int, latency: float) -> dict:
+    client = fake_genai.FakeClient(latency=latency)
+    genai_client.configure(factory=lambda: client)
+    project_root = Path(generate_slides.__file__).resolve().parent.parent
+
+    peak_threads = threading.active_count()
+    stop = threading.Event()
+
+    def sample_threads():
+        nonlocal peak_threads
+        while not stop.wait(0.01):
+            peak_threads = max(peak_threads, threading.active_count())
+
+    sampler = threading.Thread(target=sample_threads, daemon=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        sampler.start()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = generate_slides.ENGINES[engine](
+                slides, concurrency, "Benchmark style.", "benchmark", Path(tmp), project_root, "balanced", [], None
+            )
+        elapsed = time.perf_counter() - start
+        stop.set()
+        sampler.join()
+
+    ok = sum(1 for r in results if r["ok"])
+    return {
+        "engine": engine,
+        "concurrency": concurrency,
+        "slides": len(slides),
+        "ok": ok,
+        "seconds": elapsed,
+        "slides_per_sec": ok / elapsed if elapsed else 0.0,
+        # minus the sampler thread itself
+        "peak_threads": peak_threads - 1,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark slide generation engines with a fake backend")
+    parser.add_argument("--slides", type=int, default=100, help="Number of synthetic slides (default: 100)")
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake per-request latency in seconds (default: 0.5)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 16, 64], help="Concurrency levels to test")
+    parser.add_argument("--engines", nargs="+", default=sorted(generate_slides.ENGINES), choices=sorted(generate_slides.ENGINES))
+    args = parser.parse_args()
+
+    slides = _synthetic_slides(args.slides)
+    print(f"{'engine':<8} {'conc':>5} {'ok':>5} {'seconds':>8} {'slides/s':>9} {'threads':>8}")
+    for concurrency in args.concurrency:
+        for engine in args.engines:
+            r = run_engine(engine, slides, concurrency, args.latency)
+            print(
+                f"{r['engine']:<8} {r['concurrency']:>5} {r['ok']:>5} {r['seconds']:>8.2f} "
+                f"{r['slides_per_sec']:>9.1f} {r['peak_threads']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
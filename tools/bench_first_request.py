@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark time-to-first-request for large outlines.
+
+Compares parsing the whole outline before rendering (parse_slides, the previous
+behaviour) with feeding slides to the engine as they are parsed (iter_slides).
+The fake backend records when the first generation request arrives; later
+requests fail immediately so the run ends quickly. The parsed-outline cache is
+bypassed, so every run parses the YAML from scratch.
+
+Example:
+  python tools/bench_first_request.py --slides 1000 5000 20000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import bench_outline
+import fake_genai
+import genai_client
+import generate_slides
+
+
+class _FirstRequestClient(fake_genai.FakeClient):
+    """Fake client that records the first request time and rejects every request."""
+
+    def __init__(self):
+        super().__init__(latency=0)
+        self.first_request = None
+
+        def reject(*args, **kwargs):
+            if self.first_request is None:
+                self.first_request = time.perf_counter()
+            raise RuntimeError("benchmark: request rejected")
+
+        async def reject_async(*args, **kwargs):
+            reject()
+
+        self.models.generate_content_stream = reject
+        self.aio.models.generate_content_stream = reject_async
+
+
+def _slides(variant: str, outline: Path):
+    if variant == "eager":
+        return generate_slides.parse_slides(str(outline), use_cache=False)
+    return generate_slides.iter_slides(str(outline), use_cache=False)
+
+
+def run_variant(variant: str, engine: str, outline: Path, concurrency: int) -> dict:
+    client = _FirstRequestClient()
+    genai_client.configure(factory=lambda: client)
+    project_root = Path(generate_slides.__file__).resolve().parent.parent
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        results = generate_slides.ENGINES[engine](
+            _slides(variant, outline), concurrency, "Benchmark style.", "benchmark", Path(tmp), project_root, "balanced", [], None
+        )
+        elapsed = time.perf_counter() - start
+    return {
+        "variant": variant,
+        "engine": engine,
+        "slides": len(results),
+        "first_request_s": client.first_request - start,
+        "total_s": elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark time-to-first-request for large outlines")
+    parser.add_argument("--slides", type=int, nargs="+", default=[1000, 5000, 20000], help="Outline sizes to test")
+    parser.add_argument("--engine", default="async", choices=sorted(generate_slides.ENGINES))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    args = parser.parse_args()
+
+    if not args.json:
+        print(f"{'variant':<10} {'slides':>6} {'first request s':>16} {'total s':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.slides:
+            outline = Path(tmp) / f"outline_{count}.yaml"
+            bench_outline.make_outline(outline, count)
+            for variant in ("eager", "streaming"):
+                r = run_variant(variant, args.engine, outline, args.concurrency)
+                if args.json:
+                    print(json.dumps(r))
+                else:
+                    print(f"{r['variant']:<10} {r['slides']:>6} {r['first_request_s']:>16.4f} {r['total_s']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark outline parsing on a synthetic machine-generated outline.
+
+Variants (each timed in a fresh process so the in-memory cache is cold):
+  pure-python  yaml.SafeLoader and an eager 'content' dump per slide (previous behaviour)
+  csafe        libyaml CSafeLoader, 'content' built lazily, no cache
+  cached       parse_slides with a warm parsed-outline cache on disk
+  memo         second parse_slides call in the same process
+
+Example:
+  python tools/bench_outline.py --slides 5000
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+import generate_slides
+import outline_cache
+
+
+def make_outline(path: Path, count: int) -> None:
+    """Write a multi-document outline with count content slides of typical size."""
+    docs = []
+    for n in range(1, count + 1):
+        docs.append({
+            "slide": n,
+            "type": "content",
+            "layout": "two_content" if n % 2 else "title_and_content",
+            "title": f"Finding {n}: throughput under load",
+            "subtitle": "Measured on the staging cluster",
+            "text": {
+                "columns": [
+                    {"heading": "Before", "bullets": [f"p99 {n % 97 + 100} ms", "Single queue", "Manual retries"]},
+                    {"heading": "After", "bullets": [f"p99 {n % 53 + 20} ms", "Sharded queues", "Automatic backoff"]},
+                ]
+            },
+            "visual": "Two-column comparison; left shows a congested pipeline, right a balanced one.\n",
+            "assets": ["imgs/logo.png"],
+            "notes": f"Speaker notes for slide {n}. Mention the measurement window and the caveats.",
+        })
+    path.write_text(yaml.safe_dump_all(docs, sort_keys=False, explicit_start=True), encoding="utf-8")
+
+
+def _pure_python(outline):
+    parsed = list(generate_slides._iter_outline_docs(outline, loader=yaml.SafeLoader))
+    slides = [generate_slides.Slide(fields, doc) for fields, doc in parsed]
+    for slide in slides:
+        slide["content"]
+    return slides
+
+
+def _csafe(outline):
+    return generate_slides.parse_slides(outline, use_cache=False)
+
+
+def _cached(outline):
+    return generate_slides.parse_slides(outline)
+
+
+def _memo(outline):
+    generate_slides.parse_slides(outline)
+    start = time.perf_counter()
+    slides = generate_slides.parse_slides(outline)
+    return slides, time.perf_counter() - start
+
+
+VARIANTS = {
+    "pure-python": _pure_python,
+    "csafe": _csafe,
+    "cached": _cached,
+    "memo": _memo,
+}
+
+
+def _run_variant(variant: str, outline: Path, cache_dir: Path) -> dict:
+    outline_cache.DEFAULT_CACHE_DIR = cache_dir
+    start = time.perf_counter()
+    result = VARIANTS[variant](outline)
+    elapsed = time.perf_counter() - start
+    if variant == "memo":
+        result, elapsed = result
+    return {"variant": variant, "slides": len(result), "seconds": elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark outline parsing on a synthetic outline")
+    parser.add_argument("--slides", type=int, default=5000, help="Number of slides (default: 5000)")
+    parser.add_argument("--variants", nargs="+", default=list(VARIANTS), choices=list(VARIANTS))
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    parser.add_argument("--run-variant", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--outline", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--cache-dir", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_variant:
+        print(json.dumps(_run_variant(args.run_variant, Path(args.outline), Path(args.cache_dir))))
+        return
+
+    if not hasattr(yaml, "CSafeLoader"):
+        print("Note: PyYAML was built without libyaml; 'csafe' falls back to the pure-Python loader.")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        outline = Path(tmp) / "outline.yaml"
+        cache_dir = Path(tmp) / "cache"
+        make_outline(outline, args.slides)
+        # Warm the on-disk cache for the 'cached' variant.
+        _run_variant("cached", outline, cache_dir)
+        if not args.json:
+            size_mb = outline.stat().st_size / 1e6
+            print(f"Outline: {args.slides} slides, {size_mb:.1f} MB")
+            print(f"{'variant':<12} {'slides':>6} {'seconds':>8}")
+        for variant in args.variants:
+            out = subprocess.run(
+                [sys.executable, __file__, "--run-variant", variant, "--outline", str(outline), "--cache-dir", str(cache_dir)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            if args.json:
+                print(json.dumps(r))
+            else:
+                print(f"{r['variant']:<12} {r['slides']:>6} {r['seconds']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
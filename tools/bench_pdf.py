@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark PDF assembly: Pillow save_all (previous behaviour) vs pdf_writer.
+
+Creates a synthetic deck of 4K JPEG slides, then builds slides.pdf with each
+variant in a separate process and reports wall time, peak RSS and output size.
+
+Example:
+  python tools/bench_pdf.py --slides 200
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+import pdf_writer
+
+
+def make_deck(directory: Path, count: int, width: int = 3840, height: int = 2160) -> list:
+    """Write one noisy 4K JPEG and copy it to slide_XX_0_4k.jpg for each slide."""
+    noise = Image.effect_noise((width, height), 64)
+    template = directory / "template.jpg"
+    Image.merge("RGB", (noise, noise.transpose(Image.Transpose.FLIP_LEFT_RIGHT), noise)).save(
+        template, format="JPEG", quality=90
+    )
+    data = template.read_bytes()
+    paths = []
+    for n in range(1, count + 1):
+        path = directory / f"slide_{n:02d}_0_4k.jpg"
+        path.write_bytes(data)
+        paths.append(path)
+    return paths
+
+
+def _pillow_save_all(paths, pdf_path):
+    imgs = []
+    for p in paths:
+        with Image.open(p) as im:
+            if im.mode in ("RGBA", "P"):
+                im = im.convert("RGB")
+            imgs.append(im.copy())
+    imgs[0].save(pdf_path, save_all=True, append_images=imgs[1:])
+
+
+VARIANTS = {
+    "pillow": _pillow_save_all,
+    "streaming": pdf_writer.write_pdf,
+}
+
+
+def _run_variant(variant: str, deck_dir: Path) -> dict:
+    paths = sorted(deck_dir.glob("slide_*_0_4k.jpg"))
+    pdf_path = deck_dir / f"{variant}.pdf"
+    start = time.perf_counter()
+    VARIANTS[variant](paths, pdf_path)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return {
+        "variant": variant,
+        "slides": len(paths),
+        "seconds": elapsed,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6,
+        "pdf_mb": pdf_path.stat().st_size / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF assembly for a synthetic 4K deck")
+    parser.add_argument("--slides", type=int, default=200, help="Number of 4K slides (default: 200)")
+    parser.add_argument("--variants", nargs="+", default=list(VARIANTS), choices=list(VARIANTS))
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    parser.add_argument("--run-variant", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--deck-dir", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_variant:
+        print(json.dumps(_run_variant(args.run_variant, Path(args.deck_dir))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        deck_dir = Path(tmp)
+        make_deck(deck_dir, args.slides)
+        if not args.json:
+            print(f"{'variant':<10} {'slides':>6} {'seconds':>8} {'peak RSS MB':>12} {'PDF MB':>8}")
+        for variant in args.variants:
+            # Each variant runs in its own process so peak RSS is not shared.
+            out = subprocess.run(
+                [sys.executable, __file__, "--run-variant", variant, "--deck-dir", str(deck_dir)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            r = json.loads(out.strip().splitlines()[-1])
+            if args.json:
+                print(json.dumps(r))
+            else:
+                print(f"{r['variant']:<10} {r['slides']:>6} {r['seconds']:>8.2f} {r['peak_rss_mb']:>12.1f} {r['pdf_mb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite: generation, enlargement, PDF assembly and PPTX export.
+
+Every model call goes to fake_genai.FakeClient, so no API key is needed and
+nothing is spent. The fake backend's latency distribution, 429/500 rates and
+stream chunking are configurable; the scheduler retries failures as it would
+against the real API.
+
+Benchmarks:
+  generate  end-to-end deck generation (parse outline, render, manifest, PDF and
+            index) at each --concurrency level
+  enlarge   4K upscale of a canned 1K deck through enlarge_slides
+  pdf       slides.pdf from canned 4K images (pdf_writer)
+  pptx      image-only PPTX from canned 4K images, in-memory and streaming
+  gallery   index.html thumbnails and contact sheet from canned 4K images (run_gallery)
+
+Results are printed as a table and, with --output, written as JSON together
+with the commit and parameters, so runs can be compared across versions with
+--compare.
+
+Example:
+  python tools/bench_suite.py --slides 40 --latency lognormal:0.5:0.4 \\
+      --throttle-rate 0.05 --error-rate 0.02 --output bench.json
+  python tools/bench_suite.py --compare bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import bench_outline
+import export_pptx
+import fake_genai
+import genai_client
+import generate_slides
+import pdf_writer
+import run_gallery
+import run_manifest
+from scheduler import Scheduler
+
+BENCHMARKS = ("generate", "enlarge", "pdf", "pptx", "gallery")
+RESULTS_VERSION = 1
+
+
+def _git_commit(project_root: Path):
+    try:
+        out = subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=project_root, capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _fake_client(args):
+    return fake_genai.FakeClient(
+        latency=args.latency,
+        payload=fake_genai.make_jpeg(noisy=True),
+        payload_4k=fake_genai.make_jpeg(5504, 3072, noisy=True),
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        chunks=args.chunks,
+        seed=args.seed,
+    )
+
+
+def _scheduler(args, concurrency: int) -> Scheduler:
+    return Scheduler(
+        initial_concurrency=concurrency,
+        max_concurrency=concurrency,
+        max_retries=args.retries,
+        base_backoff=args.backoff,
+        log=lambda *a, **k: None,
+    )
+
+
+def _canned_deck(directory: Path, count: int, fourk: bool) -> list:
+    """Write count canned slide images (1K drafts, or 4K upscales) into directory."""
+    if fourk:
+        data, name = fake_genai.make_jpeg(5504, 3072, noisy=True), "slide_{:02d}_0_4k.jpg"
+    else:
+        data, name = fake_genai.make_jpeg(noisy=True), "slide_{:02d}_0.jpg"
+    paths = []
+    for n in range(1, count + 1):
+        path = directory / name.format(n)
+        path.write_bytes(data)
+        paths.append(path)
+    return paths
+
+
+def _call_stats(client, scheduler, seconds: float, ok: int, total: int) -> dict:
+    return {
+        "ok": ok,
+        "failed": total - ok,
+        "seconds": seconds,
+        "per_min": 60 * ok / seconds if seconds else 0.0,
+        "api_calls": client.calls,
+        "retries": scheduler.retries,
+        "throttled": client.throttled,
+        "server_errors": client.errors,
+    }
+
+
+def bench_generate(args, tmp: Path, concurrency: int) -> dict:
+    client = _fake_client(args)
+    genai_client.configure(factory=lambda: client)
+    scheduler = _scheduler(args, concurrency)
+    project_root = Path(generate_slides.__file__).resolve().parent.parent
+    outline = tmp / "outline.yaml"
+    if not outline.exists():
+        bench_outline.make_outline(outline, args.slides)
+    output_dir = tmp / f"generate_c{concurrency}_{args.engine}"
+    output_dir.mkdir()
+
+    start = time.perf_counter()
+    parsed = generate_slides.parse_slides(str(outline), use_cache=False)
+    results = generate_slides.ENGINES[args.engine](
+        parsed, concurrency, "Benchmark style.", "benchmark", output_dir, project_root, "balanced", [], None, scheduler
+    )
+    entries = {s["number"]: generate_slides.manifest_entry(s, r) for s, r in zip(parsed, results) if r["ok"]}
+    run_manifest.write_manifest(output_dir, outline, "benchmark", "balanced", entries)
+    generate_slides.build_run_artifacts(output_dir, generate_slides.collect_run_images(output_dir, parsed))
+    elapsed = time.perf_counter() - start
+
+    ok = sum(1 for r in results if r["ok"])
+    return dict(
+        {"benchmark": "generate", "variant": f"{args.engine}/c{concurrency}", "slides": len(parsed)},
+        **_call_stats(client, scheduler, elapsed, ok, len(results)),
+    )
+
+
+def bench_enlarge(args, tmp: Path, concurrency: int) -> dict:
+    client = _fake_client(args)
+    genai_client.configure(factory=lambda: client)
+    scheduler = _scheduler(args, concurrency)
+    deck = tmp / f"enlarge_c{concurrency}"
+    deck.mkdir()
+    drafts = _canned_deck(deck, args.slides, fourk=False)
+
+    start = time.perf_counter()
+    results = generate_slides.enlarge_slides(drafts, deck, scheduler)
+    elapsed = time.perf_counter() - start
+
+    ok = sum(1 for r in results if r["ok"])
+    return dict(
+        {"benchmark": "enlarge", "variant": f"c{concurrency}", "slides": len(drafts)},
+        **_call_stats(client, scheduler, elapsed, ok, len(results)),
+    )
+
+
+def _fourk_deck(tmp: Path, count: int) -> Path:
+    """A canned run directory with 1K drafts and their 4K upscales."""
+    deck = tmp / "deck_4k"
+    if not deck.exists():
+        deck.mkdir()
+        _canned_deck(deck, count, fourk=False)
+        _canned_deck(deck, count, fourk=True)
+    return deck
+
+
+def bench_pdf(args, tmp: Path) -> list:
+    deck = _fourk_deck(tmp, args.slides)
+    paths = sorted(deck.glob("slide_*_0_4k.jpg"))
+    pdf_path = tmp / "slides.pdf"
+    start = time.perf_counter()
+    pdf_writer.write_pdf(paths, pdf_path)
+    elapsed = time.perf_counter() - start
+    return [{
+        "benchmark": "pdf",
+        "variant": "streaming",
+        "slides": len(paths),
+        "seconds": elapsed,
+        "output_mb": pdf_path.stat().st_size / 1e6,
+    }]
+
+
+def bench_pptx(args, tmp: Path) -> list:
+    deck = _fourk_deck(tmp, args.slides)
+    notes = {n: f"Speaker notes for slide {n}." for n in range(1, args.slides + 1)}
+    results = []
+    for variant, streaming in (("in-memory", False), ("streaming", True)):
+        output = tmp / f"deck_{variant}.pptx"
+        start = time.perf_counter()
+        export_pptx.export_pptx(deck, output, notes, use_4k=True, streaming=streaming)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "benchmark": "pptx",
+            "variant": variant,
+            "slides": args.slides,
+            "seconds": elapsed,
+            "output_mb": output.stat().st_size / 1e6,
+        })
+    return results
+
+
+def bench_gallery(args, tmp: Path) -> list:
+    deck = _fourk_deck(tmp, args.slides)
+    paths = sorted(deck.glob("slide_*_0_4k.jpg"))
+    results = []
+    # "cold" builds every thumbnail; "warm" is a rebuild where all of them are up to date.
+    for variant in ("cold", "warm"):
+        start = time.perf_counter()
+        run_gallery.write_index(deck, paths)
+        elapsed = time.perf_counter() - start
+        # What the browser needs before the gallery is usable: the page and the contact sheet.
+        first_view = (deck / "index.html").stat().st_size + (deck / run_gallery.THUMBS_DIR / run_gallery.CONTACT_SHEET).stat().st_size
+        results.append({
+            "benchmark": "gallery",
+            "variant": variant,
+            "slides": len(paths),
+            "seconds": elapsed,
+            "output_mb": first_view / 1e6,
+        })
+    return results
+
+
+def run_suite(args) -> list:
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_name:
+        tmp = Path(tmp_name)
+        for name in args.benchmarks:
+            with contextlib.redirect_stdout(io.StringIO()):
+                if name == "generate":
+                    batch = [bench_generate(args, tmp, c) for c in args.concurrency]
+                elif name == "enlarge":
+                    batch = [bench_enlarge(args, tmp, c) for c in args.concurrency]
+                elif name == "pdf":
+                    batch = bench_pdf(args, tmp)
+                elif name == "gallery":
+                    batch = bench_gallery(args, tmp)
+                else:
+                    batch = bench_pptx(args, tmp)
+            for r in batch:
+                print_result(r)
+            results.extend(batch)
+    return results
+
+
+def print_result(r: dict) -> None:
+    line = f"{r['benchmark']:<9} {r['variant']:<14} {r['slides']:>6} {r['seconds']:>8.2f}"
+    if "api_calls" in r:
+        line += (
+            f" {r['per_min']:>9.1f}/min  ok {r['ok']} failed {r['failed']}; "
+            f"{r['api_calls']} call(s), {r['retries']} retry(ies), {r['throttled']} 429, {r['server_errors']} 500"
+        )
+    else:
+        line += f" {r['output_mb']:>9.1f} MB"
+    print(line)
+
+
+# Parameters that change what is measured; runs that differ in these are not comparable.
+BACKEND_PARAMS = ("latency", "throttle_rate", "error_rate", "chunks", "retries", "backoff", "seed")
+
+
+def compare(results: list, params: dict, baseline_path: Path, tolerance: float) -> int:
+    """Print the change in seconds against a saved run; 1 if anything regressed beyond tolerance."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    before = {(r["benchmark"], r["variant"], r["slides"]): r for r in baseline.get("results", [])}
+    print(f"\nCompared with {baseline_path} ({baseline.get('commit') or 'unknown commit'}):")
+    differing = [k for k in BACKEND_PARAMS if baseline.get("params", {}).get(k) != params.get(k)]
+    if differing:
+        print(f"Warning: baseline was run with different {', '.join(differing)}; timings may not be comparable.")
+    regressed = 0
+    for r in results:
+        old = before.get((r["benchmark"], r["variant"], r["slides"]))
+        if old is None or not old["seconds"]:
+            continue
+        change = r["seconds"] / old["seconds"] - 1
+        flag = ""
+        if change > tolerance:
+            flag = "  REGRESSION"
+            regressed += 1
+        print(f"{r['benchmark']:<9} {r['variant']:<14} {old['seconds']:>8.2f}s -> {r['seconds']:>8.2f}s ({change:+.0%}){flag}")
+    return 1 if regressed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite with a fake Gemini backend")
+    parser.add_argument("--benchmarks", nargs="+", default=list(BENCHMARKS), choices=BENCHMARKS)
+    parser.add_argument("--slides", type=int, default=40, help="Slides per benchmark deck (default: 40)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 16], help="Concurrency levels for generate/enlarge")
+    parser.add_argument("--engine", default="async", choices=sorted(generate_slides.ENGINES))
+    parser.add_argument(
+        "--latency",
+        default="lognormal:0.5:0.4",
+        help="Fake request latency: seconds, uniform:LOW:HIGH, normal:MEAN:SD or lognormal:MEDIAN:SIGMA",
+    )
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--chunks", type=int, default=1, help="Stream chunks per response (default: 1)")
+    parser.add_argument("--retries", type=int, default=generate_slides.DEFAULT_RETRIES)
+    parser.add_argument("--backoff", type=float, default=0.25, help="Scheduler base backoff in seconds (default: 0.25)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for latencies and errors")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON from an earlier --output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before --compare fails (default: 0.2)")
+    args = parser.parse_args()
+
+    fake_genai.latency_sampler(args.latency)  # reject a bad spec before running anything
+    project_root = Path(__file__).resolve().parent.parent
+
+    print(f"{'benchmark':<9} {'variant':<14} {'slides':>6} {'seconds':>8}")
+    results = run_suite(args)
+
+    params = {k: v for k, v in vars(args).items() if k not in ("output", "compare", "tolerance")}
+    if args.output:
+        report = {
+            "version": RESULTS_VERSION,
+            "commit": _git_commit(project_root),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": params,
+            "results": results,
+        }
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Wrote {args.output}")
+
+    if args.compare:
+        sys.exit(compare(results, params, Path(args.compare), args.tolerance))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Content-addressed store for generated files, so identical bytes are kept once.
+
+generated_slides/.blobs/<aa>/<sha256><ext> holds one file per distinct
+content. When a run finishes, its images, thumbnails and PDF are ingested:
+a file whose content is new becomes a blob by hard-linking it into the store
+(nothing is copied), and a file whose content is already stored is replaced,
+atomically, by a hard link to the existing blob, which frees its own copy.
+
+Run directories therefore stay plain directories of files (viewers, the PPTX
+exporter and --resume need no changes), and a blob's link count says how many
+places use it: a blob with a link count of 1 is used by nothing but the store
+and is garbage (see run_gc). Every writer in this repo replaces files by
+renaming a new file into place, never by rewriting one in place, so a shared
+inode is never modified under another run. Hard links need the store and the
+runs to be on one filesystem; where they are not, files are left as they are.
+
+Only the standard library is used (run_gc and the nano-slides skill import this).
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+BLOBS_DIR = ".blobs"
+# What a run writes that is worth sharing: slide images (and 4K variants), thumbnails, the PDF.
+BLOB_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp", ".pdf"}
+RUN_SUBDIRS = ("thumbs",)
+_CHUNK = 1024 * 1024
+
+
+def file_digest(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _replace_with_link(blob: Path, path: Path) -> None:
+    tmp = path.with_name(f".{path.name}.blob.tmp")
+    if tmp.exists():
+        tmp.unlink()
+    os.link(blob, tmp)
+    os.replace(tmp, path)
+
+
+def run_files(run_dir) -> list:
+    """The files of run_dir that go into the store (top level and RUN_SUBDIRS; no hidden files)."""
+    run_dir = Path(run_dir)
+    files = []
+    for directory in (run_dir, *(run_dir / d for d in RUN_SUBDIRS)):
+        if not directory.is_dir():
+            continue
+        with os.scandir(directory) as it:
+            for entry in it:
+                if (
+                    not entry.name.startswith(".")
+                    and entry.is_file(follow_symlinks=False)
+                    and os.path.splitext(entry.name)[1].lower() in BLOB_EXTENSIONS
+                ):
+                    files.append(Path(entry.path))
+    return sorted(files)
+
+
+class BlobStore:
+    """generated_slides/.blobs/; see the module docstring."""
+
+    def __init__(self, base_output):
+        self.dir = Path(base_output) / BLOBS_DIR
+
+    def blob_path(self, digest: str, suffix: str) -> Path:
+        return self.dir / digest[:2] / f"{digest}{suffix.lower()}"
+
+    def ingest(self, path) -> int:
+        """
+        Store path's content and make path a hard link to its blob.
+        Returns the bytes freed (path was the only copy of content already stored), else 0.
+        """
+        path = Path(path)
+        st = path.stat()
+        blob = self.blob_path(file_digest(path), path.suffix)
+        # Two attempts: the blob may be created or collected by another process between the steps.
+        for _ in range(2):
+            try:
+                blob_st = blob.stat()
+            except FileNotFoundError:
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.link(path, blob)
+                except FileExistsError:
+                    continue
+                except OSError:
+                    return 0  # no hard links here (e.g. another filesystem): keep the file as it is
+                return 0
+            if (blob_st.st_dev, blob_st.st_ino) == (st.st_dev, st.st_ino):
+                return 0
+            try:
+                _replace_with_link(blob, path)
+            except FileNotFoundError:
+                continue  # collected meanwhile: store this copy instead
+            except OSError:
+                return 0
+            return st.st_size if st.st_nlink == 1 else 0
+        return 0
+
+    def ingest_run(self, run_dir) -> dict:
+        """Ingest run_files(run_dir); returns {files, bytes, deduplicated}."""
+        stats = {"files": 0, "bytes": 0, "deduplicated": 0}
+        for path in run_files(run_dir):
+            try:
+                size = path.stat().st_size
+                stats["deduplicated"] += self.ingest(path)
+            except OSError as e:
+                print(f"Warning: could not add {path} to the blob store: {e}")
+                continue
+            stats["files"] += 1
+            stats["bytes"] += size
+        return stats
+
+    def blobs(self):
+        """Yield (path, stat) for every blob."""
+        if not self.dir.is_dir():
+            return
+        for prefix in os.scandir(self.dir):
+            if not prefix.is_dir() or prefix.name.startswith("."):
+                continue
+            for entry in os.scandir(prefix.path):
+                if not entry.name.startswith("."):
+                    yield Path(entry.path), entry.stat(follow_symlinks=False)
+
+    def stats(self) -> dict:
+        """
+        {blobs, stored, referenced, saved}: bytes held once in the store, bytes the links
+        to them (runs, render cache) would take as separate copies, and the difference.
+        """
+        blobs = stored = referenced = 0
+        for _, st in self.blobs():
+            blobs += 1
+            stored += st.st_size
+            referenced += st.st_size * max(st.st_nlink - 1, 0)
+        return {"blobs": blobs, "stored": stored, "referenced": referenced, "saved": max(referenced - stored, 0)}
+
+
+def summary(stats: dict) -> str:
+    return (
+        f"Blob store: {stats['files']} file(s), {stats['bytes'] / 1e6:.1f} MB; "
+        f"{stats['deduplicated'] / 1e6:.1f} MB deduplicated"
+    )
@@ -0,0 +1,254 @@
+"""
+Local wireframe renderer for `generate_slides.py --backend draft`.
+
+Draws each slide with Pillow from its parsed outline fields (title, subtitle,
+text bullets/columns, layout, type and the visual description as a placeholder
+box) into a 1K 16:9 JPEG, so the structure of a deck can be reviewed in seconds
+without any API calls. Slides are rendered in a process pool; results have the
+same shape as generate_slide results, so the manifest, journal, PDF, index.html
+and PPTX export work unchanged on draft runs.
+
+Draft images are never stored in the render cache, and their prompt_hash is a
+"draft:" key, so a later Gemini run (including --incremental) never mistakes a
+wireframe for a finished render.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Bump when the drawing changes so draft keys change with it.
+DRAFT_VERSION = 1
+WIDTH, HEIGHT = 1376, 768
+MARGIN = 64
+
+BACKGROUND = (250, 250, 247)
+INK = (34, 34, 34)
+MUTED = (120, 120, 120)
+ACCENT = (52, 101, 164)
+PLACEHOLDER = (226, 229, 233)
+
+# Fields the renderer reads; only these are sent to worker processes.
+# Slides submitted ahead per worker, as in generate_slides: a lazy source is read as slides are drawn.
+PREFETCH_FACTOR = 2
+FIELDS = ("number", "title", "subtitle", "text_raw", "layout", "type", "style", "visual", "image_only")
+
+
+@lru_cache(maxsize=None)
+def _font(size: int, bold: bool = False):
+    for name in (("DejaVuSans-Bold.ttf", "Arial Bold.ttf") if bold else ("DejaVuSans.ttf", "Arial.ttf")):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def _wrap(draw, text: str, font, width: int) -> list:
+    """Greedy word wrap of text to lines no wider than width pixels."""
+    lines = []
+    for paragraph in str(text).splitlines() or [""]:
+        line = ""
+        for word in paragraph.split():
+            candidate = f"{line} {word}".strip()
+            if line and draw.textlength(candidate, font=font) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(line)
+    return lines
+
+
+def _text(draw, xy, text, font, width, fill=INK, max_lines=None, spacing=1.25, align="left") -> int:
+    """Draw wrapped text at xy; returns the y coordinate below it."""
+    x, y = xy
+    lines = _wrap(draw, text, font, width)
+    if max_lines and len(lines) > max_lines:
+        lines = lines[:max_lines]
+        lines[-1] = lines[-1].rstrip(". ") + " …"
+    line_height = int(font.size * spacing)
+    for line in lines:
+        lx = x + (width - draw.textlength(line, font=font)) / 2 if align == "center" else x
+        draw.text((lx, y), line, font=font, fill=fill)
+        y += line_height
+    return y
+
+
+def _bullet_text(bullet) -> str:
+    if isinstance(bullet, dict):
+        return "; ".join(f"{k}: {v}" for k, v in bullet.items())
+    return str(bullet)
+
+
+def _bullets(draw, box, heading, bullets, body=None) -> None:
+    x, y, right, bottom = box
+    width = right - x
+    if heading:
+        y = _text(draw, (x, y), heading, _font(30, bold=True), width, fill=ACCENT, max_lines=2) + 8
+    if body:
+        y = _text(draw, (x, y), body, _font(24), width, max_lines=4) + 8
+    font = _font(24)
+    indent = 28
+    for bullet in bullets:
+        if y + font.size > bottom:
+            draw.text((x, y), "…", font=font, fill=MUTED)
+            break
+        draw.ellipse((x + 4, y + font.size * 0.35, x + 14, y + font.size * 0.35 + 10), fill=ACCENT)
+        y = _text(draw, (x + indent, y), _bullet_text(bullet), font, width - indent, max_lines=3) + 6
+
+
+def _placeholder(draw, box, caption) -> None:
+    """A crossed box standing in for the slide's visual, labelled with its description."""
+    x0, y0, x1, y1 = box
+    draw.rectangle(box, fill=PLACEHOLDER, outline=MUTED, width=2)
+    draw.line((x0, y0, x1, y1), fill=(205, 208, 212), width=2)
+    draw.line((x0, y1, x1, y0), fill=(205, 208, 212), width=2)
+    if caption:
+        pad = 24
+        _text(draw, (x0 + pad, y0 + pad), caption, _font(20), x1 - x0 - 2 * pad, fill=MUTED, max_lines=8)
+
+
+def _text_parts(text_raw):
+    """Split text_raw into (columns, heading, body, bullets) as the prompt formatter reads it."""
+    if isinstance(text_raw, str):
+        return [], None, text_raw, []
+    if not isinstance(text_raw, dict):
+        return [], None, None, []
+    columns = [
+        (col.get("heading") or col.get("title") or f"Column {i}", col.get("bullets") or [])
+        for i, col in enumerate(text_raw.get("columns") or [], start=1)
+        if isinstance(col, dict)
+    ]
+    heading = text_raw.get("heading") or text_raw.get("subtitle") or text_raw.get("title")
+    return columns, heading, text_raw.get("body"), text_raw.get("bullets") or []
+
+
+def draw_slide(slide: dict) -> Image.Image:
+    """Render one slide's fields as a wireframe image."""
+    im = Image.new("RGB", (WIDTH, HEIGHT), BACKGROUND)
+    draw = ImageDraw.Draw(im)
+    layout = (slide.get("layout") or "full").lower()
+    slide_type = slide.get("type") or "content"
+    title = slide.get("title") or ""
+    subtitle = slide.get("subtitle") or ""
+    visual = slide.get("visual") or ""
+    columns, heading, body, bullets = _text_parts(slide.get("text_raw"))
+
+    tag = f"DRAFT · slide {slide.get('number')} · {slide_type} · {layout}"
+    if slide.get("style"):
+        tag += f" · {slide['style']}"
+    draw.text((MARGIN, 20), tag, font=_font(16), fill=MUTED)
+    draw.rectangle((8, 8, WIDTH - 9, HEIGHT - 9), outline=(215, 215, 210), width=2)
+    content_width = WIDTH - 2 * MARGIN
+
+    if layout in ("title_slide", "section_header", "title") or slide_type in ("title", "section", "transition"):
+        y = HEIGHT // 2 - 90
+        y = _text(draw, (MARGIN, y), title, _font(60, bold=True), content_width, max_lines=2, align="center")
+        draw.line((WIDTH // 2 - 80, y + 12, WIDTH // 2 + 80, y + 12), fill=ACCENT, width=4)
+        if subtitle:
+            _text(draw, (MARGIN, y + 36), subtitle, _font(30), content_width, fill=MUTED, max_lines=2, align="center")
+        return im
+
+    if slide.get("image_only") or layout == "blank" or slide_type == "image_only":
+        _placeholder(draw, (MARGIN, 60, WIDTH - MARGIN, HEIGHT - MARGIN), visual or title)
+        return im
+
+    y = _text(draw, (MARGIN, 56), title, _font(44, bold=True), content_width, max_lines=2)
+    if subtitle:
+        y = _text(draw, (MARGIN, y), subtitle, _font(26), content_width, fill=MUTED, max_lines=1)
+    draw.line((MARGIN, y + 10, WIDTH - MARGIN, y + 10), fill=ACCENT, width=3)
+    top, bottom = y + 36, HEIGHT - MARGIN
+
+    if columns or layout in ("two_content", "comparison"):
+        if not columns:
+            half = (len(bullets) + 1) // 2
+            columns = [(heading, bullets[:half]), (None, bullets[half:])]
+        gap = 40
+        col_width = (content_width - gap * (len(columns) - 1)) // len(columns)
+        for i, (col_heading, col_bullets) in enumerate(columns):
+            x = MARGIN + i * (col_width + gap)
+            if layout == "comparison" and i:
+                draw.line((x - gap // 2, top, x - gap // 2, bottom), fill=(215, 215, 210), width=2)
+            _bullets(draw, (x, top, x + col_width, bottom), col_heading, col_bullets)
+        return im
+
+    if layout == "picture_with_caption":
+        split = MARGIN + content_width * 3 // 5
+        _placeholder(draw, (MARGIN, top, split - 24, bottom), visual)
+        _bullets(draw, (split + 16, top, WIDTH - MARGIN, bottom), heading, bullets, body)
+        return im
+
+    if visual and (bullets or body or heading):
+        split = MARGIN + content_width * 3 // 5
+        _bullets(draw, (MARGIN, top, split - 24, bottom), heading, bullets, body)
+        _placeholder(draw, (split, top, WIDTH - MARGIN, bottom), visual)
+    elif bullets or body or heading:
+        _bullets(draw, (MARGIN, top, WIDTH - MARGIN, bottom), heading, bullets, body)
+    else:
+        _placeholder(draw, (MARGIN, top, WIDTH - MARGIN, bottom), visual)
+    return im
+
+
+def draft_key(slide: dict) -> str:
+    """Stands in for the prompt hash of a draft render; never equal to a Gemini prompt hash."""
+    fields = {k: slide.get(k) for k in FIELDS if k != "number"}
+    payload = json.dumps([DRAFT_VERSION, fields], sort_keys=True, ensure_ascii=False, default=str)
+    return "draft:" + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def render_slide(slide: dict, output_dir: str) -> dict:
+    """Render one slide to <output_dir>/slide_XX_0.jpg (written atomically); returns a result dict."""
+    result = {"number": slide["number"], "prompt_hash": draft_key(slide), "files": [], "ok": False, "error": None}
+    path = os.path.join(output_dir, f"slide_{slide['number']:02d}_0.jpg")
+    tmp = os.path.join(output_dir, f".slide_{slide['number']:02d}_0.jpg.tmp")
+    try:
+        # JPEG rather than PNG: ~8x faster to encode, and the PDF writer embeds it without re-encoding.
+        draw_slide(slide).save(tmp, format="JPEG", quality=90, subsampling=0)
+        os.replace(tmp, path)
+        result.update(files=[path], ok=True)
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def render_slides(slides, output_dir, workers=None, on_result=None) -> list:
+    """
+    Render slides (any iterable, e.g. iter_slides) in a process pool; returns results in slide order.
+    on_result(slide, result), if given, is called in this process as each slide finishes, so the
+    journal and gallery keep up with the pool instead of waiting on the slowest earlier slide.
+    """
+    workers = workers or os.cpu_count() or 1
+    pending = {}  # future -> (position, slide)
+    results = []
+
+    def collect(done):
+        for future in done:
+            position, slide = pending.pop(future)
+            result = future.result()
+            if result["ok"]:
+                print(f"Finished Slide {slide['number']} (draft)")
+            else:
+                print(f"Error drafting Slide {slide['number']}: {result['error']}")
+            if on_result is not None:
+                on_result(slide, result)
+            results.append((position, result))
+
+    # Workers start on demand, while the gallery's thread may be mid-import or holding a lock;
+    # a plain fork could copy that lock held into the child and hang it. Fork from a clean server.
+    context = multiprocessing.get_context("forkserver") if "forkserver" in multiprocessing.get_all_start_methods() else None
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        for position, slide in enumerate(slides):
+            pending[pool.submit(render_slide, {k: slide.get(k) for k in FIELDS}, str(output_dir))] = (position, slide)
+            if len(pending) >= workers * PREFETCH_FACTOR:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            else:
+                collect([future for future in pending if future.done()])
+        while pending:
+            collect(wait(pending, return_when=FIRST_COMPLETED).done)
+    return [result for _, result in sorted(results, key=lambda item: item[0])]
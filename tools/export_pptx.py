@@ -1,6 +1,10 @@
 import argparse
+import hashlib
+import os
 import sys
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Ensure project root is on sys.path for imports
@@ -9,10 +13,11 @@ project_root = script_dir.parent
 if str(project_root) not in sys.path:
     sys.path.append(str(project_root))
 
-from pptx import Presentation
-from pptx.util import Inches
+from PIL import Image
 
 from tools.generate_slides import parse_slides
+from tools.pptx_stream import new_presentation, verify_pptx, write_pptx_streaming
+from tools.run_catalog import RunCatalog
 
 
 def load_notes(outline_path: Path) -> dict:
@@ -36,7 +41,7 @@ def collect_slide_files(run_dir: Path, use_4k: bool) -> dict:
     pattern = re.compile(r"slide_(\d+)_0(.*)\.(jpg|jpeg|png)$", re.IGNORECASE)
     slide_candidates = {}
 
-    for path in run_dir.glob("slide_*_0.*"):
+    for path in run_dir.glob("slide_*_0*.*"):
         m = pattern.match(path.name)
         if not m:
             continue
@@ -63,24 +68,138 @@ def collect_slide_files(run_dir: Path, use_4k: bool) -> dict:
     return slide_files
 
 
-def export_pptx(run_dir: Path, output_path: Path, notes_by_number: dict, use_4k: bool):
+SLIDE_WIDTH_IN = 13.333
+DERIVATIVES_DIR = "pptx_derivatives"
+
+# Image profiles for embedded pictures. max_width is in pixels; None keeps the source size.
+# python-pptx only accepts BMP/GIF/JPEG/PNG/TIFF/WMF, so WebP is not offered.
+PROFILES = {
+    "original": {"max_width": None, "format": "original", "jpeg_quality": 90},
+    "print": {"max_width": 3840, "format": "jpeg", "jpeg_quality": 92},
+    "screen": {"max_width": 1920, "format": "jpeg", "jpeg_quality": 85},
+    "email": {"max_width": 1280, "format": "jpeg", "jpeg_quality": 75},
+}
+
+
+def _needs_transcode(src: Path, profile: dict) -> bool:
+    if profile["format"] != "original":
+        return True
+    if profile["max_width"] is None:
+        return False
+    with Image.open(src) as im:
+        return im.width > profile["max_width"]
+
+
+def derivative_path(src: Path, derivatives_dir: Path, profile: dict) -> Path:
+    """Path of the transcoded copy of src for profile, keyed on source size/mtime and settings."""
+    st = src.stat()
+    key = f"{src.name}|{st.st_size}|{st.st_mtime_ns}|{profile['max_width']}|{profile['format']}|{profile['jpeg_quality']}"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+    fmt = profile["format"]
+    ext = src.suffix.lower() if fmt == "original" else (".jpg" if fmt == "jpeg" else ".png")
+    return derivatives_dir / f"{src.stem}_{digest}{ext}"
+
+
+def transcode_image(src: str, dst: str, max_width, fmt: str, jpeg_quality: int) -> str:
+    """Downsample src to at most max_width pixels wide and re-encode it as fmt (runs in a worker process)."""
+    with Image.open(src) as im:
+        out_format = im.format if fmt == "original" else fmt.upper()
+        if max_width and im.width > max_width:
+            height = round(im.height * max_width / im.width)
+            im = im.resize((max_width, height), Image.Resampling.LANCZOS)
+        if out_format == "JPEG" and im.mode != "RGB":
+            im = im.convert("RGB")
+        tmp = f"{dst}.tmp{os.getpid()}"
+        if out_format == "JPEG":
+            im.save(tmp, format="JPEG", quality=jpeg_quality, optimize=True)
+        else:
+            im.save(tmp, format=out_format, optimize=True)
+    os.replace(tmp, dst)
+    return dst
+
+
+def prepare_images(slide_files: dict, run_dir: Path, profile: dict, workers=None, reuse: bool = True) -> dict:
+    """
+    Transcode slide images for profile in a process pool, reusing derivatives from earlier exports.
+    Returns slide number -> path to embed.
+    """
+    derivatives_dir = run_dir / DERIVATIVES_DIR
+    prepared = {}
+    jobs = []
+    as_is = reused = 0
+    for num, src in slide_files.items():
+        if not _needs_transcode(src, profile):
+            prepared[num] = src
+            as_is += 1
+            continue
+        dst = derivative_path(src, derivatives_dir, profile)
+        prepared[num] = dst
+        if reuse and dst.exists():
+            reused += 1
+        else:
+            jobs.append((str(src), str(dst)))
+
+    if jobs:
+        derivatives_dir.mkdir(parents=True, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(transcode_image, src, dst, profile["max_width"], profile["format"], profile["jpeg_quality"])
+                for src, dst in jobs
+            ]
+            for future in futures:
+                future.result()
+    print(f"Images: {len(jobs)} transcoded, {reused} reused from {DERIVATIVES_DIR}/, {as_is} embedded as-is.")
+    return prepared
+
+
+def export_pptx(
+    run_dir: Path,
+    output_path: Path,
+    notes_by_number: dict,
+    use_4k: bool,
+    profile=None,
+    workers=None,
+    reuse_derivatives: bool = True,
+    streaming: bool = False,
+    verify: bool = False,
+):
+    start = time.perf_counter()
     slide_files = collect_slide_files(run_dir, use_4k)
     if not slide_files:
         print(f"Error: no slide images found in {run_dir}", file=sys.stderr)
         sys.exit(1)
 
-    prs = Presentation()
-    # Set 16:9
-    prs.slide_width = Inches(13.333)
-    prs.slide_height = Inches(7.5)
+    source_bytes = sum(p.stat().st_size for p in slide_files.values())
+    if profile is not None:
+        slide_files = prepare_images(slide_files, run_dir, profile, workers=workers, reuse=reuse_derivatives)
+    embedded_bytes = sum(p.stat().st_size for p in slide_files.values())
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if streaming:
+        stats = write_pptx_streaming(slide_files, output_path, notes_by_number)
+        print(f"Streamed {stats['slides']} slides; {stats['media']} media part(s), {stats['shared_media']} shared.")
+    else:
+        _export_in_memory(slide_files, output_path, notes_by_number)
+
+    elapsed = time.perf_counter() - start
+    print(f"Saved PPTX: {output_path}")
+    print(
+        f"Images {source_bytes / 1e6:.1f} MB -> {embedded_bytes / 1e6:.1f} MB; "
+        f"PPTX {output_path.stat().st_size / 1e6:.1f} MB; export took {elapsed:.1f}s"
+    )
 
-    blank_layout = None
-    for layout in prs.slide_layouts:
-        if layout.name.lower() == "blank":
-            blank_layout = layout
-            break
-    if blank_layout is None:
-        blank_layout = prs.slide_layouts[0]
+    if verify:
+        problems = verify_pptx(output_path, slide_files, notes_by_number)
+        for problem in problems:
+            print(f"Verify: {problem}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+        print("Verify: python-pptx round trip OK")
+
+
+def _export_in_memory(slide_files: dict, output_path: Path, notes_by_number: dict):
+    """Build the whole deck with python-pptx and save it in one go."""
+    prs, blank_layout = new_presentation()
 
     for num in sorted(slide_files.keys()):
         img_path = slide_files[num]
@@ -99,9 +218,7 @@ def export_pptx(run_dir: Path, output_path: Path, notes_by_number: dict, use_4k:
                 tf = notes_slide.notes_text_frame
                 tf.text = note
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
     prs.save(str(output_path))
-    print(f"Saved PPTX: {output_path}")
 
 
 def main():
@@ -110,7 +227,39 @@ def main():
     parser.add_argument("--output", help="Output PPTX path (default: pptx/<run-dir-name>.pptx)")
     parser.add_argument("--yaml", help="Path to YAML outline for speaker notes (optional)")
     parser.add_argument("--use-4k", action="store_true", help="Prefer 4K images if available")
+    parser.add_argument(
+        "--profile",
+        choices=sorted(PROFILES),
+        default="original",
+        help="Image profile for embedded pictures (default: original). Flags below override it.",
+    )
+    parser.add_argument("--max-width", type=int, default=None, help="Downsample images wider than this many pixels")
+    parser.add_argument("--target-dpi", type=int, default=None, help="Downsample to this DPI at the 13.333in slide width")
+    parser.add_argument(
+        "--jpeg-quality",
+        type=int,
+        default=None,
+        help="JPEG quality for transcoded images (1-95); re-encodes as JPEG unless --format says otherwise",
+    )
+    parser.add_argument("--format", choices=["original", "jpeg", "png"], default=None, help="Re-encode images in this format")
+    parser.add_argument("--workers", type=int, default=None, help="Transcoding processes (default: CPU count)")
+    parser.add_argument(
+        "--no-reuse-derivatives",
+        action="store_true",
+        help=f"Re-transcode even if a matching derivative exists under <run-dir>/{DERIVATIVES_DIR}/",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Write slides and media straight into the .pptx zip (bounded memory for very large decks)",
+    )
+    parser.add_argument("--verify", action="store_true", help="Re-open the output with python-pptx and check slides, images and notes")
     args = parser.parse_args()
+    if args.jpeg_quality is not None:
+        if not 1 <= args.jpeg_quality <= 95:
+            parser.error("--jpeg-quality must be between 1 and 95")
+        if args.format in ("original", "png"):
+            parser.error(f"--jpeg-quality has no effect with --format {args.format}")
 
     run_dir = Path(args.run_dir)
     if not run_dir.is_absolute():
@@ -136,7 +285,35 @@ def main():
         if outline_path.exists():
             notes_by_number = load_notes(outline_path)
 
-    export_pptx(run_dir, output_path, notes_by_number, args.use_4k)
+    profile = dict(PROFILES[args.profile])
+    if args.target_dpi:
+        profile["max_width"] = round(args.target_dpi * SLIDE_WIDTH_IN)
+    if args.max_width:
+        profile["max_width"] = args.max_width
+    if args.jpeg_quality:
+        profile["jpeg_quality"] = args.jpeg_quality
+        if profile["format"] == "original":
+            # A quality only means something for a re-encode, so asking for one selects JPEG.
+            profile["format"] = "jpeg"
+    if args.format:
+        profile["format"] = args.format
+
+    export_pptx(
+        run_dir,
+        output_path,
+        notes_by_number,
+        args.use_4k,
+        profile=profile,
+        workers=args.workers,
+        reuse_derivatives=not args.no_reuse_derivatives,
+        streaming=args.streaming,
+        verify=args.verify,
+    )
+    # Exported runs are kept by run_gc.py.
+    try:
+        RunCatalog(project_root / "generated_slides").exported(run_dir, output_path)
+    except OSError as e:
+        print(f"Warning: could not record the export in the run catalog: {e}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,182 @@
+"""
+Local stand-in for the genai client used by benchmarks.
+
+FakeClient mimics the parts of google.genai.Client that the generators use
+(`models.generate_content_stream` and `aio.models.generate_content_stream`),
+sleeping for a configurable latency and returning a canned image payload, so
+throughput can be measured without an API key or spend.
+
+Latency can be fixed or drawn from a distribution (see latency_sampler), a
+fraction of requests can fail with 429 RESOURCE_EXHAUSTED or 500 INTERNAL
+errors shaped like the SDK's, and the response can be streamed as several
+chunks. Requests whose config asks for image_size "4K" (enlargement) get the
+4K payload.
+"""
+
+import asyncio
+import io
+import random
+import threading
+import time
+from functools import lru_cache
+from types import SimpleNamespace
+
+from PIL import Image
+
+# 429s come back quickly; other failures take the usual request latency.
+THROTTLE_LATENCY_FACTOR = 0.1
+
+
+@lru_cache(maxsize=None)
+def make_jpeg(width: int = 1376, height: int = 768, quality: int = 85, noisy: bool = False) -> bytes:
+    """
+    A decodable JPEG of the given size, roughly the shape of a 1K 16:9 slide.
+    noisy=True fills it with noise so the file is about as large as a real render.
+    """
+    buf = io.BytesIO()
+    if noisy:
+        noise = Image.effect_noise((width, height), 64)
+        im = Image.merge("RGB", (noise, noise.transpose(Image.Transpose.FLIP_LEFT_RIGHT), noise))
+    else:
+        im = Image.new("RGB", (width, height), (240, 240, 236))
+    im.save(buf, format="JPEG", quality=quality)
+    return buf.getvalue()
+
+
+def latency_sampler(spec):
+    """
+    Turn a latency spec into a function rng -> seconds. Accepts a number (fixed),
+    a callable, or a string: "0.5", "uniform:LOW:HIGH", "normal:MEAN:SD" or
+    "lognormal:MEDIAN:SIGMA".
+    """
+    if callable(spec):
+        return spec
+    if isinstance(spec, (int, float)):
+        return lambda rng: float(spec)
+    kind, _, params = str(spec).partition(":")
+    if not params:
+        value = float(kind)
+        return lambda rng: value
+    a, b = (float(x) for x in params.split(":"))
+    if kind == "uniform":
+        return lambda rng: rng.uniform(a, b)
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(a, b))
+    if kind == "lognormal":
+        return lambda rng: a * rng.lognormvariate(0.0, b)
+    raise ValueError(f"Unknown latency distribution '{kind}' (expected uniform, normal or lognormal)")
+
+
+class FakeAPIError(Exception):
+    """Shaped like google.genai.errors.APIError: the HTTP status is in .code."""
+
+    def __init__(self, code: int, status: str):
+        super().__init__(f"{code} {status}")
+        self.code = code
+        self.status = status
+
+
+def _image_chunk(payload: bytes, mime_type: str):
+    inline_data = SimpleNamespace(data=payload, mime_type=mime_type)
+    part = SimpleNamespace(text=None, inline_data=inline_data)
+    content = SimpleNamespace(parts=[part])
+    return SimpleNamespace(candidates=[SimpleNamespace(content=content)])
+
+
+def _empty_chunk():
+    return SimpleNamespace(candidates=[])
+
+
+def _image_size(config) -> str:
+    image_config = getattr(config, "image_config", None)
+    return getattr(image_config, "image_size", None) or "1K"
+
+
+class _FakeModels:
+    def __init__(self, client):
+        self._client = client
+
+    def generate_content_stream(self, model, contents, config):
+        delay, error, payload = self._client._plan(config)
+        if error is not None:
+            time.sleep(delay)
+            raise error
+        chunks = self._client.chunks
+        for i in range(1, chunks):
+            time.sleep(delay / chunks)
+            yield _empty_chunk()
+        time.sleep(delay / chunks)
+        yield _image_chunk(payload, self._client.mime_type)
+
+
+class _FakeAsyncModels:
+    def __init__(self, client):
+        self._client = client
+
+    async def generate_content_stream(self, model, contents, config):
+        delay, error, payload = self._client._plan(config)
+        if error is not None:
+            await asyncio.sleep(delay)
+            raise error
+        chunks = self._client.chunks
+
+        async def stream():
+            for i in range(1, chunks):
+                await asyncio.sleep(delay / chunks)
+                yield _empty_chunk()
+            await asyncio.sleep(delay / chunks)
+            yield _image_chunk(payload, self._client.mime_type)
+
+        return stream()
+
+
+class FakeClient:
+    """
+    Drop-in for genai.Client with configurable per-request latency (seconds, or a
+    spec for latency_sampler), error rates and stream chunking.
+    """
+
+    def __init__(
+        self,
+        latency=0.5,
+        payload: bytes = None,
+        mime_type: str = "image/jpeg",
+        payload_4k: bytes = None,
+        throttle_rate: float = 0.0,
+        error_rate: float = 0.0,
+        chunks: int = 1,
+        seed=None,
+    ):
+        self.latency = latency
+        self.payload = payload if payload is not None else make_jpeg()
+        self.payload_4k = payload_4k
+        self.mime_type = mime_type
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.chunks = max(1, int(chunks))
+        self.calls = 0
+        self.throttled = 0
+        self.errors = 0
+        self._sample_latency = latency_sampler(latency)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.models = _FakeModels(self)
+        self.aio = SimpleNamespace(models=_FakeAsyncModels(self))
+
+    def _plan(self, config):
+        """Decide one request's outcome: (latency, error or None, payload)."""
+        with self._lock:
+            self.calls += 1
+            delay = self._sample_latency(self._rng)
+            roll = self._rng.random()
+            if roll < self.throttle_rate:
+                self.throttled += 1
+                return delay * THROTTLE_LATENCY_FACTOR, FakeAPIError(429, "RESOURCE_EXHAUSTED"), None
+            if roll < self.throttle_rate + self.error_rate:
+                self.errors += 1
+                return delay, FakeAPIError(500, "INTERNAL"), None
+        if _image_size(config) == "4K":
+            if self.payload_4k is None:
+                self.payload_4k = make_jpeg(5504, 3072)
+            return delay, None, self.payload_4k
+        return delay, None, self.payload
@@ -4,15 +4,16 @@ Command-line tool for upscaling images to 4K using Gemini 3 Pro Image Preview.
 Takes a 1K image and regenerates it at 4K resolution while preserving content.
 """
 
-import sys
 import os
+import sys
 import argparse
 import mimetypes
 from pathlib import Path
 from dotenv import load_dotenv
-from google import genai
 from google.genai import types
 
+import genai_client
+
 # Load environment variables
 script_dir = Path(__file__).parent
 project_root = script_dir.parent
@@ -20,26 +21,28 @@ env_path = project_root / ".env"
 load_dotenv(env_path)
 
 def save_binary_file(file_name: str, data: bytes) -> None:
-    """Save binary data to disk."""
-    with open(file_name, "wb") as f:
+    """Save binary data to disk atomically, so a partial write never looks like a finished image."""
+    path = Path(file_name)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
         f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
     print(f"File saved to: {file_name}")
 
 def enlarge(
     image_path: str,
     output_path: str,
-) -> None:
-    """Upscale the given image to 4K."""
-    api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
-        print("Error: GEMINI_API_KEY environment variable not set", file=sys.stderr)
-        sys.exit(1)
-
+) -> str:
+    """
+    Upscale the given image to 4K and return output_path.
+    Raises on a missing input, an API error, or a response without an image.
+    """
     if not Path(image_path).exists():
-        print(f"Error: Input image not found: {image_path}", file=sys.stderr)
-        sys.exit(1)
+        raise FileNotFoundError(f"Input image not found: {image_path}")
 
-    client = genai.Client(api_key=api_key)
+    client = genai_client.get_client()
 
     # Read input image
     image_bytes = Path(image_path).expanduser().read_bytes()
@@ -74,27 +77,24 @@ def enlarge(
 
     print(f"Upscaling {image_path} to 4K...")
     
-    try:
-        # We only expect one image back
-        response_stream = client.models.generate_content_stream(
-            model="gemini-3-pro-image-preview",
-            contents=contents,
-            config=generate_content_config,
-        )
+    # We only expect one image back
+    response_stream = client.models.generate_content_stream(
+        model="gemini-3-pro-image-preview",
+        contents=contents,
+        config=generate_content_config,
+    )
 
-        for chunk in response_stream:
-            if not chunk.candidates or not chunk.candidates[0].content:
-                continue
+    for chunk in response_stream:
+        if not chunk.candidates or not chunk.candidates[0].content:
+            continue
 
-            for part in chunk.candidates[0].content.parts:
-                if getattr(part, "inline_data", None) and part.inline_data.data:
-                    inline_data = part.inline_data
-                    save_binary_file(output_path, inline_data.data)
-                    return # Done after saving first image
+        for part in chunk.candidates[0].content.parts:
+            if getattr(part, "inline_data", None) and part.inline_data.data:
+                inline_data = part.inline_data
+                save_binary_file(output_path, inline_data.data)
+                return output_path # Done after saving first image
 
-    except Exception as e:
-        print(f"Error during upscaling: {e}", file=sys.stderr)
-        sys.exit(1)
+    raise RuntimeError(f"No image returned while upscaling {image_path}")
 
 def main():
     parser = argparse.ArgumentParser(description="Upscale image to 4K")
@@ -103,7 +103,11 @@ def main():
     
     args = parser.parse_args()
     
-    enlarge(args.input, args.output)
+    try:
+        enlarge(args.input, args.output)
+    except Exception as e:
+        print(f"Error during upscaling: {e}", file=sys.stderr)
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
@@ -12,38 +12,38 @@ import os
 import sys
 
 from dotenv import load_dotenv
-from google import genai
 from google.genai import types
 
+import genai_client
+
 # Load environment variables from .env file (in project root)
 script_dir = Path(__file__).parent
 project_root = script_dir.parent
 env_path = project_root / ".env"
 load_dotenv(env_path)
 
+MODEL = "gemini-3-pro-image-preview"
+
 
 def save_binary_file(file_name: str, data: bytes) -> None:
-    """Save binary data to disk."""
-    with open(file_name, "wb") as f:
+    """Save binary data to disk atomically, so a partial write never looks like a finished image."""
+    path = Path(file_name)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
         f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
     print(f"File saved to: {file_name}")
 
 
-def generate(
+def _build_request(
     prompt: str,
-    image_paths: Optional[List[str]] = None,
-    output_prefix: str = "output",
-    image_size: str = "1K", # kept in signature for compatibility but ignored
-    aspect_ratio: Optional[str] = None,
-) -> None:
-    """Send text (and optionally images) to Gemini 3 Pro Image Preview and stream responses."""
-    api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
-        print("Error: GEMINI_API_KEY or GOOGLE_API_KEY environment variable not set", file=sys.stderr)
-        sys.exit(1)
-
-    client = genai.Client(api_key=api_key)
-
+    image_paths: Optional[List[str]],
+    image_size: Optional[str],
+    aspect_ratio: Optional[str],
+):
+    """Build (contents, config) for a generate_content_stream call."""
     # Build content parts
     parts = [types.Part.from_text(text=prompt)]
     
@@ -79,25 +79,72 @@ def generate(
         response_modalities=["IMAGE", "TEXT"],
         image_config=types.ImageConfig(**image_config_dict),
     )
+    return contents, generate_content_config
+
+
+def _save_chunk(chunk, output_prefix: str, saved_files: List[str]) -> None:
+    """Print text parts and save image parts of one streamed chunk as <output_prefix>_<i><ext>."""
+    if not chunk.candidates or not chunk.candidates[0].content:
+        return
+
+    for part in chunk.candidates[0].content.parts:
+        if getattr(part, "text", None):
+            print(part.text, end="", flush=True)
+        elif getattr(part, "inline_data", None) and part.inline_data.data:
+            inline_data = part.inline_data
+            file_extension = mimetypes.guess_extension(inline_data.mime_type) or ".png"
+            file_name = f"{output_prefix}_{len(saved_files)}{file_extension}"
+            save_binary_file(file_name, inline_data.data)
+            saved_files.append(file_name)
 
-    file_index = 0
+
+def generate(
+    prompt: str,
+    image_paths: Optional[List[str]] = None,
+    output_prefix: str = "output",
+    image_size: str = "1K", # kept in signature for compatibility but ignored
+    aspect_ratio: Optional[str] = None,
+    model: str = MODEL,
+) -> List[str]:
+    """
+    Send text (and optionally images) to Gemini 3 Pro Image Preview (or another
+    image model) and stream responses. Returns the paths of the image files written.
+    """
+    client = genai_client.get_client()
+    contents, generate_content_config = _build_request(prompt, image_paths, image_size, aspect_ratio)
+
+    saved_files = []
     for chunk in client.models.generate_content_stream(
-        model="gemini-3-pro-image-preview",
+        model=model,
+        contents=contents,
+        config=generate_content_config,
+    ):
+        _save_chunk(chunk, output_prefix, saved_files)
+
+    return saved_files
+
+
+async def generate_async(
+    prompt: str,
+    image_paths: Optional[List[str]] = None,
+    output_prefix: str = "output",
+    image_size: str = "1K",
+    aspect_ratio: Optional[str] = None,
+    model: str = MODEL,
+) -> List[str]:
+    """Async variant of generate() using the genai async client (client.aio)."""
+    client = genai_client.get_client()
+    contents, generate_content_config = _build_request(prompt, image_paths, image_size, aspect_ratio)
+
+    saved_files = []
+    async for chunk in await client.aio.models.generate_content_stream(
+        model=model,
         contents=contents,
         config=generate_content_config,
     ):
-        if not chunk.candidates or not chunk.candidates[0].content:
-            continue
+        _save_chunk(chunk, output_prefix, saved_files)
 
-        for part in chunk.candidates[0].content.parts:
-            if getattr(part, "text", None):
-                print(part.text, end="", flush=True)
-            elif getattr(part, "inline_data", None) and part.inline_data.data:
-                inline_data = part.inline_data
-                file_extension = mimetypes.guess_extension(inline_data.mime_type) or ".png"
-                file_name = f"{output_prefix}_{file_index}{file_extension}"
-                file_index += 1
-                save_binary_file(file_name, inline_data.data)
+    return saved_files
 
 
 def main():
@@ -159,13 +206,17 @@ Examples:
     
     args = parser.parse_args()
     
-    generate(
-        prompt=args.prompt,
-        image_paths=args.input,
-        output_prefix=args.output,
-        image_size=args.size,
-        aspect_ratio=args.aspect_ratio,
-    )
+    try:
+        generate(
+            prompt=args.prompt,
+            image_paths=args.input,
+            output_prefix=args.output,
+            image_size=args.size,
+            aspect_ratio=args.aspect_ratio,
+        )
+    except Exception as e:
+        print(f"Error during generation: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
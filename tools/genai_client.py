@@ -0,0 +1,113 @@
+"""
+Shared genai.Client provider.
+
+Building a genai.Client per request means a new HTTP connection pool, TLS
+handshake and auth setup for every slide. get_client() instead returns one
+lazily built, process-wide client whose keep-alive pool is shared by all worker
+threads (httpx clients are thread-safe) and by the async engine via client.aio.
+
+configure() replaces the settings for the next client: pool limits, a base URL
+or httpx transport (e.g. a local HTTP stub or httpx.MockTransport), or a whole
+client factory (e.g. fake_genai.FakeClient for benchmarks).
+
+The async side of a client binds to the first event loop that uses it; call
+reset_client() between separate asyncio.run() invocations.
+"""
+
+import os
+import threading
+
+DEFAULT_MAX_CONNECTIONS = 64
+DEFAULT_KEEPALIVE_EXPIRY = 60.0
+
+_lock = threading.Lock()
+_client = None
+_settings = {
+    "factory": None,
+    "base_url": None,
+    "transport": None,
+    "async_transport": None,
+    "max_connections": DEFAULT_MAX_CONNECTIONS,
+    "keepalive_expiry": DEFAULT_KEEPALIVE_EXPIRY,
+}
+
+
+def configure(
+    factory=None,
+    base_url=None,
+    transport=None,
+    async_transport=None,
+    max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+) -> None:
+    """Set how the shared client is built and drop any existing one."""
+    global _client
+    with _lock:
+        _settings.update(
+            factory=factory,
+            base_url=base_url,
+            transport=transport,
+            async_transport=async_transport,
+            max_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        _client = None
+
+
+def reset_client() -> None:
+    """Drop the shared client; the next get_client() builds a fresh one."""
+    global _client
+    with _lock:
+        _client = None
+
+
+def build_client():
+    """
+    Build a new client from the current settings (get_client() caches the result).
+    Raises RuntimeError without an API key: this runs inside worker threads and the
+    event loop, so it is reported per slide and CLI entry points exit non-zero.
+    """
+    if _settings["factory"] is not None:
+        return _settings["factory"]()
+
+    import httpx
+    from google import genai
+    from google.genai import types
+
+    api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
+    if not api_key:
+        raise RuntimeError("GEMINI_API_KEY or GOOGLE_API_KEY environment variable not set")
+
+    client_args = {
+        "limits": httpx.Limits(
+            max_connections=_settings["max_connections"],
+            max_keepalive_connections=_settings["max_connections"],
+            keepalive_expiry=_settings["keepalive_expiry"],
+        ),
+    }
+    if _settings["transport"] is not None:
+        client_args["transport"] = _settings["transport"]
+    # The async client may be backed by aiohttp rather than httpx, so only pass
+    # arguments through when a transport was explicitly injected.
+    async_client_args = {}
+    if _settings["async_transport"] is not None:
+        async_client_args["transport"] = _settings["async_transport"]
+
+    http_options = types.HttpOptions(
+        base_url=_settings["base_url"],
+        client_args=client_args,
+        async_client_args=async_client_args or None,
+    )
+    return genai.Client(api_key=api_key, http_options=http_options)
+
+
+def get_client():
+    """Return the shared client, building it on first use (thread-safe)."""
+    global _client
+    client = _client
+    if client is not None:
+        return client
+    with _lock:
+        if _client is None:
+            _client = build_client()
+        return _client
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Render several outlines as one batch.
+
+Slides from every outline go into a single queue that is drained round-robin
+across decks, under one scheduler (one adaptive concurrency limit and one
+requests-per-minute quota) and one render cache. Each deck still gets its own
+generated_slides/<yaml-stem>/<timestamp> run with manifest, PDF and index.
+
+Per-deck settings (style_pack, mode) can be put in <outline-stem>.deck.yaml
+next to the outline. Shared settings (concurrency, engine, rpm, ...) come from
+the repo deck.yaml and the CLI.
+
+Examples:
+  python tools/generate_batch.py outlines/
+  python tools/generate_batch.py "outlines/module_*.yaml" --rpm 60 --incremental
+"""
+
+import argparse
+import asyncio
+import glob
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import run_catalog
+import run_journal
+import run_manifest
+from generate_slides import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_RETRIES,
+    ENGINES,
+    build_blob_store,
+    build_cache,
+    build_run_artifacts,
+    build_scheduler,
+    collect_run_images,
+    generate_slide,
+    generate_slide_async,
+    load_deck_config,
+    manifest_entry,
+    parse_slides,
+    plan_incremental,
+    resolve_style,
+)
+from scheduler import FairQueue
+
+DECK_CONFIG_SUFFIX = ".deck.yaml"
+
+
+def expand_outlines(patterns) -> list:
+    """Resolve directories, files and glob patterns to a sorted list of outline YAMLs."""
+    found = set()
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            candidates = list(path.glob("*.yaml")) + list(path.glob("*.yml"))
+        elif path.is_file():
+            candidates = [path]
+        else:
+            candidates = [Path(p) for p in glob.glob(pattern)]
+        for candidate in candidates:
+            if not candidate.name.endswith(DECK_CONFIG_SUFFIX):
+                found.add(candidate.resolve())
+    return sorted(found)
+
+
+class Deck:
+    """One outline in the batch: its settings, run directory and results."""
+
+    def __init__(self, outline_path: Path, output_dir: Path, style_pack_name: str, mode: str, style):
+        self.outline_path = outline_path
+        self.name = outline_path.stem
+        self.output_dir = output_dir
+        self.style_pack_name = style_pack_name
+        self.mode = mode
+        self.style_text, self.base_style_name, self.auto_style_refs = style
+        self.slides = []
+        self.manifest_entries = {}
+        self.reused = 0
+        self.rendered = 0
+        self.failed = 0
+        self.started = None
+        self.finished = None
+        self.slide_args = ()
+        self.journal = run_journal.RunJournal(output_dir)
+        self.journal.start(outline_path, style_pack_name, mode)
+
+    def bind(self, project_root, cache, scheduler) -> None:
+        """Set the generate_slide arguments shared by every slide of this deck."""
+        self.slide_args = (
+            self.style_text,
+            self.base_style_name,
+            self.output_dir,
+            project_root,
+            self.mode,
+            self.auto_style_refs,
+            cache,
+            scheduler,
+        )
+
+    def record(self, slide, result) -> None:
+        if result["ok"]:
+            self.rendered += 1
+            self.manifest_entries[slide["number"]] = manifest_entry(slide, result)
+            self.journal.done(slide["number"], self.manifest_entries[slide["number"]])
+        else:
+            self.failed += 1
+            self.journal.failed(slide["number"], result["error"])
+        self.finished = time.monotonic()
+
+    def wall_time(self) -> float:
+        if self.started is None:
+            return 0.0
+        return self.finished - self.started
+
+
+def _drain_threaded(queue, workers, decks):
+    def worker():
+        while True:
+            job = queue.get()
+            if job is None:
+                return
+            name, slide = job
+            deck = decks[name]
+            if deck.started is None:
+                deck.started = time.monotonic()
+            deck.record(slide, generate_slide(slide, *deck.slide_args))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(worker) for _ in range(workers)]:
+            future.result()
+
+
+async def _drain_async(queue, workers, decks):
+    async def worker():
+        while True:
+            job = queue.get()
+            if job is None:
+                return
+            name, slide = job
+            deck = decks[name]
+            if deck.started is None:
+                deck.started = time.monotonic()
+            deck.record(slide, await generate_slide_async(slide, *deck.slide_args))
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+
+def drain(engine, queue, workers, decks):
+    """Render every queued (deck name, slide) job with at most `workers` in flight."""
+    if engine == "async":
+        asyncio.run(_drain_async(queue, workers, decks))
+    else:
+        _drain_threaded(queue, workers, decks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate several decks with one shared worker pool")
+    parser.add_argument("outlines", nargs="+", help="Outline YAML files, directories of outlines, or glob patterns")
+    parser.add_argument(
+        "--style",
+        type=str,
+        default=None,
+        help="Optional override for every deck's style_pack (<stem>.deck.yaml, then deck.yaml).",
+    )
+    parser.add_argument(
+        "--mode",
+        type=str,
+        default=None,
+        choices=["structured", "balanced", "expressive"],
+        help="Optional override for every deck's mode (<stem>.deck.yaml, then deck.yaml).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Per deck, only regenerate slides that changed since that outline's latest run; link the rest.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help=f"Optional override for deck.yaml concurrency. Slides rendered at once across all decks to start with (default: {DEFAULT_CONCURRENCY}).",
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default=None,
+        choices=sorted(ENGINES),
+        help="Optional override for deck.yaml engine. 'async' (default) or 'threads'.",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        default=None,
+        help="Optional override for deck.yaml rpm. Requests-per-minute quota shared by all decks (default: unpaced).",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=None,
+        help=f"Optional override for deck.yaml max_concurrency. Upper bound for adaptive concurrency (default: {DEFAULT_MAX_CONCURRENCY}).",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=None,
+        help=f"Optional override for deck.yaml retries. Retries per slide on 429/5xx errors (default: {DEFAULT_RETRIES}).",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always call the API, bypassing the render cache.")
+    parser.add_argument(
+        "--no-dedupe",
+        action="store_true",
+        help="Do not deduplicate the runs' files into the blob store (generated_slides/.blobs/).",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=None,
+        help="Optional override for deck.yaml cache_max_mb. Render cache size limit; least-recently-used entries are evicted.",
+    )
+    args = parser.parse_args()
+
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    base_output = project_root / "generated_slides"
+    deck_cfg = load_deck_config(project_root / "deck.yaml")
+
+    outline_paths = expand_outlines(args.outlines)
+    if not outline_paths:
+        print("Error: no outline YAMLs matched.", file=sys.stderr)
+        sys.exit(1)
+    stems = [p.stem for p in outline_paths]
+    duplicates = sorted({stem for stem in stems if stems.count(stem) > 1})
+    if duplicates:
+        print(f"Error: outlines share a name and would write to the same run folder: {', '.join(duplicates)}", file=sys.stderr)
+        sys.exit(1)
+
+    engine = args.engine or deck_cfg.get("engine") or "async"
+    if engine not in ENGINES:
+        print(f"Error: unknown engine '{engine}' (expected one of: {', '.join(sorted(ENGINES))})", file=sys.stderr)
+        sys.exit(1)
+    concurrency = max(1, int(args.concurrency or deck_cfg.get("concurrency") or DEFAULT_CONCURRENCY))
+    scheduler = build_scheduler(args, deck_cfg, concurrency)
+    cache = build_cache(args, deck_cfg, base_output)
+    blobs = build_blob_store(args, deck_cfg, base_output)
+
+    # Per deck: <stem>.deck.yaml overrides deck.yaml; CLI overrides both. Styles are loaded once per pack.
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    catalog = run_catalog.RunCatalog(base_output)
+    styles = {}
+    decks = {}
+    queue = FairQueue()
+    for outline_path in outline_paths:
+        own_cfg = load_deck_config(outline_path.with_name(outline_path.stem + DECK_CONFIG_SUFFIX))
+        style_pack_name = args.style or own_cfg.get("style_pack") or deck_cfg.get("style_pack") or "glass_garden"
+        mode = args.mode or own_cfg.get("mode") or deck_cfg.get("mode") or "balanced"
+        if style_pack_name not in styles:
+            styles[style_pack_name] = resolve_style(style_pack_name, project_root)
+
+        output_dir = base_output / outline_path.stem / stamp
+        output_dir.mkdir(parents=True, exist_ok=True)
+        deck = Deck(outline_path, output_dir, style_pack_name, mode, styles[style_pack_name])
+        catalog.started(output_dir, outline_path, style_pack_name, mode)
+        deck.slides = parse_slides(str(outline_path), mode=mode)
+
+        slides_to_render = deck.slides
+        if args.incremental:
+            print(f"[{deck.name}] ", end="")
+            deck.manifest_entries, slides_to_render = plan_incremental(
+                deck.slides, output_dir, deck.style_text, deck.base_style_name, project_root, mode, deck.auto_style_refs
+            )
+            deck.reused = len(deck.manifest_entries)
+            for num, entry in deck.manifest_entries.items():
+                deck.journal.done(num, entry)
+
+        for slide in slides_to_render:
+            queue.put(deck.name, slide)
+        deck.bind(project_root, cache, scheduler)
+        decks[deck.name] = deck
+        print(f"[{deck.name}] {len(slides_to_render)} slide(s) to generate with style '{style_pack_name}' ({mode}) -> {output_dir}")
+
+    total = len(queue)
+    print(f"Batch: {total} slide(s) across {len(decks)} deck(s), engine '{engine}'.")
+    batch_start = time.monotonic()
+    # As in generate_slides, the scheduler gates in-flight calls; workers only cap at its maximum.
+    drain(engine, queue, max(1, min(total, scheduler.max_concurrency)), decks)
+    batch_elapsed = time.monotonic() - batch_start
+    print(scheduler.summary())
+    if cache is not None:
+        print(cache.summary())
+
+    for deck in decks.values():
+        run_manifest.write_manifest(deck.output_dir, deck.outline_path, deck.base_style_name, deck.mode, deck.manifest_entries)
+        build_run_artifacts(deck.output_dir, collect_run_images(deck.output_dir, deck.slides), blobs=blobs)
+        catalog.finished(deck.output_dir, len(deck.slides), len(deck.manifest_entries), deck.failed)
+
+    print(f"\n{'deck':<28} {'rendered':>8} {'reused':>6} {'failed':>6} {'wall s':>8} {'slides/min':>10}")
+    for deck in decks.values():
+        wall = deck.wall_time()
+        rate = 60 * deck.rendered / wall if wall > 0 else 0.0
+        print(f"{deck.name:<28} {deck.rendered:>8} {deck.reused:>6} {deck.failed:>6} {wall:>8.1f} {rate:>10.1f}")
+    rendered = sum(deck.rendered for deck in decks.values())
+    rate = 60 * rendered / batch_elapsed if batch_elapsed > 0 else 0.0
+    print(
+        f"{'total':<28} {rendered:>8} {sum(d.reused for d in decks.values()):>6} {sum(d.failed for d in decks.values()):>6} "
+        f"{batch_elapsed:>8.1f} {rate:>10.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
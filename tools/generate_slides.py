@@ -1,15 +1,32 @@
 import argparse
+import asyncio
+import hashlib
+import json
 import sys
 import os
 import re
+import shutil
+import threading
+import time
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 import yaml
-from PIL import Image
 
 # Import gemini_generate_image from the same directory
+import blob_store
+import gemini_enlarge_image
+import draft_render
 import gemini_generate_image
+import outline_cache
+import pdf_writer
+import render_cache
+import run_catalog
+import run_gallery
+import run_journal
+import run_manifest
+from scheduler import Scheduler
 
 
 def load_style(style_name: str, project_root: Path) -> str:
@@ -108,75 +125,156 @@ def _format_text_block(text_field, mode: str = "balanced") -> str:
     return "\n".join(lines).strip()
 
 
-def _parse_yaml_outline(outline_path, specific_slides=None, mode: str = "balanced"):
+# libyaml's C parser is several times faster on large outlines; fall back to pure Python.
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class Slide(dict):
+    """
+    A parsed slide. 'content' (the slide's YAML document re-dumped) is only
+    needed for display, so it is built on first access instead of at parse time.
+    """
+
+    def __init__(self, fields, doc):
+        super().__init__(fields)
+        self.doc = doc
+
+    def __missing__(self, key):
+        if key != "content":
+            raise KeyError(key)
+        value = self["content"] = yaml.safe_dump(self.doc, sort_keys=False)
+        return value
+
+    def get(self, key, default=None):
+        if key in self or key == "content":
+            return self[key]
+        return default
+
+
+def _iter_outline_docs(outline_path, mode: str = "balanced", loader=YAML_LOADER):
     """
     Parse YAML-style outline: multi-doc separated by ---.
+    Yields (fields, doc) for every slide with generate: true, one document at a time.
     """
     with open(outline_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+        index = 0
+        for doc in yaml.load_all(f, Loader=loader):
+            if not doc:
+                continue
+            index += 1
+            slide_num = doc.get("slide", index)
+
+            generate_flag = doc.get("generate", True)
+            if not generate_flag:
+                continue
+
+            style_value = doc.get("style")
+            layout_value = (doc.get("layout") or "full").lower()
+            visual = doc.get("visual", "") or ""
+            notes = doc.get("notes", "") or ""
+            image_only = bool(doc.get("image_only", False))
+
+            assets_field = doc.get("assets") or []
+            if isinstance(assets_field, str):
+                assets = [assets_field]
+            elif isinstance(assets_field, list):
+                assets = assets_field
+            else:
+                assets = []
 
-    slides = []
-    raw_docs = list(yaml.safe_load_all(content))
-    index = 0
-    for doc in raw_docs:
-        if not doc:
-            continue
-        index += 1
-        slide_num = doc.get("slide", index)
-        if specific_slides and slide_num not in specific_slides:
-            continue
+            style_ref_field = doc.get("style_ref") or []
+            if isinstance(style_ref_field, str):
+                style_refs = [style_ref_field]
+            elif isinstance(style_ref_field, list):
+                style_refs = style_ref_field
+            else:
+                style_refs = []
 
-        generate_flag = doc.get("generate", True)
-        if not generate_flag:
-            continue
+            text_block = _format_text_block(doc.get("text"), mode=mode)
 
-        style_value = doc.get("style")
-        layout_value = (doc.get("layout") or "full").lower()
-        visual = doc.get("visual", "") or ""
-        notes = doc.get("notes", "") or ""
-        image_only = bool(doc.get("image_only", False))
-
-        assets_field = doc.get("assets") or []
-        if isinstance(assets_field, str):
-            assets = [assets_field]
-        elif isinstance(assets_field, list):
-            assets = assets_field
-        else:
-            assets = []
+            yield ({
+                'number': slide_num,
+                'title': doc.get("title", f"Slide {slide_num}"),
+                'subtitle': doc.get("subtitle", ""),
+                'doc_hash': run_manifest.doc_hash(doc),
+                'asset_paths': assets,
+                'style_refs': style_refs,
+                'style': style_value,
+                'layout': layout_value,
+                'text': text_block,
+                'text_raw': doc.get("text") or {},
+                'visual': visual.strip(),
+                'notes': notes.strip(),
+                'image_only': image_only,
+                'type': doc.get("type", "content"),
+            }, doc)
 
-        style_ref_field = doc.get("style_ref") or []
-        if isinstance(style_ref_field, str):
-            style_refs = [style_ref_field]
-        elif isinstance(style_ref_field, list):
-            style_refs = style_ref_field
-        else:
-            style_refs = []
 
-        text_block = _format_text_block(doc.get("text"), mode=mode)
+_NULL_VALUES = ("", "~", "null", "Null", "NULL")
 
-        content_dump = yaml.safe_dump(doc, sort_keys=False)
 
-        slides.append({
-            'number': slide_num,
-            'title': doc.get("title", f"Slide {slide_num}"),
-            'subtitle': doc.get("subtitle", ""),
-            'content': content_dump,
-            'asset_paths': assets,
-            'style_refs': style_refs,
-            'style': style_value,
-            'layout': layout_value,
-            'text': text_block,
-            'text_raw': doc.get("text") or {},
-            'visual': visual.strip(),
-            'notes': notes.strip(),
-            'image_only': image_only,
-            'type': doc.get("type", "content"),
-        })
-    return slides
+def check_outline(outline_path, loader=YAML_LOADER) -> None:
+    """
+    Raise yaml.YAMLError if reading the outline would fail partway through: a syntax
+    error, a tag the safe loader cannot construct, or a slide that is not a mapping.
+    Only the parser's event stream is read (no nodes or Python objects are built),
+    about a third of the cost of a full load, so a lazily parsed outline is known to
+    be readable before any slide is sent to the API.
+    """
+    constructors = yaml.SafeLoader.yaml_constructors
+    root_next = False
+    with open(outline_path, 'r', encoding='utf-8') as f:
+        events = yaml.parse(f, Loader=loader)
+        for event in events:
+            tag = getattr(event, "tag", None)
+            if tag is not None and tag != "!" and tag not in constructors:
+                raise yaml.constructor.ConstructorError(
+                    None, None, f"could not determine a constructor for the tag {tag!r}", event.start_mark
+                )
+            if isinstance(event, yaml.DocumentStartEvent):
+                root_next = True
+            elif root_next:
+                root_next = False
+                if isinstance(event, yaml.SequenceStartEvent):
+                    empty = isinstance(next(events), yaml.SequenceEndEvent)
+                else:
+                    empty = isinstance(event, yaml.ScalarEvent) and event.value in _NULL_VALUES
+                if not (isinstance(event, yaml.MappingStartEvent) or empty):
+                    raise yaml.constructor.ConstructorError(
+                        None, None, "expected a mapping for a slide", event.start_mark
+                    )
+
+
+def iter_slides(outline_path, specific_slides=None, mode: str = "balanced", use_cache: bool = True, check: bool = True):
+    """
+    Return an iterator of slides that yields them as their YAML documents are parsed, so
+    callers can start rendering before a large outline has been read to the end. An
+    unchanged outline is served from the parsed-outline cache (see outline_cache); a fully
+    read one is stored there. Otherwise the outline is first checked (see check_outline),
+    so a broken document late in the file raises yaml.YAMLError here, not after the
+    slides before it were rendered.
+    """
+    key = outline_cache.stamp(outline_path, mode) if use_cache else None
+    parsed = outline_cache.load(key)
+    if parsed is not None:
+        return (Slide(fields, doc) for fields, doc in parsed if not specific_slides or fields['number'] in specific_slides)
+    if check:
+        check_outline(outline_path)
+    return _parse_and_store(outline_path, key, specific_slides, mode)
+
 
+def _parse_and_store(outline_path, key, specific_slides, mode):
+    parsed = []
+    for fields, doc in _iter_outline_docs(outline_path, mode=mode):
+        parsed.append((fields, doc))
+        if not specific_slides or fields['number'] in specific_slides:
+            yield Slide(fields, doc)
+    outline_cache.store(key, parsed)
 
-def parse_slides(outline_path, start_slide=1, end_slide=None, specific_slides=None, mode: str = "balanced"):
-    return _parse_yaml_outline(outline_path, specific_slides=specific_slides, mode=mode)
+
+def parse_slides(outline_path, start_slide=1, end_slide=None, specific_slides=None, mode: str = "balanced", use_cache: bool = True):
+    # Read to the end before returning, so there is nothing to check up front.
+    return list(iter_slides(outline_path, specific_slides=specific_slides, mode=mode, use_cache=use_cache, check=False))
 
 
 def _layout_hint(layout: str) -> str:
@@ -213,9 +311,11 @@ def _variant_hint(variant: str) -> str:
     return ""
 
 
-def generate_slide(slide, style_text, style_pack_name, output_dir, project_root, mode, global_style_refs):
-    print(f"Starting generation for Slide {slide['number']}...")
-
+def build_slide_prompt(slide, style_text, style_pack_name, project_root, mode, global_style_refs, verbose=True):
+    """
+    Build the full prompt for one slide and resolve its input images.
+    Returns (prompt, image_inputs); missing assets are skipped with a warning.
+    """
     # Pack comes from CLI; slide-level style is treated as a variant only.
     # Pack comes from CLI/deck; slide-level style is treated as a variant only.
     raw_variant = slide.get('style')
@@ -339,40 +439,670 @@ def generate_slide(slide, style_text, style_pack_name, output_dir, project_root,
 
     prompt = "\n".join(prompt_parts)
 
-    image_inputs = []
-    combined_inputs = []
-    if style_refs:
-        combined_inputs.extend(style_refs)
-    if slide.get('asset_paths'):
-        combined_inputs.extend(slide['asset_paths'])
-
-    if combined_inputs:
-        for path_str in combined_inputs:
-            if not os.path.isabs(path_str):
-                asset_path = project_root / path_str
-            else:
-                asset_path = Path(path_str)
+    image_inputs, missing = resolve_image_inputs(slide, global_style_refs, project_root)
+    for asset_path in image_inputs:
+        if verbose:
+            print(f"  Using asset: {asset_path}")
+        prompt += f"\nNOTE: Incorporate the provided reference image ({Path(asset_path).name}) into the design as described."
+    if verbose:
+        for asset_path in missing:
+            print(f"  WARNING: Asset file not found at {asset_path}. Skipping this asset.")
+
+    return prompt, image_inputs
 
-            if asset_path.exists():
-                print(f"  Using asset: {asset_path}")
-                prompt += f"\nNOTE: Incorporate the provided reference image ({asset_path.name}) into the design as described."
-                image_inputs.append(str(asset_path))
-            else:
-                print(f"  WARNING: Asset file not found at {asset_path}. Skipping this asset.")
 
-    output_filename = os.path.join(str(output_dir), f"slide_{slide['number']:02d}")
+def resolve_image_inputs(slide, global_style_refs, project_root):
+    """
+    Resolve a slide's style refs (explicit or global) and assets against project_root.
+    Returns (found, missing) lists of path strings, in prompt order.
+    """
+    combined_inputs = list(slide.get("style_refs") or global_style_refs or [])
+    combined_inputs.extend(slide.get("asset_paths") or [])
 
+    found, missing = [], []
+    for path_str in combined_inputs:
+        if not os.path.isabs(path_str):
+            asset_path = project_root / path_str
+        else:
+            asset_path = Path(path_str)
+        (found if asset_path.exists() else missing).append(str(asset_path))
+    return found, missing
+
+
+def prompt_hash(prompt, image_inputs, image_size="1K", aspect_ratio="16:9", model=None, legacy=False):
+    """
+    Hash of everything that determines a slide render (see render_cache.render_key).
+    With legacy, the hash manifests and the cache recorded before input digests were memoised.
+    """
+    model = model or gemini_generate_image.MODEL
+    if legacy:
+        return render_cache.legacy_render_key(prompt, image_inputs, model, image_size, aspect_ratio)
+    return render_cache.render_key(prompt, image_inputs, model, image_size, aspect_ratio, file_digest=input_digest)
+
+
+# Render tiers: the model and image size every slide of a run is rendered with.
+# A --preview run uses a faster, cheaper model for early review; --promote then
+# re-renders chosen slides of it at full quality from their request records.
+FULL_TIER = {"name": "full", "model": gemini_generate_image.MODEL, "image_size": "1K"}
+DEFAULT_PREVIEW_MODEL = "gemini-2.5-flash-image"
+PROMOTE_SIZES = ("1K", "2K", "4K")
+REQUESTS_DIR = "requests"
+PREVIEW_DIR = "preview"
+
+
+def build_tier(args, deck_cfg, run_record):
+    """Render tier: a resumed run keeps its own; otherwise CLI > deck.yaml > full quality."""
+    if run_record.get("tier"):
+        return run_record["tier"]
+    if not args.preview:
+        return dict(FULL_TIER)
+    return {
+        "name": "preview",
+        "model": args.preview_model or deck_cfg.get("preview_model") or DEFAULT_PREVIEW_MODEL,
+        # None leaves the size to the model, which for the preview model is its smallest.
+        "image_size": args.preview_size or deck_cfg.get("preview_size"),
+    }
+
+
+def _slide_request(slide, style_text, style_pack_name, output_dir, project_root, mode, global_style_refs, tier=None):
+    """Keyword arguments for gemini_generate_image.generate / generate_async for one slide."""
+    tier = tier or FULL_TIER
+    prompt, image_inputs = build_slide_prompt(slide, style_text, style_pack_name, project_root, mode, global_style_refs)
+    return {
+        "prompt": prompt,
+        "image_paths": image_inputs if image_inputs else None,
+        "output_prefix": os.path.join(str(output_dir), f"slide_{slide['number']:02d}"),
+        "image_size": tier["image_size"],
+        "aspect_ratio": "16:9",
+        "model": tier["model"],
+    }
+
+
+@lru_cache(maxsize=256)
+def _input_digest(path, mtime_ns, size) -> str:
+    # Keyed on mtime and size as well, so a style ref shared by every slide is read once.
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def input_digest(path) -> str:
+    """sha256 of an input image's bytes."""
+    st = os.stat(path)
+    return _input_digest(str(path), st.st_mtime_ns, st.st_size)
+
+
+def write_request_record(number, request, key, output_dir) -> None:
+    """
+    Save the exact request a slide was rendered from as <run>/requests/slide_XX.json,
+    with a digest of every input image, so --promote can replay it later.
+    """
+    record = {
+        "number": number,
+        "prompt": request["prompt"],
+        "image_paths": request["image_paths"],
+        "input_digests": {p: input_digest(p) for p in request["image_paths"] or []},
+        "aspect_ratio": request["aspect_ratio"],
+        "model": request["model"],
+        "image_size": request["image_size"],
+        "prompt_hash": key,
+    }
+    requests_dir = Path(output_dir) / REQUESTS_DIR
+    requests_dir.mkdir(exist_ok=True)
+    path = requests_dir / f"slide_{number:02d}.json"
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(record, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def load_request_record(output_dir, number):
+    """The request record saved for a slide of a run, or None."""
+    path = Path(output_dir) / REQUESTS_DIR / f"slide_{number:02d}.json"
     try:
-        gemini_generate_image.generate(
-            prompt=prompt,
-            image_paths=image_inputs if image_inputs else None,
-            output_prefix=output_filename,
-            image_size="1K",
-            aspect_ratio="16:9"
-        )
-        print(f"Finished Slide {slide['number']}")
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _serve_cached(slide, request, result, cache) -> bool:
+    """Record the slide's prompt hash and serve it from the render cache if possible."""
+    fields = (request["prompt"], request["image_paths"], request["image_size"], request["aspect_ratio"], request["model"])
+    key = prompt_hash(*fields)
+    result["prompt_hash"] = key
+    if cache is None:
+        return False
+    cached = cache.fetch(key, request["output_prefix"], legacy_key=lambda: prompt_hash(*fields, legacy=True))
+    if not cached:
+        return False
+    result.update(files=cached, ok=True)
+    print(f"Finished Slide {slide['number']} (cached)")
+    return True
+
+
+def _record_render(slide, request, result, cache, saved) -> None:
+    if cache is not None:
+        cache.store(result["prompt_hash"], request["output_prefix"], saved)
+    result.update(files=saved, ok=bool(saved), error=None if saved else "no image returned")
+    print(f"Finished Slide {slide['number']}")
+
+
+def generate_slide(slide, style_text, style_pack_name, output_dir, project_root, mode, global_style_refs, cache=None, scheduler=None, tier=None):
+    """
+    Render one slide into output_dir.
+    Returns a result dict (number, prompt_hash, files, ok, error) used for the run manifest.
+    """
+    print(f"Starting generation for Slide {slide['number']}...")
+    request = _slide_request(slide, style_text, style_pack_name, output_dir, project_root, mode, global_style_refs, tier)
+    result = {"number": slide["number"], "prompt_hash": None, "files": [], "ok": False, "error": None}
+
+    try:
+        served = _serve_cached(slide, request, result, cache)
+        write_request_record(slide["number"], request, result["prompt_hash"], output_dir)
+        if served:
+            return result
+        if scheduler is not None:
+            saved = scheduler.call(gemini_generate_image.generate, label=f"Slide {slide['number']}", **request)
+        else:
+            saved = gemini_generate_image.generate(**request)
+        _record_render(slide, request, result, cache, saved)
+    except Exception as e:
+        result["error"] = str(e)
+        print(f"Error generating Slide {slide['number']}: {e}")
+    return result
+
+
+async def generate_slide_async(slide, style_text, style_pack_name, output_dir, project_root, mode, global_style_refs, cache=None, scheduler=None, tier=None):
+    """Async variant of generate_slide using the genai async client."""
+    print(f"Starting generation for Slide {slide['number']}...")
+    request = _slide_request(slide, style_text, style_pack_name, output_dir, project_root, mode, global_style_refs, tier)
+    result = {"number": slide["number"], "prompt_hash": None, "files": [], "ok": False, "error": None}
+
+    try:
+        served = _serve_cached(slide, request, result, cache)
+        write_request_record(slide["number"], request, result["prompt_hash"], output_dir)
+        if served:
+            return result
+        if scheduler is not None:
+            saved = await scheduler.call_async(gemini_generate_image.generate_async, label=f"Slide {slide['number']}", **request)
+        else:
+            saved = await gemini_generate_image.generate_async(**request)
+        _record_render(slide, request, result, cache, saved)
     except Exception as e:
+        result["error"] = str(e)
         print(f"Error generating Slide {slide['number']}: {e}")
+    return result
+
+
+# Slides taken from a (possibly lazy) slide iterable ahead of the workers, per unit of concurrency.
+PREFETCH_FACTOR = 2
+
+
+def render_slides_threaded(slides, concurrency, *slide_args, on_result=None):
+    """
+    Render slides with a thread pool; returns generate_slide results in slide order.
+    slides may be a lazy iterable (see iter_slides): only a small window of slides is
+    taken ahead of the workers, so rendering starts as soon as the first one is parsed.
+    on_result(slide, result), if given, is called as each slide finishes.
+    """
+    window = threading.BoundedSemaphore(concurrency * PREFETCH_FACTOR)
+
+    def run(slide):
+        try:
+            result = generate_slide(slide, *slide_args)
+            if on_result is not None:
+                on_result(slide, result)
+            return result
+        finally:
+            window.release()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = []
+        for slide in slides:
+            window.acquire()
+            futures.append(executor.submit(run, slide))
+        return [future.result() for future in futures]
+
+
+async def _render_slides_async(slides, concurrency, *slide_args, on_result=None):
+    semaphore = asyncio.Semaphore(concurrency)
+    window = asyncio.Semaphore(concurrency * PREFETCH_FACTOR)
+
+    async def run(slide):
+        try:
+            async with semaphore:
+                result = await generate_slide_async(slide, *slide_args)
+            if on_result is not None:
+                on_result(slide, result)
+            return result
+        finally:
+            window.release()
+
+    tasks = []
+    try:
+        for slide in slides:
+            await window.acquire()
+            tasks.append(asyncio.create_task(run(slide)))
+            # Let the new task send its request before parsing the next slide.
+            await asyncio.sleep(0)
+    finally:
+        # If the outline fails to parse part-way, slides already started still finish.
+        results = await asyncio.gather(*tasks)
+    return results
+
+
+def render_slides_async(slides, concurrency, *slide_args, on_result=None):
+    """Render slides on one asyncio event loop with at most `concurrency` requests in flight."""
+    return asyncio.run(_render_slides_async(slides, concurrency, *slide_args, on_result=on_result))
+
+
+def collect_run_images(output_dir, slides, prefer_4k=False):
+    """Pick one image per slide in number order, preferring the _4k upscale when asked."""
+    slide_paths = []
+    for slide in sorted(slides, key=lambda s: s.get("number", 0)):
+        num = slide.get("number", 0)
+        matches = sorted(Path(output_dir).glob(f"slide_{num:02d}_0*.*"))
+        base = [p for p in matches if p.stem == f"slide_{num:02d}_0"]
+        fourk = [p for p in matches if p.stem == f"slide_{num:02d}_0_4k"]
+        if prefer_4k and fourk:
+            slide_paths.append(fourk[0])
+        elif base:
+            slide_paths.append(base[0])
+    return slide_paths
+
+
+BACKENDS = ("gemini", "draft")
+
+ENGINES = {
+    "async": render_slides_async,
+    "threads": render_slides_threaded,
+}
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_CONCURRENCY = 32
+DEFAULT_RETRIES = 5
+
+
+def enlarge_slide(file_path, output_dir, scheduler):
+    """Upscale one slide image to <stem>_4k<ext> in output_dir; returns a result dict."""
+    file_path = Path(file_path)
+    output_path = Path(output_dir) / (file_path.stem + "_4k" + file_path.suffix)
+    result = {"input": str(file_path), "output": str(output_path), "ok": False, "error": None}
+    print(f"Enlarging {file_path.name} -> {output_path.name}...")
+    try:
+        scheduler.call(gemini_enlarge_image.enlarge, str(file_path), str(output_path), label=file_path.name)
+        result["ok"] = True
+        print(f"Finished {output_path.name}")
+    except Exception as e:
+        result["error"] = str(e)
+        print(f"Failed to enlarge {file_path.name}: {e}")
+    return result
+
+
+def enlarge_slides(files, output_dir, scheduler):
+    """Upscale files in-process on a bounded thread pool; returns results in input order."""
+    if not files:
+        return []
+    with ThreadPoolExecutor(max_workers=min(len(files), scheduler.max_concurrency)) as executor:
+        futures = [executor.submit(enlarge_slide, f, output_dir, scheduler) for f in files]
+        return [future.result() for future in futures]
+
+
+def promote_slide(number, output_dir, image_size, model, cache=None, scheduler=None):
+    """
+    Re-render one slide of a run from its request record (same prompt and input images) with
+    model at image_size, in place. The replaced images are moved to preview/.
+    Returns a generate_slide-style result dict.
+    """
+    output_dir = Path(output_dir)
+    name = f"slide_{number:02d}"
+    slide = {"number": number}
+    result = {"number": number, "prompt_hash": None, "files": [], "ok": False, "error": None}
+    print(f"Promoting Slide {number} to {image_size}...")
+    try:
+        record = load_request_record(output_dir, number)
+        if record is None:
+            raise RuntimeError(f"no {REQUESTS_DIR}/{name}.json request record in this run")
+        changed = [
+            path for path, digest in record["input_digests"].items()
+            if not Path(path).is_file() or input_digest(path) != digest
+        ]
+        if changed:
+            raise RuntimeError(f"input image(s) changed since the slide was rendered: {', '.join(changed)}")
+
+        # Render beside the run, so a failure leaves the current image in place.
+        staging = output_dir / ".promote"
+        staging.mkdir(exist_ok=True)
+        request = {
+            "prompt": record["prompt"],
+            "image_paths": record["image_paths"],
+            "output_prefix": str(staging / name),
+            "image_size": image_size,
+            "aspect_ratio": record["aspect_ratio"],
+            "model": model,
+        }
+        if not _serve_cached(slide, request, result, cache):
+            saved = scheduler.call(gemini_generate_image.generate, label=f"Slide {number}", **request)
+            _record_render(slide, request, result, cache, saved)
+        if not result["ok"]:
+            return result
+
+        preview_dir = output_dir / PREVIEW_DIR
+        preview_dir.mkdir(exist_ok=True)
+        for old in output_dir.glob(f"{name}_*.*"):
+            os.replace(old, preview_dir / old.name)
+        files = []
+        for staged in result["files"]:
+            final = output_dir / Path(staged).name
+            os.replace(staged, final)
+            files.append(str(final))
+        result["files"] = files
+        write_request_record(number, request, result["prompt_hash"], output_dir)
+    except Exception as e:
+        result.update(ok=False, error=str(e))
+        print(f"Error promoting Slide {number}: {e}")
+    return result
+
+
+def promote_run(output_dir, numbers, image_size, model, cache, scheduler, blobs=None):
+    """
+    Promote slides of a run (all of its recorded slides when numbers is empty) on a bounded
+    thread pool, then update its manifest and journal and rebuild slides.pdf and index.html.
+    Returns the results in slide order.
+    """
+    manifest = run_manifest.load_manifest(output_dir)
+    if manifest is None:
+        raise RuntimeError(f"{output_dir} has no {run_manifest.MANIFEST_NAME}")
+    entries = {int(num): entry for num, entry in manifest["slides"].items()}
+    numbers = sorted(numbers or entries)
+    if not numbers:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(len(numbers), scheduler.max_concurrency)) as executor:
+        futures = [executor.submit(promote_slide, n, output_dir, image_size, model, cache, scheduler) for n in numbers]
+        results = [future.result() for future in futures]
+    shutil.rmtree(Path(output_dir) / ".promote", ignore_errors=True)
+
+    journal = run_journal.RunJournal(output_dir)
+    for r in results:
+        if not r["ok"]:
+            continue
+        entry = entries[r["number"]] = {
+            "doc_hash": entries.get(r["number"], {}).get("doc_hash"),
+            "prompt_hash": r["prompt_hash"],
+            "files": [Path(f).name for f in r["files"]],
+            "model": model,
+            "image_size": image_size,
+        }
+        journal.done(r["number"], entry)
+    run_manifest.write_manifest(
+        output_dir, manifest["outline"], manifest["style_pack"], manifest["mode"], entries,
+        backend=manifest.get("backend", "gemini"), tier=manifest.get("tier", "full"),
+    )
+    slides = [{"number": n} for n in sorted(entries)]
+    build_run_artifacts(Path(output_dir), collect_run_images(output_dir, slides, prefer_4k=True), blobs=blobs)
+    return results
+
+
+def build_scheduler(args, deck_cfg, concurrency):
+    """Scheduler settings: CLI > deck.yaml > defaults."""
+    rpm = args.rpm or deck_cfg.get("rpm")
+    max_concurrency = args.max_concurrency or deck_cfg.get("max_concurrency") or max(DEFAULT_MAX_CONCURRENCY, concurrency)
+    retries = args.retries if args.retries is not None else deck_cfg.get("retries", DEFAULT_RETRIES)
+    return Scheduler(
+        rpm=float(rpm) if rpm else None,
+        initial_concurrency=concurrency,
+        max_concurrency=int(max_concurrency),
+        max_retries=int(retries),
+    )
+
+
+def load_deck_config(path: Path) -> dict:
+    """Read a deck.yaml-style settings file; a missing or unparsable file gives {}."""
+    if not path.exists():
+        return {}
+    try:
+        return yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    except Exception as e:
+        print(f"Warning: failed to parse {path.name}: {e}", file=sys.stderr)
+        return {}
+
+
+def resolve_style(style_pack_name, project_root):
+    """Load a style pack; returns (style_text, base_style_name, auto_style_refs)."""
+    style_text = load_style(style_pack_name, project_root)
+
+    # Derive base style name (for auto style refs) from CLI/deck style arg
+    style_path = Path(style_pack_name)
+    if style_path.is_file():
+        base_style_name = style_path.stem
+    else:
+        base_style_name = style_path.name
+
+    # Find a matching style reference image, if any
+    auto_style_refs = []
+    auto_ref = find_style_reference(base_style_name, project_root)
+    if auto_ref:
+        auto_style_refs.append(str(auto_ref))
+    return style_text, base_style_name, auto_style_refs
+
+
+def _slide_unchanged(slide, entry, style_text, base_style_name, project_root, mode, auto_style_refs, tier=None, backend="gemini") -> bool:
+    """
+    True if entry (manifest or journal) was rendered from the same outline entry and prompt as slide
+    would be at tier. Promoted entries record their own model and image_size. Draft renders
+    record draft_render.draft_key instead of a prompt hash.
+    """
+    tier = tier or FULL_TIER
+    if entry.get("doc_hash") != slide["doc_hash"]:
+        return False
+    if backend == "draft":
+        return entry.get("prompt_hash") == draft_render.draft_key(slide)
+    prompt, image_inputs = build_slide_prompt(
+        slide, style_text, base_style_name, project_root, mode, auto_style_refs, verbose=False
+    )
+    image_size = entry.get("image_size", tier["image_size"])
+    model = entry.get("model", tier["model"])
+    recorded = entry.get("prompt_hash")
+    return recorded == prompt_hash(prompt, image_inputs, image_size, "16:9", model) or (
+        recorded == prompt_hash(prompt, image_inputs, image_size, "16:9", model, legacy=True)
+    )
+
+
+def iter_incremental(slides, output_dir, manifest_entries, style_text, base_style_name, project_root, mode, auto_style_refs, force=None, on_reuse=None, tier=None):
+    """
+    Link slides unchanged since the latest manifest of the same tier for this outline into output_dir,
+    adding them to manifest_entries (and calling on_reuse(number, entry)), and yield
+    the rest for rendering. Slides listed in force are always regenerated.
+    """
+    tier = tier or FULL_TIER
+    prev_dir, prev_manifest = run_manifest.latest_manifest(Path(output_dir).parent, exclude=output_dir, tier=tier["name"])
+    if prev_manifest is None:
+        print("Incremental: no previous run manifest found; generating all slides.")
+        yield from slides
+        return
+
+    prev_entries = prev_manifest.get("slides", {})
+    reused = 0
+    for slide in slides:
+        num = slide["number"]
+        entry = prev_entries.get(str(num))
+        unchanged = (
+            entry is not None
+            and not (force and num in force)
+            and _slide_unchanged(slide, entry, style_text, base_style_name, project_root, mode, auto_style_refs, tier)
+        )
+        if unchanged and run_manifest.reuse_entry(prev_dir, entry, output_dir):
+            manifest_entries[num] = dict(entry, files=list(entry["files"]))
+            reused += 1
+            if on_reuse is not None:
+                on_reuse(num, manifest_entries[num])
+        else:
+            yield slide
+    print(f"Incremental: reused {reused} unchanged slide(s) from {prev_dir}.")
+
+
+def plan_incremental(slides, output_dir, style_text, base_style_name, project_root, mode, auto_style_refs, force=None):
+    """iter_incremental over a slide list; returns (manifest_entries, slides_to_render)."""
+    manifest_entries = {}
+    slides_to_render = list(
+        iter_incremental(slides, output_dir, manifest_entries, style_text, base_style_name, project_root, mode, auto_style_refs, force)
+    )
+    return manifest_entries, slides_to_render
+
+
+def iter_resume(slides, output_dir, journaled, manifest_entries, style_text, base_style_name, project_root, mode, auto_style_refs, force=None, on_reuse=None, tier=None, backend="gemini"):
+    """
+    Keep slides the run's journal records as finished, if their images still decode and
+    their outline entry and prompt (for backend) are unchanged, adding them to manifest_entries
+    (and calling on_reuse(number, entry)); yield everything else for rendering.
+    Slides listed in force are always rendered.
+    """
+    kept = rendered = 0
+    for slide in slides:
+        num = slide["number"]
+        entry = journaled.get(num)
+        if entry is not None and not (force and num in force):
+            drafts = [f for f in entry["files"] if not Path(f).stem.endswith("_4k")]
+            upscaled = [f for f in entry["files"] if Path(f).stem.endswith("_4k")]
+            if (
+                drafts
+                and all(run_journal.image_ok(Path(output_dir) / f) for f in drafts)
+                and _slide_unchanged(slide, entry, style_text, base_style_name, project_root, mode, auto_style_refs, tier, backend)
+            ):
+                # A damaged 4K file only costs a re-upscale, not a new draft.
+                upscaled = [f for f in upscaled if run_journal.image_ok(Path(output_dir) / f)]
+                manifest_entries[num] = {k: entry[k] for k in ("doc_hash", "prompt_hash", "model", "image_size") if k in entry}
+                manifest_entries[num]["files"] = drafts + upscaled
+                kept += 1
+                if on_reuse is not None:
+                    on_reuse(num, manifest_entries[num])
+                continue
+        rendered += 1
+        yield slide
+    print(f"Resume: {kept} slide(s) were already done in {output_dir}; {rendered} re-rendered.")
+
+
+PROMPTS_DIR = "prompts"
+DRY_RUN_REPORT = "dry_run.json"
+# Dry runs of an outline go to generated_slides/<yaml-stem>/.dry_run/<timestamp>/, out of the
+# way of real runs (catalog, --resume-latest, gc); only the latest one is kept.
+DRY_RUN_DIR = ".dry_run"
+CHARS_PER_TOKEN = 4  # rough text-token estimate; image inputs are reported in bytes
+
+
+def compile_prompts(slides, style_text, base_style_name, project_root, mode, auto_style_refs, output_dir):
+    """
+    Build every slide's prompt and input list offline (no API calls).
+    Writes prompts/slide_XX.txt and dry_run.json to output_dir; returns the per-slide report.
+    """
+    prompts_dir = Path(output_dir) / PROMPTS_DIR
+    prompts_dir.mkdir(parents=True, exist_ok=True)
+    report = []
+    for slide in slides:
+        start = time.perf_counter()
+        prompt, image_inputs = build_slide_prompt(
+            slide, style_text, base_style_name, project_root, mode, auto_style_refs, verbose=False
+        )
+        _, missing = resolve_image_inputs(slide, auto_style_refs, project_root)
+        build_ms = 1000 * (time.perf_counter() - start)
+        start = time.perf_counter()
+        key = prompt_hash(prompt, image_inputs)
+        hash_ms = 1000 * (time.perf_counter() - start)
+
+        (prompts_dir / f"slide_{slide['number']:02d}.txt").write_text(prompt, encoding="utf-8")
+        report.append(
+            {
+                "number": slide["number"],
+                "title": slide.get("title"),
+                "prompt_chars": len(prompt),
+                "prompt_tokens_est": len(prompt) // CHARS_PER_TOKEN,
+                "image_inputs": image_inputs,
+                "image_bytes": sum(os.path.getsize(p) for p in image_inputs),
+                "missing_assets": missing,
+                "build_ms": round(build_ms, 3),
+                "hash_ms": round(hash_ms, 3),
+                "prompt_hash": key,
+            }
+        )
+    (Path(output_dir) / DRY_RUN_REPORT).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return report
+
+
+def print_prompt_report(report) -> None:
+    print(f"{'slide':>5} {'chars':>7} {'~tokens':>7} {'images':>6} {'image KB':>9} {'build ms':>8} {'hash ms':>8}  title")
+    for r in report:
+        print(
+            f"{r['number']:>5} {r['prompt_chars']:>7} {r['prompt_tokens_est']:>7} {len(r['image_inputs']):>6} "
+            f"{r['image_bytes'] / 1024:>9.1f} {r['build_ms']:>8.2f} {r['hash_ms']:>8.2f}  {r['title']}"
+        )
+    if report:
+        chars = [r["prompt_chars"] for r in report]
+        print(
+            f"Total: {len(report)} prompt(s), {sum(chars)} chars (~{sum(chars) // CHARS_PER_TOKEN} tokens; "
+            f"max {max(chars)}, mean {sum(chars) // len(chars)}), "
+            f"{sum(r['image_bytes'] for r in report) / 1e6:.1f} MB of input images, "
+            f"built in {sum(r['build_ms'] for r in report):.1f} ms + {sum(r['hash_ms'] for r in report):.1f} ms hashing."
+        )
+    for r in report:
+        for path in r["missing_assets"]:
+            print(f"WARNING: slide {r['number']}: asset not found: {path}")
+
+
+def build_cache(args, deck_cfg, base_output):
+    """Render cache: CLI > deck.yaml > defaults; None when disabled."""
+    if args.no_cache or not deck_cfg.get("cache", True):
+        return None
+    cache_max_mb = args.cache_max_mb or deck_cfg.get("cache_max_mb")
+    cache_max_bytes = int(cache_max_mb) * 1024 * 1024 if cache_max_mb else render_cache.DEFAULT_MAX_BYTES
+    return render_cache.RenderCache(
+        base_output / ".cache" / "renders", max_bytes=cache_max_bytes, blobs=build_blob_store(args, deck_cfg, base_output)
+    )
+
+
+def build_blob_store(args, deck_cfg, base_output):
+    """Blob store for finished runs: CLI > deck.yaml > defaults; None when disabled."""
+    if args.no_dedupe or not deck_cfg.get("dedupe", True):
+        return None
+    return blob_store.BlobStore(base_output)
+
+
+def store_run_files(output_dir, blobs) -> None:
+    """Add a run's images, thumbnails and PDF to the blob store (see blob_store)."""
+    if blobs is not None:
+        print(blob_store.summary(blobs.ingest_run(output_dir)))
+
+
+def manifest_entry(slide, result) -> dict:
+    """Run manifest entry for a successfully rendered slide."""
+    return {
+        "doc_hash": slide["doc_hash"],
+        "prompt_hash": result["prompt_hash"],
+        "files": [Path(f).name for f in result["files"]],
+    }
+
+
+def build_run_artifacts(output_dir, slide_paths, gallery=None, blobs=None):
+    """
+    Write slides.pdf and index.html (with thumbnails, see run_gallery) for a run from its ordered slide images.
+    gallery is the run's RunGallery, if it kept index.html current while rendering; it is finished here.
+    With blobs (a BlobStore), the run's files are then deduplicated against earlier runs.
+    """
+    if not slide_paths and gallery is None:
+        return
+
+    # Save PDF
+    if slide_paths:
+        pdf_path = output_dir / "slides.pdf"
+        try:
+            pdf_writer.write_pdf(slide_paths, pdf_path)
+            print(f"Saved PDF: {pdf_path}")
+        except Exception as e:
+            print(f"Warning: failed to build PDF: {e}")
+
+    # Write the run gallery: lazily loaded thumbnails over a contact-sheet placeholder
+    if gallery is not None:
+        index_path = gallery.finish(slide_paths)
+    else:
+        index_path = run_gallery.write_index(output_dir, slide_paths)
+    print(f"Wrote index: {index_path}")
+    store_run_files(output_dir, blobs)
 
 
 def main():
@@ -394,20 +1124,142 @@ def main():
         choices=["structured", "balanced", "expressive"],
         help="Optional override for deck.yaml mode. Controls how literally bullets vs ideas are rendered.",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only regenerate slides whose outline entry or prompt changed since the latest run of this outline; link the rest. "
+        "With --slides, the listed slides are always regenerated.",
+    )
+    parser.add_argument(
+        "--resume",
+        type=str,
+        default=None,
+        metavar="RUN_DIR",
+        help="Continue an interrupted run in place: keep slides its journal records as finished and render the rest. "
+        "RUN_DIR may be relative to generated_slides/. With --slides, the listed slides are always regenerated.",
+    )
+    parser.add_argument(
+        "--resume-latest",
+        action="store_true",
+        help="Like --resume, using the most recent run of the outline that has a journal.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help=f"Optional override for deck.yaml concurrency. Slides rendered at once to start with; adapts up to --max-concurrency (default: {DEFAULT_CONCURRENCY}).",
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default=None,
+        choices=sorted(ENGINES),
+        help="Optional override for deck.yaml engine. 'async' (default) drives all requests from one event loop; 'threads' uses a thread pool.",
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default=None,
+        choices=BACKENDS,
+        help="Optional override for deck.yaml backend. 'gemini' (default) renders with the image model; "
+        "'draft' draws local wireframes of each slide's text and layout in seconds, without API calls.",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        default=None,
+        help="Optional override for deck.yaml rpm. Requests-per-minute quota used to pace API calls (default: unpaced).",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=None,
+        help="Optional override for deck.yaml max_concurrency. Upper bound for adaptive concurrency "
+        f"(default: {DEFAULT_MAX_CONCURRENCY}); --concurrency is the starting point.",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=None,
+        help=f"Optional override for deck.yaml retries. Retries per slide on 429/5xx errors (default: {DEFAULT_RETRIES}).",
+    )
+    parser.add_argument(
+        "--enlarge-after",
+        "--final",
+        action="store_true",
+        help="Upscale each slide to 4K as soon as its draft is generated; the PDF and index use the 4K images.",
+    )
+    parser.add_argument(
+        "--enlarge-concurrency",
+        type=int,
+        default=None,
+        help="Optional override for deck.yaml enlarge_concurrency. Upscales in flight with --enlarge-after (default: --concurrency).",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help=f"Build every prompt offline without calling the API; writes {PROMPTS_DIR}/ and {DRY_RUN_REPORT} to the run directory "
+        "and reports prompt sizes, input images and build time. Exits 1 if any asset is missing.",
+    )
+    parser.add_argument(
+        "--preview",
+        action="store_true",
+        help="Render the whole deck in the fast, cheap preview tier (--preview-model at --preview-size) for early review; "
+        "promote the slides you keep with --promote.",
+    )
+    parser.add_argument(
+        "--preview-model",
+        type=str,
+        default=None,
+        help=f"Optional override for deck.yaml preview_model. Image model for --preview runs (default: {DEFAULT_PREVIEW_MODEL}).",
+    )
+    parser.add_argument(
+        "--preview-size",
+        type=str,
+        default=None,
+        choices=PROMOTE_SIZES,
+        help="Optional override for deck.yaml preview_size. Image size for --preview runs (default: the model's smallest).",
+    )
+    parser.add_argument(
+        "--promote",
+        type=str,
+        default=None,
+        metavar="RUN_DIR",
+        help="Re-render slides of a run (e.g. a --preview run) at full quality from the exact prompt and input images "
+        "recorded for each; --slides selects which (default: all). RUN_DIR may be relative to generated_slides/.",
+    )
+    parser.add_argument(
+        "--promote-size",
+        type=str,
+        default=None,
+        choices=PROMOTE_SIZES,
+        help="Optional override for deck.yaml promote_size. Image size for --promote (default: 1K).",
+    )
+    parser.add_argument(
+        "--promote-model",
+        type=str,
+        default=None,
+        help=f"Optional override for deck.yaml promote_model. Image model for --promote (default: {FULL_TIER['model']}).",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Always call the API, bypassing the render cache.")
+    parser.add_argument(
+        "--no-dedupe",
+        action="store_true",
+        help="Do not deduplicate this run's files into the blob store (generated_slides/.blobs/).",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=None,
+        help="Optional override for deck.yaml cache_max_mb. Render cache size limit; least-recently-used entries are evicted.",
+    )
     args = parser.parse_args()
 
     script_dir = Path(__file__).parent
     project_root = script_dir.parent
 
     # Prefer deck.yaml if present for defaults
-    deck_cfg_path = project_root / "deck.yaml"
-    deck_cfg = {}
-    if deck_cfg_path.exists():
-        try:
-            deck_cfg = yaml.safe_load(deck_cfg_path.read_text(encoding="utf-8")) or {}
-        except Exception as e:
-            print(f"Warning: failed to parse deck.yaml: {e}", file=sys.stderr)
-            deck_cfg = {}
+    deck_cfg = load_deck_config(project_root / "deck.yaml")
 
     # Resolve outline path: CLI > deck.yaml > root slides.yaml > sample
     if args.yaml:
@@ -426,7 +1278,6 @@ def main():
 
     if args.enlarge:
         import glob
-        import subprocess
         if args.run_dir:
             output_dir = Path(args.run_dir)
             if not output_dir.is_absolute():
@@ -435,17 +1286,22 @@ def main():
             if not base_output.exists():
                 print("Error: generated_slides/ not found. Run generation first or pass --run-dir.", file=sys.stderr)
                 sys.exit(1)
-            candidates = list(base_output.rglob("slide_*_0.*"))
-            if not candidates:
-                print("Error: no slides found under generated_slides/. Run generation first or pass --run-dir.", file=sys.stderr)
+            # Draft wireframes are never upscaled; preview runs are finished with --promote.
+            output_dir = run_catalog.RunCatalog(base_output).latest(backend="gemini", tier="full")
+            if output_dir is None:
+                print("Error: no full-quality runs found under generated_slides/. Run generation first or pass --run-dir.", file=sys.stderr)
                 sys.exit(1)
-            latest_file = max(candidates, key=lambda p: p.stat().st_mtime)
-            output_dir = latest_file.parent
             print(f"No --run-dir provided. Using latest run directory: {output_dir}")
 
         if not output_dir.exists():
             print(f"Error: run directory not found: {output_dir}", file=sys.stderr)
             sys.exit(1)
+        entry = run_catalog.RunCatalog(base_output).show(str(output_dir)) or {}
+        if entry.get("backend", "gemini") == "draft":
+            print(f"Error: {output_dir} is a draft run; render it with the Gemini backend before upscaling.", file=sys.stderr)
+            sys.exit(1)
+        if entry.get("tier", "full") != "full":
+            print(f"Note: {output_dir} is a {entry['tier']} run; slides not yet promoted (--promote) are upscaled from their previews.")
 
         print("Starting batch enlargement...")
         slide_pattern = str(output_dir / "slide_*_0.*")
@@ -463,120 +1319,279 @@ def main():
 
         print(f"Found {len(files)} slides to enlarge.")
 
-        for file_path in sorted(files):
-            file_path_obj = Path(file_path)
-            output_name = file_path_obj.stem + "_4k" + file_path_obj.suffix
-            output_path = output_dir / output_name
-
-            print(f"Enlarging {file_path_obj.name} -> {output_name}...")
-
-            enlarge_script = script_dir / "gemini_enlarge_image.py"
-            cmd = [sys.executable, str(enlarge_script), "--input", str(file_path), "--output", str(output_path)]
-
-            try:
-                subprocess.run(cmd, check=True)
-                print(f"Finished {output_name}")
-            except subprocess.CalledProcessError as e:
-                print(f"Failed to enlarge {file_path_obj.name}: {e}")
-
-        print("Batch enlargement complete.")
+        concurrency = max(1, int(args.concurrency or deck_cfg.get("concurrency") or DEFAULT_CONCURRENCY))
+        scheduler = build_scheduler(args, deck_cfg, concurrency)
+        results = enlarge_slides(sorted(files), output_dir, scheduler)
+        print(scheduler.summary())
+        store_run_files(output_dir, build_blob_store(args, deck_cfg, base_output))
+
+        failed = [r for r in results if not r["ok"]]
+        print(f"Batch enlargement complete: {len(results) - len(failed)} enlarged, {len(failed)} failed.")
+        for r in failed:
+            print(f"  FAILED {Path(r['input']).name}: {r['error']}")
+        if failed:
+            sys.exit(1)
         return
 
-    # Generation mode: always create a fresh run directory <yaml-stem>/<timestamp>
-    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    yaml_stem = outline_path.stem
-    output_dir = base_output / yaml_stem / stamp
-
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    # Resolve style pack and mode: CLI > deck.yaml > defaults
-    style_pack_name = args.style or deck_cfg.get("style_pack") or "glass_garden"
-    mode = args.mode or deck_cfg.get("mode") or "balanced"
-
-    style_text = load_style(style_pack_name, project_root)
+    if args.promote:
+        output_dir = Path(args.promote)
+        if not output_dir.is_absolute() and not output_dir.exists():
+            output_dir = base_output / args.promote
+        if not output_dir.exists():
+            print(f"Error: run directory not found: {output_dir}", file=sys.stderr)
+            sys.exit(1)
+        image_size = args.promote_size or deck_cfg.get("promote_size") or FULL_TIER["image_size"]
+        model = args.promote_model or deck_cfg.get("promote_model") or FULL_TIER["model"]
+        concurrency = max(1, int(args.concurrency or deck_cfg.get("concurrency") or DEFAULT_CONCURRENCY))
+        scheduler = build_scheduler(args, deck_cfg, concurrency)
+        cache = build_cache(args, deck_cfg, base_output)
+        print(f"Promoting slides of {output_dir} to {image_size} with {model}...")
+        try:
+            results = promote_run(
+                output_dir, args.slides, image_size, model, cache, scheduler, build_blob_store(args, deck_cfg, base_output)
+            )
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        print(scheduler.summary())
+        if cache is not None:
+            print(cache.summary())
+
+        failed = [r for r in results if not r["ok"]]
+        print(f"Promotion complete: {len(results) - len(failed)} promoted, {len(failed)} failed.")
+        for r in failed:
+            print(f"  FAILED slide {r['number']}: {r['error']}")
+        if failed:
+            sys.exit(1)
+        return
 
-    # Derive base style name (for auto style refs) from CLI/deck style arg
-    style_path = Path(style_pack_name)
-    if style_path.is_file():
-        base_style_name = style_path.stem
+    if (args.resume or args.resume_latest) and args.incremental:
+        print("Error: --resume and --incremental cannot be combined.", file=sys.stderr)
+        sys.exit(1)
+
+    run_record = None
+    if args.resume or args.resume_latest:
+        # Resume mode: continue in an existing run directory using its checkpoint journal
+        if args.resume:
+            output_dir = Path(args.resume)
+            if not output_dir.is_absolute() and not output_dir.exists():
+                output_dir = base_output / args.resume
+        else:
+            output_dir = run_catalog.RunCatalog(base_output).latest(outline_path.stem)
+            if output_dir is None or not (output_dir / run_journal.JOURNAL_NAME).exists():
+                # The latest run may have been written without a journal (e.g. by the render service).
+                runs = sorted(p.parent for p in (base_output / outline_path.stem).glob(f"*/{run_journal.JOURNAL_NAME}"))
+                if not runs:
+                    print(f"Error: no resumable run of {outline_path.name} found under generated_slides/.", file=sys.stderr)
+                    sys.exit(1)
+                output_dir = runs[-1]
+        run_record, journaled = run_journal.load_journal(output_dir)
+        if run_record is None:
+            print(f"Error: {output_dir} has no {run_journal.JOURNAL_NAME} to resume from.", file=sys.stderr)
+            sys.exit(1)
+        if not args.yaml:
+            outline_path = Path(run_record["outline"])
+        print(f"Resuming run in {output_dir}")
+    elif args.dry_run:
+        # Dry run: a scratch directory that replaces the outline's previous dry run
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        dry_runs = base_output / outline_path.stem / DRY_RUN_DIR
+        if dry_runs.is_dir():
+            for old in dry_runs.iterdir():
+                shutil.rmtree(old, ignore_errors=True)
+        output_dir = dry_runs / stamp
+        output_dir.mkdir(parents=True, exist_ok=True)
     else:
-        base_style_name = style_path.name
+        # Generation mode: always create a fresh run directory <yaml-stem>/<timestamp>
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        yaml_stem = outline_path.stem
+        output_dir = base_output / yaml_stem / stamp
+
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Resolve style pack and mode: CLI > resumed run > deck.yaml > defaults
+    run_record = run_record or {}
+    style_pack_name = args.style or run_record.get("style_pack") or deck_cfg.get("style_pack") or "glass_garden"
+    mode = args.mode or run_record.get("mode") or deck_cfg.get("mode") or "balanced"
+    backend = args.backend or run_record.get("backend") or deck_cfg.get("backend") or "gemini"
+    if backend not in BACKENDS:
+        print(f"Error: unknown backend '{backend}' (expected one of: {', '.join(BACKENDS)})", file=sys.stderr)
+        sys.exit(1)
+    tier = build_tier(args, deck_cfg, run_record)
+    if backend == "draft" and tier["name"] != "full":
+        print("Note: --preview is ignored for draft renders.")
+        tier = dict(FULL_TIER)
+    elif tier["name"] == "preview":
+        print(f"Preview tier: {tier['model']} at {tier['image_size'] or 'its default size'}.")
+
+    style_text, base_style_name, auto_style_refs = resolve_style(style_pack_name, project_root)
+
+    resuming = bool(args.resume or args.resume_latest)
+    specific_slides = args.slides if args.slides else None
+    # Slides are parsed lazily: each one is handed to the engine as soon as its YAML
+    # document is read, so the first request does not wait for the whole outline.
+    try:
+        if not specific_slides or args.incremental or resuming:
+            slides = iter_slides(str(outline_path), mode=mode)
+        else:
+            slides = iter_slides(str(outline_path), specific_slides=specific_slides, mode=mode)
+    except yaml.YAMLError as e:
+        print(f"Error: cannot read outline {outline_path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.dry_run:
+        report = compile_prompts(slides, style_text, base_style_name, project_root, mode, auto_style_refs, output_dir)
+        print_prompt_report(report)
+        print(f"Wrote {len(report)} prompt(s) to {output_dir / PROMPTS_DIR} and {output_dir / DRY_RUN_REPORT}")
+        if any(r["missing_assets"] for r in report):
+            sys.exit(1)
+        return
 
-    # Find a matching style reference image, if any
-    auto_style_refs = []
-    auto_ref = find_style_reference(base_style_name, project_root)
-    if auto_ref:
-        auto_style_refs.append(str(auto_ref))
+    # Checkpoint journal: every finished slide is recorded as it lands, so the run can be resumed.
+    journal = run_journal.RunJournal(output_dir)
+    journal.start(outline_path, style_pack_name, mode, backend, tier)
+    catalog = run_catalog.RunCatalog(base_output)
+    catalog.started(output_dir, outline_path, style_pack_name, mode, backend, tier["name"])
+
+    # Progressive gallery: index.html and status.json show each slide as it is parsed and rendered.
+    gallery = run_gallery.RunGallery(output_dir)
+    print(f"Gallery: {output_dir / run_gallery.INDEX_NAME} (updated as slides finish)")
+
+    # Draft renders are never cached: the render cache is keyed on the Gemini prompt.
+    cache = build_cache(args, deck_cfg, base_output) if backend == "gemini" else None
+
+    # Engine and concurrency: CLI > deck.yaml > defaults
+    engine = args.engine or deck_cfg.get("engine") or "async"
+    if engine not in ENGINES:
+        print(f"Error: unknown engine '{engine}' (expected one of: {', '.join(sorted(ENGINES))})", file=sys.stderr)
+        sys.exit(1)
+    concurrency = max(1, int(args.concurrency or deck_cfg.get("concurrency") or DEFAULT_CONCURRENCY))
+    scheduler = build_scheduler(args, deck_cfg, concurrency)
+
+    # Pipelined 4K upscale: each finished draft is queued on a second stage with its own limit.
+    enlarge_after = args.enlarge_after or bool(deck_cfg.get("enlarge_after"))
+    if backend == "draft":
+        if enlarge_after:
+            print("Note: --enlarge-after is ignored for draft renders.")
+        enlarge_after = False
+    enlarge_pool = None
+    enlarge_futures = {}
+    submit_enlarge = None
+    if enlarge_after:
+        enlarge_concurrency = max(1, int(args.enlarge_concurrency or deck_cfg.get("enlarge_concurrency") or concurrency))
+        enlarge_scheduler = Scheduler(
+            initial_concurrency=enlarge_concurrency,
+            max_concurrency=enlarge_concurrency,
+            max_retries=scheduler.max_retries,
+            bucket=scheduler.bucket,
+        )
+        enlarge_pool = ThreadPoolExecutor(max_workers=enlarge_concurrency)
+
+        def submit_enlarge(num, draft_path):
+            def record(future):
+                enlarged = future.result()
+                if enlarged["ok"]:
+                    journal.enlarged(num, enlarged["output"])
+
+            future = enlarge_pool.submit(enlarge_slide, draft_path, output_dir, enlarge_scheduler)
+            future.add_done_callback(record)
+            enlarge_futures[num] = future
+
+    manifest_entries = {}
+    parsed = []
+
+    def track(stream):
+        for slide in stream:
+            parsed.append(slide)
+            gallery.pending(slide["number"])
+            yield slide
+
+    def on_reuse(num, entry):
+        if args.incremental:
+            journal.done(num, entry)
+        gallery.done(num, output_dir / entry["files"][0])
+        # Slides reused by --incremental or kept by --resume may not have been upscaled yet.
+        if submit_enlarge is not None and not any(Path(name).stem.endswith("_4k") for name in entry["files"]):
+            submit_enlarge(num, output_dir / entry["files"][0])
+
+    def on_result(slide, result):
+        if not result["ok"]:
+            journal.failed(slide["number"], result["error"])
+            gallery.failed(slide["number"], result["error"])
+            return
+        entry = manifest_entries[slide["number"]] = manifest_entry(slide, result)
+        journal.done(slide["number"], entry)
+        gallery.done(slide["number"], result["files"][0])
+        if submit_enlarge is not None:
+            submit_enlarge(slide["number"], result["files"][0])
+
+    # Incremental: link slides unchanged since the latest manifest for this outline.
+    # Resume: keep slides already finished in this run directory.
+    slides_to_render = track(slides)
+    if args.incremental and backend == "draft":
+        print("Note: --incremental is ignored for draft renders; every slide is redrawn.")
+    elif args.incremental:
+        slides_to_render = iter_incremental(
+            slides_to_render, output_dir, manifest_entries, style_text, base_style_name, project_root, mode,
+            auto_style_refs, force=specific_slides, on_reuse=on_reuse, tier=tier,
+        )
+    elif resuming:
+        slides_to_render = iter_resume(
+            slides_to_render, output_dir, journaled, manifest_entries, style_text, base_style_name, project_root, mode,
+            auto_style_refs, force=specific_slides, on_reuse=on_reuse, tier=tier, backend=backend,
+        )
 
-    specific_slides = args.slides if args.slides else None
-    if not specific_slides:
-        slides = parse_slides(str(outline_path), mode=mode)
+    if backend == "draft":
+        results = draft_render.render_slides(slides_to_render, output_dir, on_result=on_result)
     else:
-        slides = parse_slides(str(outline_path), specific_slides=specific_slides, mode=mode)
-
-    print(f"Found {len(slides)} slides to generate.")
-
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = [
-            executor.submit(
-                generate_slide,
-                slide,
-                style_text,
-                base_style_name,
-                output_dir,
-                project_root,
-                mode,
-                auto_style_refs,
-            )
-            for slide in slides
-        ]
-        for future in futures:
-            future.result()
+        # The scheduler gates in-flight calls adaptively, so the engine only caps at its maximum.
+        results = ENGINES[engine](
+            slides_to_render,
+            scheduler.max_concurrency,
+            style_text,
+            base_style_name,
+            output_dir,
+            project_root,
+            mode,
+            auto_style_refs,
+            cache,
+            scheduler,
+            tier,
+            on_result=on_result,
+        )
+    print(f"Parsed {len(parsed)} slide(s); generated {sum(1 for r in results if r['ok'])} of {len(results)}.")
+    if backend == "gemini":
+        print(scheduler.summary())
+
+    if enlarge_pool is not None:
+        enlarge_pool.shutdown(wait=True)
+        print(enlarge_scheduler.summary())
+        failed = []
+        for num, future in sorted(enlarge_futures.items()):
+            enlarged = future.result()
+            if enlarged["ok"] and num in manifest_entries:
+                manifest_entries[num]["files"].append(Path(enlarged["output"]).name)
+            elif not enlarged["ok"]:
+                failed.append(enlarged)
+        print(f"Enlargement: {len(enlarge_futures) - len(failed)} enlarged, {len(failed)} failed.")
+        for r in failed:
+            print(f"  FAILED {Path(r['input']).name}: {r['error']}")
+
+    if cache is not None:
+        print(cache.summary())
+
+    run_manifest.write_manifest(
+        output_dir, outline_path, base_style_name, mode, manifest_entries, backend=backend, tier=tier["name"]
+    )
 
     # Collect generated images in order and build artifacts
-    slide_paths = []
-    for slide in sorted(slides, key=lambda s: s.get("number", 0)):
-        num = slide.get("number", 0)
-        pattern = f"slide_{num:02d}_0.*"
-        matches = list(output_dir.glob(pattern))
-        if matches:
-            slide_paths.append(sorted(matches)[0])
+    slide_paths = collect_run_images(output_dir, parsed, prefer_4k=enlarge_after)
 
-    if slide_paths:
-        # Save PDF
-        pdf_path = output_dir / "slides.pdf"
-        try:
-            imgs = []
-            for p in slide_paths:
-                with Image.open(p) as im:
-                    if im.mode in ("RGBA", "P"):
-                        im = im.convert("RGB")
-                    imgs.append(im.copy())
-            if imgs:
-                imgs[0].save(pdf_path, save_all=True, append_images=imgs[1:])
-                print(f"Saved PDF: {pdf_path}")
-        except Exception as e:
-            print(f"Warning: failed to build PDF: {e}")
-
-        # Write simple HTML index for this run
-        index_path = output_dir / "index.html"
-        lines = [
-            "<!doctype html>",
-            "<html><head><meta charset='utf-8'><title>Slides</title>",
-            "<style>body{font-family:sans-serif;background:#f7f7f7;color:#222;margin:24px;} .slide{margin-bottom:32px;} img{max-width:100%;height:auto;}</style>",
-            "</head><body>",
-            f"<h1>Slides ({len(slide_paths)})</h1>",
-            f"<p>Output directory: {output_dir}</p>",
-        ]
-        for p in slide_paths:
-            name = p.name
-            lines.append("<div class='slide'>")
-            lines.append(f"<h3>{name}</h3>")
-            lines.append(f"<img src='{name}' alt='{name}' />")
-            lines.append("</div>")
-        lines.append("</body></html>")
-        index_path.write_text("\n".join(lines), encoding="utf-8")
-        print(f"Wrote index: {index_path}")
+    build_run_artifacts(output_dir, slide_paths, gallery, build_blob_store(args, deck_cfg, base_output))
+    catalog.finished(output_dir, len(parsed), len(manifest_entries), sum(1 for r in results if not r["ok"]))
+    # Like --enlarge and --promote: failed slides (e.g. no API key) make the command exit non-zero.
+    if any(not r["ok"] for r in results):
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,93 @@
+"""
+Parsed-outline cache.
+
+Parsing a machine-generated outline with thousands of slides dominates the
+startup of every command, and generate, export_pptx and --incremental all parse
+the same file. generate_slides.parse_slides stores its parsed slide list in
+generated_slides/.cache/outlines/, stamped with the outline's resolved path,
+mtime, size and mode; the next command that parses an unchanged outline loads
+that instead of re-reading the YAML. Within one process (batch mode, the
+render service) the last result per outline is also kept in memory.
+
+Entries are JSON, never pickle: generated_slides/ is served by the preview
+server and synced or copied around, so a file planted there must not be able
+to run code. An entry is only used if its version and stamp match. Outlines
+whose documents do not survive a JSON round trip unchanged (dates, non-string
+keys) are only memoised in process.
+
+There is one cache file per (outline, mode), so editing an outline replaces its
+entry rather than adding a new one.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+# Bump when the parsed slide fields change so stale entries are ignored.
+CACHE_VERSION = 2
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / "generated_slides" / ".cache" / "outlines"
+
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+def stamp(outline_path, mode: str):
+    """Cache stamp for outline_path as it is on disk now, or None if it cannot be stat'ed."""
+    path = Path(outline_path).resolve()
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (CACHE_VERSION, str(path), st.st_mtime_ns, st.st_size, mode)
+
+
+def _entry_path(cache_dir: Path, key) -> Path:
+    _, path, _, _, mode = key
+    name = hashlib.sha256(f"{path}\0{mode}".encode("utf-8")).hexdigest()[:32]
+    return Path(cache_dir or DEFAULT_CACHE_DIR) / f"{name}.json"
+
+
+def load(key, cache_dir: Path = None):
+    """Return the parsed slides stored under key, or None on a miss."""
+    if key is None:
+        return None
+    memo_key = (key[1], key[4])
+    with _memo_lock:
+        hit = _memo.get(memo_key)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    try:
+        with open(_entry_path(cache_dir, key), encoding="utf-8") as f:
+            entry = json.load(f)
+        if tuple(entry["key"]) != key:
+            return None
+        data = [(fields, doc) for fields, doc in entry["slides"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    with _memo_lock:
+        _memo[memo_key] = (key, data)
+    return data
+
+
+def store(key, data, cache_dir: Path = None) -> None:
+    """Store parsed slides under key (best effort; write errors are ignored)."""
+    if key is None:
+        return
+    with _memo_lock:
+        _memo[(key[1], key[4])] = (key, data)
+    try:
+        text = json.dumps({"key": key, "slides": data}, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return  # not JSON data (e.g. YAML dates): memo only
+    if [(fields, doc) for fields, doc in json.loads(text)["slides"]] != data:
+        return  # JSON would change it (e.g. integer mapping keys): memo only
+    path = _entry_path(cache_dir, key)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
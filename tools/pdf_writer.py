@@ -0,0 +1,147 @@
+"""
+Streaming PDF writer for slide decks.
+
+Pages are written one at a time, so memory stays flat regardless of deck size.
+Baseline or progressive JPEGs in RGB or grayscale are copied into the PDF as
+DCTDecode streams without being decoded. Other images (PNG, RGBA, palette,
+CMYK, ...) are converted to RGB and JPEG-encoded one page at a time, matching
+what Pillow's PDF writer did for the whole deck before.
+
+Each page is the image size in points (72 dpi), as with Image.save(..., "PDF").
+"""
+
+import io
+import os
+import shutil
+from pathlib import Path
+
+from PIL import Image
+
+FALLBACK_JPEG_QUALITY = 95
+_COLORSPACES = {"RGB": "/DeviceRGB", "L": "/DeviceGray"}
+
+
+class _PdfStream:
+    """Tracks byte offsets of indirect objects as they are written."""
+
+    def __init__(self, f):
+        self.f = f
+        self.offsets = {}
+
+    def tell(self) -> int:
+        return self.f.tell()
+
+    def write(self, data: bytes) -> None:
+        self.f.write(data)
+
+    def begin_obj(self, num: int) -> None:
+        self.offsets[num] = self.tell()
+        self.write(f"{num} 0 obj\n".encode("ascii"))
+
+    def end_obj(self) -> None:
+        self.write(b"\nendobj\n")
+
+    def obj(self, num: int, body: str) -> None:
+        self.begin_obj(num)
+        self.write(body.encode("ascii"))
+        self.end_obj()
+
+    def stream_obj(self, num: int, dictionary: str, length: int, write_data) -> None:
+        self.begin_obj(num)
+        self.write(f"<< {dictionary} /Length {length} >>\nstream\n".encode("ascii"))
+        write_data()
+        self.write(b"\nendstream")
+        self.end_obj()
+
+
+def _jpeg_passthrough(path: Path):
+    """Return (width, height, colorspace) if the file can be embedded as-is, else None."""
+    with Image.open(path) as im:
+        if im.format == "JPEG" and im.mode in _COLORSPACES:
+            return im.width, im.height, _COLORSPACES[im.mode]
+    return None
+
+
+def _encode_jpeg(path: Path):
+    """Decode one image, flatten it to RGB and re-encode it as JPEG bytes."""
+    with Image.open(path) as im:
+        if im.mode in ("RGBA", "LA") or (im.mode == "P" and "transparency" in im.info):
+            im = im.convert("RGBA")
+            background = Image.new("RGB", im.size, (255, 255, 255))
+            background.paste(im, mask=im.getchannel("A"))
+            im = background
+        elif im.mode != "RGB":
+            im = im.convert("RGB")
+        buf = io.BytesIO()
+        im.save(buf, format="JPEG", quality=FALLBACK_JPEG_QUALITY)
+        return im.width, im.height, buf.getvalue()
+
+
+def write_pdf(image_paths, pdf_path) -> int:
+    """
+    Write image_paths (in order) as one page each to pdf_path, atomically.
+    Returns the number of JPEG pages embedded without re-encoding.
+    """
+    pdf_path = Path(pdf_path)
+    tmp_path = pdf_path.with_name(pdf_path.name + ".tmp")
+    catalog_num, pages_num = 1, 2
+    next_num = 3
+    page_nums = []
+    passthrough = 0
+
+    with open(tmp_path, "wb") as f:
+        out = _PdfStream(f)
+        out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+        for path in image_paths:
+            path = Path(path)
+            info = _jpeg_passthrough(path)
+            if info is not None:
+                width, height, colorspace = info
+                length = os.path.getsize(path)
+
+                def write_data(path=path):
+                    with open(path, "rb") as src:
+                        shutil.copyfileobj(src, f, 1024 * 1024)
+
+                passthrough += 1
+            else:
+                width, height, data = _encode_jpeg(path)
+                colorspace = "/DeviceRGB"
+                length = len(data)
+
+                def write_data(data=data):
+                    f.write(data)
+
+            image_num, content_num, page_num = next_num, next_num + 1, next_num + 2
+            next_num += 3
+
+            out.stream_obj(
+                image_num,
+                f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                f"/ColorSpace {colorspace} /BitsPerComponent 8 /Filter /DCTDecode",
+                length,
+                write_data,
+            )
+            content = f"q {width} 0 0 {height} 0 0 cm /Im0 Do Q".encode("ascii")
+            out.stream_obj(content_num, "", len(content), lambda content=content: f.write(content))
+            out.obj(
+                page_num,
+                f"<< /Type /Page /Parent {pages_num} 0 R /MediaBox [0 0 {width} {height}] "
+                f"/Resources << /XObject << /Im0 {image_num} 0 R >> >> /Contents {content_num} 0 R >>",
+            )
+            page_nums.append(page_num)
+
+        kids = " ".join(f"{num} 0 R" for num in page_nums)
+        out.obj(pages_num, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_nums)} >>")
+        out.obj(catalog_num, f"<< /Type /Catalog /Pages {pages_num} 0 R >>")
+
+        xref_offset = out.tell()
+        out.write(f"xref\n0 {next_num}\n".encode("ascii"))
+        out.write(b"0000000000 65535 f \n")
+        for num in range(1, next_num):
+            out.write(f"{out.offsets[num]:010d} 00000 n \n".encode("ascii"))
+        out.write(f"trailer\n<< /Size {next_num} /Root {catalog_num} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("ascii"))
+
+    os.replace(tmp_path, pdf_path)
+    return passthrough
@@ -0,0 +1,242 @@
+"""
+Bounded-memory PPTX writer for image-only decks.
+
+export_pptx builds the whole Presentation in memory and only writes at
+prs.save(), which holds every embedded image until the end. This writer instead
+streams slide parts and media straight into the .pptx zip as it goes:
+
+- the package skeleton (masters, layouts, theme, properties) and the XML for
+  one picture slide and one notes slide come from a tiny one-slide deck saved
+  by python-pptx, so the output matches what export_pptx produces;
+- each slide image is copied into the zip from disk in chunks, and identical
+  images (by SHA-1, as python-pptx does) are stored once and shared.
+
+Memory use is roughly constant in deck size.
+"""
+
+import hashlib
+import io
+import os
+import re
+import tempfile
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+from PIL import Image
+from pptx import Presentation
+from pptx.util import Inches
+
+SLIDE_WIDTH = Inches(13.333)
+SLIDE_HEIGHT = Inches(7.5)
+
+_DESCR_MARKER = "__nano_slides_descr__"
+_NOTES_MARKER = "__nano_slides_notes__"
+_TEMPLATE_MEDIA = "ppt/media/image1.png"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+# Same part extensions python-pptx uses for each image format.
+_MEDIA_EXT = {"JPEG": "jpg", "PNG": "png", "GIF": "gif", "BMP": "bmp", "TIFF": "tiff"}
+_MEDIA_TYPES = {"jpg": "image/jpeg", "png": "image/png", "gif": "image/gif", "bmp": "image/bmp", "tiff": "image/tiff"}
+_SLIDE_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.slide+xml"
+_NOTES_TYPE = "application/vnd.openxmlformats-officedocument.presentationml.notesSlide+xml"
+_CONTROL_CHARS = re.compile(r"[\x00-\x08\x0c-\x1f]")
+
+
+def new_presentation():
+    """Return a 16:9 Presentation and its blank layout (first layout if none is named blank)."""
+    prs = Presentation()
+    prs.slide_width = SLIDE_WIDTH
+    prs.slide_height = SLIDE_HEIGHT
+
+    blank_layout = None
+    for layout in prs.slide_layouts:
+        if layout.name.lower() == "blank":
+            blank_layout = layout
+            break
+    if blank_layout is None:
+        blank_layout = prs.slide_layouts[0]
+    return prs, blank_layout
+
+
+def _template_parts() -> dict:
+    """Save a one-slide deck (full-bleed picture + notes) with python-pptx and return its parts in order."""
+    prs, blank_layout = new_presentation()
+    with tempfile.TemporaryDirectory() as tmp:
+        img_path = Path(tmp) / f"{_DESCR_MARKER}.png"
+        Image.new("RGB", (2, 2)).save(img_path)
+        slide = prs.slides.add_slide(blank_layout)
+        slide.shapes.add_picture(str(img_path), left=0, top=0, width=prs.slide_width, height=prs.slide_height)
+        slide.notes_slide.notes_text_frame.text = _NOTES_MARKER
+        buf = io.BytesIO()
+        prs.save(buf)
+    with zipfile.ZipFile(buf) as zf:
+        return {name: zf.read(name) for name in zf.namelist()}
+
+
+def _notes_paragraphs(text: str) -> str:
+    """Paragraph XML equivalent to python-pptx's `text_frame.text = text`."""
+    def run(segment):
+        segment = _CONTROL_CHARS.sub(lambda m: f"_x{ord(m.group()):04X}_", segment)
+        return f"<a:r><a:t>{escape(segment)}</a:t></a:r>"
+
+    paragraphs = []
+    for line in text.split("\n"):
+        if not line:
+            paragraphs.append("<a:p/>")
+            continue
+        runs = "<a:br/>".join(run(segment) for segment in line.split("\x0b"))
+        paragraphs.append(f"<a:p>{runs}</a:p>")
+    return "".join(paragraphs)
+
+
+def _file_sha1(path: Path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _media_ext(path: Path) -> str:
+    with Image.open(path) as im:
+        fmt = im.format
+    if fmt not in _MEDIA_EXT:
+        raise ValueError(f"unsupported image format for PPTX: {fmt} ({path})")
+    return _MEDIA_EXT[fmt]
+
+
+def write_pptx_streaming(slide_files: dict, output_path, notes_by_number=None) -> dict:
+    """
+    Write slide_files (slide number -> image path) as an image-only PPTX with optional notes.
+    Returns counts of slides, media parts written and media parts shared.
+    """
+    notes_by_number = notes_by_number or {}
+    numbers = sorted(slide_files)
+    notes = {num: notes_by_number.get(num) for num in numbers if notes_by_number.get(num)}
+    exts = {num: _media_ext(Path(slide_files[num])) for num in numbers}
+    # python-pptx numbers notes slides in the order they are created, not by slide.
+    notes_parts = {num: i for i, num in enumerate((num for num in numbers if num in notes), start=1)}
+
+    parts = _template_parts()
+    slide_xml = parts.pop("ppt/slides/slide1.xml").decode("utf-8")
+    slide_rels = parts.pop("ppt/slides/_rels/slide1.xml.rels").decode("utf-8")
+    notes_xml = parts.pop("ppt/notesSlides/notesSlide1.xml").decode("utf-8")
+    notes_rels = parts.pop("ppt/notesSlides/_rels/notesSlide1.xml.rels").decode("utf-8")
+    parts.pop(_TEMPLATE_MEDIA)
+
+    # [Content_Types].xml: one override per slide / notes slide, defaults for media extensions.
+    # python-pptx writes overrides sorted by part name, so rebuild them that way.
+    content_types = parts.pop("[Content_Types].xml").decode("utf-8")
+    overrides = dict(re.findall(r'<Override PartName="([^"]+)" ContentType="([^"]+)"/>', content_types))
+    del overrides["/ppt/slides/slide1.xml"], overrides["/ppt/notesSlides/notesSlide1.xml"]
+    for i, num in enumerate(numbers, start=1):
+        overrides[f"/ppt/slides/slide{i}.xml"] = _SLIDE_TYPE
+        if num in notes:
+            overrides[f"/ppt/notesSlides/notesSlide{notes_parts[num]}.xml"] = _NOTES_TYPE
+    # Defaults: keep those still used by a remaining part, plus one per media extension.
+    defaults = dict(re.findall(r'<Default Extension="([^"]+)" ContentType="([^"]+)"/>', content_types))
+    used = {"rels", "xml"} | {name.rsplit(".", 1)[-1] for name in parts} | set(exts.values())
+    defaults = {ext: defaults.get(ext) or _MEDIA_TYPES[ext] for ext in used}
+    content_types = re.sub(
+        r"(<Types[^>]*>).*</Types>",
+        lambda m: m.group(1)
+        + "".join(f'<Default Extension="{ext}" ContentType="{ctype}"/>' for ext, ctype in sorted(defaults.items()))
+        + "".join(f'<Override PartName="{name}" ContentType="{ctype}"/>' for name, ctype in sorted(overrides.items()))
+        + "</Types>",
+        content_types,
+        flags=re.S,
+    )
+
+    # presentation.xml(.rels): one relationship + sldId per slide. Like python-pptx, the first
+    # slide keeps the template slide's relationship and the rest are appended after it.
+    pres_rels = parts["ppt/_rels/presentation.xml.rels"].decode("utf-8")
+    slide_rel = re.search(r'<Relationship Id="(rId\d+)" Type="[^"]*/slide" Target="slides/slide1.xml"/>', pres_rels)
+    next_rid = max(int(n) for n in re.findall(r'Id="rId(\d+)"', pres_rels)) + 1
+    slide_rids = [slide_rel.group(1)] + [f"rId{next_rid + i}" for i in range(len(numbers) - 1)]
+    pres_rels = pres_rels.replace(
+        "</Relationships>",
+        "".join(
+            f'<Relationship Id="{rid}" Type="{_REL_NS}/slide" Target="slides/slide{i}.xml"/>'
+            for i, rid in enumerate(slide_rids[1:], start=2)
+        )
+        + "</Relationships>",
+    )
+    parts["ppt/_rels/presentation.xml.rels"] = pres_rels.encode("utf-8")
+    presentation = parts["ppt/presentation.xml"].decode("utf-8")
+    sld_ids = "".join(f'<p:sldId id="{256 + i}" r:id="{rid}"/>' for i, rid in enumerate(slide_rids))
+    presentation = re.sub(r"<p:sldIdLst>.*?</p:sldIdLst>", f"<p:sldIdLst>{sld_ids}</p:sldIdLst>", presentation)
+    parts["ppt/presentation.xml"] = presentation.encode("utf-8")
+
+    notes_rel = re.search(r'<Relationship Id="rId\d+" Type="[^"]*/notesSlide" Target="[^"]*"/>', slide_rels).group(0)
+    notes_template = f"<a:p><a:r><a:t>{_NOTES_MARKER}</a:t></a:r></a:p>"
+
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    media_by_hash = {}
+    descr_by_hash = {}
+    shared = 0
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", content_types)
+        for name, data in parts.items():
+            zf.writestr(name, data)
+
+        for i, num in enumerate(numbers, start=1):
+            img_path = Path(slide_files[num])
+            digest = _file_sha1(img_path)
+            media_name = media_by_hash.get(digest)
+            if media_name is None:
+                media_name = f"image{len(media_by_hash) + 1}.{exts[num]}"
+                media_by_hash[digest] = media_name
+                # A shared image part keeps the file name it was first added with.
+                descr_by_hash[digest] = img_path.name
+                # Slide images are already compressed; store them as-is.
+                zf.write(img_path, f"ppt/media/{media_name}", compress_type=zipfile.ZIP_STORED)
+            else:
+                shared += 1
+
+            zf.writestr(
+                f"ppt/slides/slide{i}.xml",
+                slide_xml.replace(f"descr={quoteattr(_DESCR_MARKER + '.png')}", f"descr={quoteattr(descr_by_hash[digest])}"),
+            )
+            rels = slide_rels.replace("../media/image1.png", f"../media/{media_name}")
+            if num in notes:
+                part = notes_parts[num]
+                rels = rels.replace("notesSlide1.xml", f"notesSlide{part}.xml")
+                zf.writestr(
+                    f"ppt/notesSlides/notesSlide{part}.xml",
+                    notes_xml.replace(notes_template, _notes_paragraphs(notes[num])),
+                )
+                zf.writestr(
+                    f"ppt/notesSlides/_rels/notesSlide{part}.xml.rels",
+                    notes_rels.replace("../slides/slide1.xml", f"../slides/slide{i}.xml"),
+                )
+            else:
+                rels = rels.replace(notes_rel, "")
+            zf.writestr(f"ppt/slides/_rels/slide{i}.xml.rels", rels)
+
+    os.replace(tmp_path, output_path)
+    return {"slides": len(numbers), "media": len(media_by_hash), "shared_media": shared}
+
+
+def verify_pptx(output_path, slide_files: dict, notes_by_number=None) -> list:
+    """
+    Re-open output_path with python-pptx and check slide count, picture bytes and notes.
+    Returns a list of problems (empty if the round trip matches).
+    """
+    notes_by_number = notes_by_number or {}
+    numbers = sorted(slide_files)
+    prs = Presentation(str(output_path))
+    problems = []
+    if len(prs.slides) != len(numbers):
+        problems.append(f"expected {len(numbers)} slides, found {len(prs.slides)}")
+    for num, slide in zip(numbers, prs.slides):
+        pictures = [shape for shape in slide.shapes if shape.shape_type == 13]  # MSO_SHAPE_TYPE.PICTURE
+        if len(pictures) != 1:
+            problems.append(f"slide {num}: expected 1 picture, found {len(pictures)}")
+        elif pictures[0].image.blob != Path(slide_files[num]).read_bytes():
+            problems.append(f"slide {num}: picture bytes differ from {slide_files[num]}")
+        expected = notes_by_number.get(num) or ""
+        actual = slide.notes_slide.notes_text_frame.text if slide.has_notes_slide else ""
+        if actual != expected:
+            problems.append(f"slide {num}: notes differ")
+    return problems
@@ -0,0 +1,225 @@
+"""
+Static file handling for start-server.py: resized/WebP derivatives, validators and gzip.
+
+Any image can be requested at a smaller width or in another format by adding
+`?w=640` and/or `?format=webp|jpeg`. Derivatives are generated once, off the
+IO loop, and kept under generated_slides/.cache/derivatives/<variant>/, where
+the variant is the source's path, width and format and the file name is keyed
+on the source's mtime and size. A re-rendered slide gets a fresh derivative,
+which replaces the older ones of its variant, and the originals are never
+touched. The cache is bounded like the render cache: a running size total,
+and once it is over DEFAULT_MAX_BYTES the least-recently-used derivatives
+(by access time, refreshed on every hit; the mtime stays, as ETags use it)
+are deleted down to EVICT_TO of the limit. Widths are rounded up to one of WIDTHS
+(and never upscaled), which keeps the number of variants per image small.
+Without `format`, derivatives are WebP for browsers that accept it.
+
+Every response carries an ETag derived from the served file's mtime and size
+(instead of hashing multi-MB images per request), so revisits are answered
+with 304s. Text responses (HTML, JS, CSS, JSON) are gzipped, and byte ranges
+are honoured.
+"""
+
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from livereload import Server
+from PIL import Image
+from tornado import web
+
+from run_events import RunEventsHandler
+
+DERIVATIVE_VERSION = 1
+DEFAULT_CACHE_DIR = Path("generated_slides") / ".cache" / "derivatives"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MiB
+EVICT_TO = 0.9
+WIDTHS = (160, 320, 640, 960, 1280, 1920, 2560)
+FORMATS = {"webp": ("WEBP", ".webp"), "jpeg": ("JPEG", ".jpg")}
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
+
+# Text is always revalidated so live reload shows edits at once; images may be reused briefly.
+TEXT_CACHE_CONTROL = "no-cache"
+IMAGE_CACHE_CONTROL = "public, max-age=60"
+
+_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="derivative")
+_inflight = {}  # derivative path -> asyncio.Future while it is being generated
+_sizes = {}  # cache dir -> bytes of derivatives in it, once scanned
+_sizes_lock = threading.Lock()
+
+
+def snap_width(width: int) -> int:
+    """Round a requested width up to the nearest allowed width."""
+    return next((w for w in WIDTHS if w >= width), WIDTHS[-1])
+
+
+def derivative_path(source: Path, width, fmt: str, cache_dir: Path = DEFAULT_CACHE_DIR) -> Path:
+    st = os.stat(source)
+    variant = f"{DERIVATIVE_VERSION}\0{Path(source).resolve()}\0{width or ''}\0{fmt}"
+    version = f"{st.st_mtime_ns}\0{st.st_size}"
+    return (
+        Path(cache_dir)
+        / hashlib.sha256(variant.encode("utf-8")).hexdigest()[:32]
+        / (hashlib.sha256(version.encode("utf-8")).hexdigest()[:16] + FORMATS[fmt][1])
+    )
+
+
+def _touch(path: Path) -> bool:
+    """Mark a derivative as used (atime only: its mtime is the ETag); False if it does not exist."""
+    try:
+        st = os.stat(path)
+        os.utime(path, ns=(time.time_ns(), st.st_mtime_ns))
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _cached_files(cache_dir: Path):
+    for entry in os.scandir(cache_dir):
+        if entry.is_dir(follow_symlinks=False):
+            with os.scandir(entry.path) as it:
+                yield from (Path(e.path) for e in it if not e.name.startswith("."))
+        elif not entry.name.startswith("."):
+            yield Path(entry.path)  # a derivative from before the per-variant layout
+
+
+def evict(cache_dir: Path = DEFAULT_CACHE_DIR, added: int = 0, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+    """Add added bytes to cache_dir's running total; if it is over max_bytes, delete LRU derivatives."""
+    cache_dir = Path(cache_dir)
+    with _sizes_lock:
+        size = _sizes.get(cache_dir)
+        if size is not None:
+            _sizes[cache_dir] = size = size + added
+            if size <= max_bytes:
+                return
+        # Rescanned rather than trusted: several servers may share the cache.
+        files = []
+        for path in _cached_files(cache_dir):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((st.st_atime, st.st_size, path))
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        if total > max_bytes:
+            for _, size, path in files:
+                if total <= max_bytes * EVICT_TO:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+        _sizes[cache_dir] = total
+
+
+def make_derivative(source: Path, width, fmt: str, cache_dir: Path = DEFAULT_CACHE_DIR) -> Path:
+    """
+    Write (if missing) and return the derivative of source at width (None: full size) in fmt.
+    Older derivatives of the same variant are deleted.
+    """
+    path = derivative_path(source, width, fmt, cache_dir)
+    if path.exists():
+        return path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with Image.open(source) as im:
+        if width and width < im.width:
+            # thumbnail() decodes JPEGs at reduced scale first, which is much faster than a full decode.
+            im.thumbnail((width, im.height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        else:
+            im.load()
+        if im.mode not in ("RGB", "RGBA") or (fmt == "jpeg" and im.mode != "RGB"):
+            im = im.convert("RGB")
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        if fmt == "webp":
+            im.save(tmp, format="WEBP", quality=80, method=4)
+        else:
+            im.save(tmp, format="JPEG", quality=85, progressive=True, optimize=True)
+    os.replace(tmp, path)
+    added = path.stat().st_size
+    for old in path.parent.iterdir():
+        if old != path and not old.name.startswith("."):
+            try:
+                size = old.stat().st_size
+                old.unlink()
+            except FileNotFoundError:
+                continue
+            added -= size
+    evict(cache_dir, added)
+    return path
+
+
+async def derivative(source: Path, width, fmt: str) -> Path:
+    """make_derivative on the worker pool; concurrent requests for the same variant share one job."""
+    path = derivative_path(source, width, fmt)
+    if _touch(path):
+        return path
+    future = _inflight.get(path)
+    if future is None:
+        future = asyncio.get_running_loop().run_in_executor(_executor, make_derivative, source, width, fmt)
+        _inflight[path] = future
+        future.add_done_callback(lambda _: _inflight.pop(path, None))
+    return await future
+
+
+class PreviewFileHandler(web.StaticFileHandler):
+    """Static files plus ?w= / ?format= image derivatives, cheap ETags, Cache-Control and gzip."""
+
+    _derivative = None
+
+    def prepare(self):
+        # The livereload Application is built without compress_response, so add gzip per
+        # request, after its script injector. Ranges are served from the uncompressed file.
+        if "Range" not in self.request.headers:
+            self._transforms.append(web.GZipContentEncoding(self.request))
+
+    async def get(self, path, include_body=True):
+        self._derivative = None
+        width = self.get_argument("w", None)
+        fmt = self.get_argument("format", None)
+        if width is not None or fmt is not None:
+            root = Path(self.root).resolve()
+            source = Path(root, path).resolve()
+            # Paths outside root are left to StaticFileHandler, which refuses them.
+            if root in source.parents and source.suffix.lower() in IMAGE_EXTENSIONS and source.is_file():
+                try:
+                    width = snap_width(int(width)) if width is not None else None
+                except ValueError:
+                    raise web.HTTPError(400, "w must be an integer")
+                if fmt is None:
+                    fmt = "webp" if "image/webp" in self.request.headers.get("Accept", "") else "jpeg"
+                    self.set_header("Vary", "Accept")
+                if fmt not in FORMATS:
+                    raise web.HTTPError(400, f"format must be one of: {', '.join(FORMATS)}")
+                self._derivative = await derivative(source, width, fmt)
+        await super().get(path, include_body)
+
+    def validate_absolute_path(self, root, absolute_path):
+        # The requested path is checked against root as usual, then the derivative is served in its place.
+        absolute_path = super().validate_absolute_path(root, absolute_path)
+        if absolute_path is None or self._derivative is None:
+            return absolute_path
+        self._stat_result = os.stat(self._derivative)
+        return str(self._derivative.resolve())
+
+    def compute_etag(self):
+        st = self._stat()
+        return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+    def set_extra_headers(self, path):
+        content_type = self.get_content_type()
+        self.set_header("Cache-Control", IMAGE_CACHE_CONTROL if content_type.startswith("image/") else TEXT_CACHE_CONTROL)
+
+
+class PreviewServer(Server):
+    """livereload Server that serves files through PreviewFileHandler, plus run gallery events (see run_events)."""
+
+    def __init__(self, app=None, watcher=None):
+        super().__init__(app=app, watcher=watcher)
+        self.SFH = PreviewFileHandler
+
+    def get_web_handlers(self, script):
+        events = (r"/__events/(.*)", RunEventsHandler, {"root": self.root or ".", "watcher": self.watcher})
+        return [events] + super().get_web_handlers(script)
@@ -0,0 +1,220 @@
+"""
+Persistent, content-addressed cache of rendered slide images.
+
+Entries are keyed on everything that determines a render: the fully built
+prompt, the sha256 of every input image, the model name, image size and aspect
+ratio. Keys made before input images were hashed by digest are still
+recognised (legacy_render_key), so an upgrade does not re-render the cache. A hit is served by linking the cached file(s) into the run directory, so
+unchanged slides never cost an API call. The cache is bounded by size and
+evicts least-recently-used entries (tracked via file mtime, refreshed on hit).
+The size is scanned once and then kept as a running total, so the cache is only
+rescanned when it goes over the limit, and it is then trimmed to EVICT_TO of
+the limit. Several processes may share the cache: an entry that disappears
+while it is being read is a miss. Given a blob store, stored files are
+ingested into it first, so a cache entry, the run files linked from it and
+the blob are one inode rather than separate copies.
+"""
+
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024  # 2 GiB
+EVICT_TO = 0.9  # fraction of max_bytes left after an eviction, so the next few stores need no rescan
+
+
+def _sha256_file(path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def render_key(
+    prompt: str,
+    image_paths: Optional[Sequence[str]],
+    model: str,
+    image_size: Optional[str],
+    aspect_ratio: Optional[str],
+    file_digest: Callable[[str], str] = _sha256_file,
+) -> str:
+    """
+    Return a hex digest identifying one render request. Input images enter it by
+    file_digest(path), their hex sha256; pass a memoised one to avoid re-reading shared inputs.
+    """
+    h = hashlib.sha256(b"render-key-v2")
+    for field in (model, image_size or "", aspect_ratio or "", prompt):
+        data = field.encode("utf-8")
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    for path in image_paths or []:
+        h.update(bytes.fromhex(file_digest(path)))
+    return h.hexdigest()
+
+
+def legacy_render_key(
+    prompt: str,
+    image_paths: Optional[Sequence[str]],
+    model: str,
+    image_size: Optional[str],
+    aspect_ratio: Optional[str],
+) -> str:
+    """The key render_key returned before it hashed input images by digest (for existing entries)."""
+    h = hashlib.sha256()
+    for field in (model, image_size or "", aspect_ratio or "", prompt):
+        data = field.encode("utf-8")
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    for path in image_paths or []:
+        data = Path(path).read_bytes()
+        h.update(len(data).to_bytes(8, "big"))
+        h.update(data)
+    return h.hexdigest()
+
+
+def link_or_copy(src: Path, dst: Path) -> None:
+    """Hard-link src to dst (replacing dst atomically), falling back to a copy across filesystems."""
+    dst = Path(dst)
+    tmp = dst.with_name(f".{dst.name}.tmp")
+    if tmp.exists() or tmp.is_symlink():
+        tmp.unlink()
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+
+class RenderCache:
+    """On-disk LRU cache of rendered images, safe to share between worker threads."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES, blobs=None):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.blobs = blobs  # a blob_store.BlobStore, or None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None  # bytes in the cache; scanned on first eviction check, then kept up to date
+        self._lock = threading.Lock()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def _list(self, key: str) -> List[Path]:
+        try:
+            return sorted(self._entry_dir(key).iterdir())
+        except OSError:
+            return []
+
+    def _adopt_legacy(self, key: str, legacy_key: str) -> None:
+        """Move an entry stored under its legacy_render_key to key."""
+        entry = self._entry_dir(key)
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            self._entry_dir(legacy_key).rename(entry)
+        except OSError:
+            pass  # no such entry, or another worker adopted it first
+
+    def lookup(self, key: str, legacy_key: Optional[Callable[[], str]] = None) -> List[Path]:
+        """
+        Return cached files for key (sorted by output index), or [] on a miss.
+        On a miss, legacy_key() (only called then) names an older entry to adopt under key.
+        """
+        files = self._list(key)
+        if not files and legacy_key is not None:
+            self._adopt_legacy(key, legacy_key())
+            files = self._list(key)
+        with self._lock:
+            if files:
+                self.hits += 1
+            else:
+                self.misses += 1
+        for f in files:
+            try:
+                os.utime(f)  # mark as recently used
+            except OSError:
+                pass
+        return files
+
+    def fetch(self, key: str, output_prefix: str, legacy_key: Optional[Callable[[], str]] = None) -> List[str]:
+        """
+        Link cached files for key (or legacy_key(), see lookup) to <output_prefix>_<i><ext>; return the new paths.
+        Returns [] on a miss, including an entry evicted (here or by another process) meanwhile.
+        """
+        outputs = []
+        for cached in self.lookup(key, legacy_key):
+            dst = Path(f"{output_prefix}{cached.name}")
+            try:
+                link_or_copy(cached, dst)
+            except FileNotFoundError:
+                for path in outputs:
+                    Path(path).unlink(missing_ok=True)
+                with self._lock:
+                    self.hits -= 1
+                    self.misses += 1
+                return []
+            outputs.append(str(dst))
+        return outputs
+
+    def store(self, key: str, output_prefix: str, files: Sequence[str]) -> None:
+        """Add freshly rendered files (named <output_prefix>_<i><ext>) to the cache."""
+        if not files:
+            return
+        entry = self._entry_dir(key)
+        tmp = entry.with_name(f"{key}.tmp{threading.get_ident()}")
+        tmp.mkdir(parents=True, exist_ok=True)
+        for f in files:
+            name = os.path.basename(f)[len(os.path.basename(output_prefix)):]
+            if self.blobs is not None:
+                try:
+                    self.blobs.ingest(f)
+                except OSError as e:
+                    print(f"Warning: could not add {f} to the blob store: {e}")
+            link_or_copy(Path(f), tmp / name)
+        size = sum(f.stat().st_size for f in tmp.iterdir())
+        try:
+            tmp.rename(entry)
+        except OSError:
+            # Another worker stored the same key first; keep theirs.
+            shutil.rmtree(tmp, ignore_errors=True)
+            size = 0
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+        self.evict()
+
+    def _scan(self) -> list:
+        """(last used, size, entry dir) for every entry; entries removed meanwhile are skipped."""
+        entries = []
+        for entry in self.cache_dir.glob("??/*"):
+            if ".tmp" in entry.name:
+                continue
+            try:
+                stats = [f.stat() for f in entry.iterdir()]
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            entries.append((max((st.st_mtime for st in stats), default=0), sum(st.st_size for st in stats), entry))
+        return entries
+
+    def evict(self) -> None:
+        """If the cache is over max_bytes, remove least-recently-used entries down to EVICT_TO of it."""
+        if self.max_bytes is None or not self.cache_dir.exists():
+            return
+        with self._lock:
+            if self._size is not None and self._size <= self.max_bytes:
+                return
+            # Rescanned rather than trusted: other processes add to (and evict from) the same cache.
+            entries = sorted(self._scan())
+            total = sum(size for _, size, _ in entries)
+            if total > self.max_bytes:
+                for _, size, entry in entries:
+                    if total <= self.max_bytes * EVICT_TO:
+                        break
+                    shutil.rmtree(entry, ignore_errors=True)
+                    total -= size
+                    self.evictions += 1
+            self._size = total
+
+    def summary(self) -> str:
+        return f"Render cache: {self.hits} hit(s), {self.misses} miss(es), {self.evictions} eviction(s)"
@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Long-lived local render service.
+
+Keeps one scheduler, genai client and render cache warm and accepts generation
+jobs over a small JSON HTTP API. Jobs and per-slide state are stored in SQLite
+(generated_slides/.service/jobs.sqlite3), so a crash or Ctrl+C loses nothing:
+on restart, slides that were pending or in flight are queued again and
+unfinished jobs carry on.
+
+Identical work is done once:
+- submitting the same outline/style/mode/slides while an earlier identical job
+  is still queued or running returns that job instead of creating a new one;
+- slides with the same prompt hash (see render_cache.render_key) in different
+  jobs wait for the first one in flight and are then served from the render
+  cache.
+
+Slides are taken round-robin across jobs (scheduler.FairQueue). Each job is
+written to generated_slides/<yaml-stem>/<timestamp>/ with manifest, PDF and
+index, exactly like tools/generate_slides.py.
+
+API:
+  POST /jobs        {"yaml": path, "style": name, "mode": mode, "slides": [n, ...]}
+  GET  /jobs        recent jobs
+  GET  /jobs/<id>   job with per-slide status
+  GET  /health
+
+Example:
+  python tools/render_service.py --port 8765 --rpm 60
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+import run_catalog
+import run_manifest
+from generate_slides import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_RETRIES,
+    build_blob_store,
+    build_cache,
+    build_run_artifacts,
+    build_scheduler,
+    build_slide_prompt,
+    collect_run_images,
+    generate_slide,
+    load_deck_config,
+    parse_slides,
+    prompt_hash,
+    resolve_style,
+)
+from scheduler import FairQueue
+
+DEFAULT_PORT = 8765
+DB_NAME = "jobs.sqlite3"
+ACTIVE_JOB_STATES = ("queued", "running")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    request_key TEXT NOT NULL,
+    outline TEXT NOT NULL,
+    style_pack TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    output_dir TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created TEXT NOT NULL,
+    updated TEXT NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_request_key ON jobs (request_key, status);
+CREATE TABLE IF NOT EXISTS slides (
+    job_id TEXT NOT NULL REFERENCES jobs (id),
+    number INTEGER NOT NULL,
+    spec TEXT NOT NULL,
+    status TEXT NOT NULL,
+    prompt_hash TEXT,
+    files TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, number)
+);
+"""
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def request_key(outline_path: Path, style_pack: str, mode: str, slides) -> str:
+    """Identity of a job request: outline bytes plus the settings that change its prompts."""
+    h = hashlib.sha256()
+    h.update(outline_path.read_bytes())
+    h.update(json.dumps([str(outline_path), style_pack, mode, sorted(slides or [])]).encode("utf-8"))
+    return h.hexdigest()
+
+
+class JobStore:
+    """SQLite persistence for jobs and per-slide state. One connection, serialized by a lock."""
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def find_active(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE request_key = ? AND status IN (?, ?) ORDER BY created LIMIT 1",
+                (key, *ACTIVE_JOB_STATES),
+            ).fetchone()
+        return row["id"] if row else None
+
+    def create_job(self, job_id, key, outline, style_pack, mode, output_dir, slides) -> None:
+        now = _now()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(
+                "INSERT INTO jobs (id, request_key, outline, style_pack, mode, output_dir, status, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, 'queued', ?, ?)",
+                (job_id, key, str(outline), style_pack, mode, str(output_dir), now, now),
+            )
+            self._conn.executemany(
+                "INSERT INTO slides (job_id, number, spec, status) VALUES (?, ?, ?, 'pending')",
+                [(job_id, slide["number"], json.dumps(slide, default=str)) for slide in slides],
+            )
+            self._conn.execute("COMMIT")
+
+    def set_job(self, job_id, status, error=None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated = ? WHERE id = ?", (status, error, _now(), job_id)
+            )
+
+    def set_slide(self, job_id, number, status, prompt_hash=None, files=None, error=None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE slides SET status = ?, prompt_hash = COALESCE(?, prompt_hash), files = ?, error = ? "
+                "WHERE job_id = ? AND number = ?",
+                (status, prompt_hash, json.dumps(files) if files is not None else None, error, job_id, number),
+            )
+
+    def recover(self) -> list:
+        """Requeue slides that were in flight when the service stopped; return unfinished job rows."""
+        with self._lock:
+            self._conn.execute("UPDATE slides SET status = 'pending' WHERE status = 'running'")
+            return [
+                dict(row)
+                for row in self._conn.execute(
+                    "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created", ACTIVE_JOB_STATES
+                )
+            ]
+
+    def slides(self, job_id) -> list:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM slides WHERE job_id = ? ORDER BY number", (job_id,)).fetchall()
+        return [
+            {
+                "number": row["number"],
+                "spec": json.loads(row["spec"]),
+                "status": row["status"],
+                "prompt_hash": row["prompt_hash"],
+                "files": json.loads(row["files"]) if row["files"] else [],
+                "error": row["error"],
+            }
+            for row in rows
+        ]
+
+    def job(self, job_id, with_slides=True):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job.pop("request_key")
+        slides = self.slides(job_id)
+        counts = {}
+        for slide in slides:
+            counts[slide["status"]] = counts.get(slide["status"], 0) + 1
+        job["counts"] = counts
+        if with_slides:
+            job["slides"] = [
+                {key: slide[key] for key in ("number", "status", "files", "error")} for slide in slides
+            ]
+        return job
+
+    def jobs(self, limit=50) -> list:
+        with self._lock:
+            ids = [row["id"] for row in self._conn.execute("SELECT id FROM jobs ORDER BY created DESC LIMIT ?", (limit,))]
+        return [self.job(job_id, with_slides=False) for job_id in ids]
+
+
+class RenderService:
+    """Runs queued slides from every job on a shared pool of worker threads."""
+
+    def __init__(self, project_root: Path, store: JobStore, scheduler, cache, deck_cfg: dict, workers: int, blobs=None):
+        self.project_root = project_root
+        self.base_output = project_root / "generated_slides"
+        self.catalog = run_catalog.RunCatalog(self.base_output)
+        self.blobs = blobs
+        self.store = store
+        self.scheduler = scheduler
+        self.cache = cache
+        self.deck_cfg = deck_cfg
+        self.workers = workers
+        self.queue = FairQueue()
+        self._jobs = {}
+        self._styles = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._work = threading.Condition(self._lock)
+        self._submit_lock = threading.Lock()
+
+    # -- jobs --------------------------------------------------------------
+
+    def _style(self, style_pack_name):
+        with self._lock:
+            if style_pack_name not in self._styles:
+                self._styles[style_pack_name] = resolve_style(style_pack_name, self.project_root)
+            return self._styles[style_pack_name]
+
+    def _activate(self, job_id, outline, style_pack, mode, output_dir, pending) -> None:
+        style_text, base_style_name, auto_style_refs = self._style(style_pack)
+        job = SimpleNamespace(
+            id=job_id,
+            outline=Path(outline),
+            mode=mode,
+            output_dir=Path(output_dir),
+            style_text=style_text,
+            base_style_name=base_style_name,
+            auto_style_refs=auto_style_refs,
+            remaining=len(pending),
+            args=(style_text, base_style_name, Path(output_dir), self.project_root, mode, auto_style_refs),
+        )
+        with self._work:
+            self._jobs[job_id] = job
+            for slide in pending:
+                self.queue.put(job_id, slide)
+            self._work.notify_all()
+        if not pending:
+            self._finish(job)
+
+    def _new_output_dir(self, stem: str) -> Path:
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_dir = self.base_output / stem / stamp
+        n = 2
+        while output_dir.exists():
+            output_dir = self.base_output / stem / f"{stamp}_{n}"
+            n += 1
+        output_dir.mkdir(parents=True)
+        return output_dir
+
+    def submit(self, outline, style=None, mode=None, slides=None) -> dict:
+        """Create (or reuse an identical active) job; raises ValueError/FileNotFoundError on bad input."""
+        outline_path = Path(outline)
+        if not outline_path.is_absolute():
+            outline_path = self.project_root / outline_path
+        if not outline_path.is_file():
+            raise FileNotFoundError(f"outline not found: {outline_path}")
+        style_pack = style or self.deck_cfg.get("style_pack") or "glass_garden"
+        mode = mode or self.deck_cfg.get("mode") or "balanced"
+        if mode not in ("structured", "balanced", "expressive"):
+            raise ValueError(f"unknown mode: {mode}")
+        self._style(style_pack)
+
+        key = request_key(outline_path, style_pack, mode, slides)
+        with self._submit_lock:
+            existing = self.store.find_active(key)
+            if existing:
+                return dict(self.store.job(existing, with_slides=False), deduplicated=True)
+
+            parsed = parse_slides(str(outline_path), specific_slides=slides or None, mode=mode)
+            job_id = uuid.uuid4().hex[:12]
+            output_dir = self._new_output_dir(outline_path.stem)
+            self.store.create_job(job_id, key, outline_path, style_pack, mode, output_dir, parsed)
+        self.catalog.started(output_dir, outline_path, style_pack, mode)
+        print(f"[service] job {job_id}: {len(parsed)} slide(s) from {outline_path.name} -> {output_dir}")
+        self._activate(job_id, outline_path, style_pack, mode, output_dir, parsed)
+        return dict(self.store.job(job_id, with_slides=False), deduplicated=False)
+
+    def resume(self) -> None:
+        """Queue every unfinished job found in the store."""
+        for row in self.store.recover():
+            pending = [s["spec"] for s in self.store.slides(row["id"]) if s["status"] == "pending"]
+            print(f"[service] resuming job {row['id']}: {len(pending)} slide(s) left")
+            self._activate(row["id"], row["outline"], row["style_pack"], row["mode"], row["output_dir"], pending)
+
+    def _finish(self, job) -> None:
+        slides = self.store.slides(job.id)
+        entries = {
+            s["number"]: {
+                "doc_hash": s["spec"]["doc_hash"],
+                "prompt_hash": s["prompt_hash"],
+                "files": [Path(f).name for f in s["files"]],
+            }
+            for s in slides
+            if s["status"] == "done"
+        }
+        failed = sum(1 for s in slides if s["status"] == "failed")
+        run_manifest.write_manifest(job.output_dir, job.outline, job.base_style_name, job.mode, entries)
+        build_run_artifacts(job.output_dir, collect_run_images(job.output_dir, [s["spec"] for s in slides]), blobs=self.blobs)
+        self.catalog.finished(job.output_dir, len(slides), len(entries), failed)
+        if failed:
+            self.store.set_job(job.id, "failed", error=f"{failed} slide(s) failed")
+        else:
+            self.store.set_job(job.id, "done")
+        with self._lock:
+            self._jobs.pop(job.id, None)
+        print(f"[service] job {job.id} finished: {len(entries)} done, {failed} failed")
+
+    # -- workers -----------------------------------------------------------
+
+    def _next(self):
+        with self._work:
+            while True:
+                item = self.queue.get()
+                if item is not None:
+                    job_id, slide = item
+                    return self._jobs[job_id], slide
+                self._work.wait()
+
+    def _render(self, job, slide) -> dict:
+        # Identical prompts in flight for another job: wait for it, then take it from the render cache.
+        prompt, image_inputs = build_slide_prompt(
+            slide, job.style_text, job.base_style_name, self.project_root, job.mode, job.auto_style_refs, verbose=False
+        )
+        key = prompt_hash(prompt, image_inputs)
+        with self._lock:
+            leader = self._inflight.get(key)
+            if leader is None:
+                self._inflight[key] = threading.Event()
+        if leader is not None:
+            leader.wait()
+            return generate_slide(slide, *job.args, self.cache, self.scheduler)
+        try:
+            return generate_slide(slide, *job.args, self.cache, self.scheduler)
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+    def _worker(self) -> None:
+        while True:
+            job, slide = self._next()
+            self.store.set_job(job.id, "running")
+            self.store.set_slide(job.id, slide["number"], "running")
+            result = self._render(job, slide)
+            self.store.set_slide(
+                job.id,
+                slide["number"],
+                "done" if result["ok"] else "failed",
+                prompt_hash=result["prompt_hash"],
+                files=result["files"],
+                error=result["error"],
+            )
+            with self._lock:
+                job.remaining -= 1
+                finished = job.remaining == 0
+            if finished:
+                self._finish(job)
+
+    def start(self) -> None:
+        self.resume()
+        for _ in range(self.workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def health(self) -> dict:
+        with self._lock:
+            active = len(self._jobs)
+        return {"ok": True, "active_jobs": active, "queued_slides": len(self.queue), "scheduler": self.scheduler.summary()}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None
+
+    def _send(self, status: int, payload) -> None:
+        body = json.dumps(payload, indent=2).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0].rstrip("/")
+        if path == "/health":
+            self._send(200, self.service.health())
+        elif path == "/jobs":
+            self._send(200, self.service.store.jobs())
+        elif path.startswith("/jobs/"):
+            job = self.service.store.job(path[len("/jobs/"):])
+            if job is None:
+                self._send(404, {"error": "job not found"})
+            else:
+                self._send(200, job)
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            self._send(404, {"error": "not found"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not request.get("yaml"):
+                raise ValueError("'yaml' (outline path) is required")
+            slides = [int(n) for n in request.get("slides") or []]
+            job = self.service.submit(request["yaml"], request.get("style"), request.get("mode"), slides)
+        except (ValueError, FileNotFoundError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        self._send(200 if job["deduplicated"] else 202, job)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local render service (SQLite-backed job queue over HTTP)")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--db", default=None, help=f"SQLite job database (default: generated_slides/.service/{DB_NAME})")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help=f"Optional override for deck.yaml concurrency. Slides rendered at once across all jobs to start with (default: {DEFAULT_CONCURRENCY}).",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        default=None,
+        help="Optional override for deck.yaml rpm. Requests-per-minute quota shared by all jobs (default: unpaced).",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=None,
+        help=f"Optional override for deck.yaml max_concurrency. Upper bound for adaptive concurrency (default: {DEFAULT_MAX_CONCURRENCY}).",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=None,
+        help=f"Optional override for deck.yaml retries. Retries per slide on 429/5xx errors (default: {DEFAULT_RETRIES}).",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=None,
+        help="Optional override for deck.yaml cache_max_mb. Render cache size limit; least-recently-used entries are evicted.",
+    )
+    parser.set_defaults(no_cache=False, no_dedupe=False)
+    args = parser.parse_args()
+
+    script_dir = Path(__file__).parent
+    project_root = script_dir.parent
+    base_output = project_root / "generated_slides"
+    deck_cfg = load_deck_config(project_root / "deck.yaml")
+
+    concurrency = max(1, int(args.concurrency or deck_cfg.get("concurrency") or DEFAULT_CONCURRENCY))
+    scheduler = build_scheduler(args, deck_cfg, concurrency)
+    cache = build_cache(args, deck_cfg, base_output)
+    if cache is None:
+        print("Warning: render cache disabled in deck.yaml; identical slides in different jobs will each be rendered.")
+    store = JobStore(Path(args.db) if args.db else base_output / ".service" / DB_NAME)
+
+    blobs = build_blob_store(args, deck_cfg, base_output)
+    service = RenderService(project_root, store, scheduler, cache, deck_cfg, workers=scheduler.max_concurrency, blobs=blobs)
+    service.start()
+    _Handler.service = service
+    server = ThreadingHTTPServer((args.host, args.port), _Handler)
+    print(f"Render service listening on http://{args.host}:{args.port}")
+    print("Press Ctrl+C to stop; unfinished jobs resume on the next start.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nRender service stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Catalog of generation runs, so finding "the latest run" does not scan history.
+
+generated_slides/.catalog/ holds:
+
+  runs.jsonl          append-only, one record per run event:
+                        {"event": "start", "run": "<yaml-stem>/<timestamp>", "outline": ...,
+                         "style_pack": ..., "mode": ..., "backend": ..., "tier": ...,
+                         "pid": ..., "host": ..., "time": ...}
+                        {"event": "finish", "run": ..., "status": "done" | "failed",
+                         "slides": 12, "generated": 11, "failed": 1, "time": ...}
+                        {"event": "interrupted", "run": ..., "time": ...}
+                        {"event": "exported", "run": ..., "file": "pptx/....pptx", "time": ...}
+                        {"event": "deleted", "run": ..., "time": ...}  (written by run_gc)
+  latest.json         the most recently started run (its folded record)
+  latest/<stem>.json  the same, per outline
+
+A run with no finish event is "running" only while it is live: its process
+(pid on this host) still exists or, where that cannot be checked, its journal
+was written in the last STALE_AFTER seconds. Otherwise it is reported as
+"interrupted" (crashed, killed, or its machine went away), and the next run
+of the same outline records that in the catalog.
+
+Pointers are replaced atomically when a run starts and again when it finishes,
+so `latest` is one small file read however many runs generated_slides/ holds.
+Run paths are relative to generated_slides/.
+
+A tree that predates the catalog is indexed once, from each run directory's
+manifest.json or journal.jsonl (one directory listing per outline, no image
+scans), the first time the catalog is needed.
+
+Only the standard library is used, so the nano-slides skill imports this
+directly.
+
+Examples:
+  python tools/run_catalog.py list --outline sample_slides
+  python tools/run_catalog.py show sample_slides/20250101_120000
+  python tools/run_catalog.py latest
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+CATALOG_DIR = ".catalog"
+CATALOG_NAME = "runs.jsonl"
+LATEST_NAME = "latest.json"
+LATEST_DIR = "latest"
+# Written into run directories by run_manifest and run_journal; read when indexing an old tree.
+MANIFEST_NAME = "manifest.json"
+JOURNAL_NAME = "journal.jsonl"
+# A run without a finish event whose process cannot be checked counts as interrupted
+# once neither its journal nor its directory has been written for this long.
+STALE_AFTER = 30 * 60
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _write_json(path: Path, data: dict) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _pid_alive(pid):
+    """True/False if pid is/is not a running process here, None if that cannot be told."""
+    if not pid or os.name != "posix":
+        return None
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return None
+    return True
+
+
+def _stem(run: str) -> str:
+    return run.split("/")[0]
+
+
+def _stamp(run: str) -> str:
+    # Run directories are timestamped, so name order is chronological.
+    return run.split("/")[-1]
+
+
+def _matches(entry: dict, backend: str = None, tier: str = None) -> bool:
+    return (backend is None or entry.get("backend", "gemini") == backend) and (tier is None or entry.get("tier", "full") == tier)
+
+
+def fold(records) -> dict:
+    """
+    Fold catalog records (or already folded entries) into
+    run -> {run, outline, ..., status, slides, generated, failed, started, finished}.
+    status is "running" until a finish or interrupted event; RunCatalog.runs() and
+    show() also report a run whose process is gone as "interrupted".
+    """
+    runs = {}
+    for record in records:
+        run = record.get("run")
+        if not run:
+            continue
+        entry = runs.setdefault(run, {"run": run})
+        fields = {k: v for k, v in record.items() if k not in ("event", "time")}
+        if "event" not in record:
+            entry.update(record)  # an already folded entry
+        elif record.get("event") == "start":
+            # A resumed run starts again: its previous outcome no longer holds.
+            for key in ("status", "slides", "generated", "failed", "finished", "interrupted"):
+                entry.pop(key, None)
+            entry.update(fields, status="running", started=record.get("time"))
+        elif record.get("event") == "finish":
+            entry.update(fields, finished=record.get("time"))
+        elif record.get("event") == "interrupted":
+            if entry.get("status") == "running":
+                entry.update(status="interrupted", interrupted=record.get("time"))
+        elif record.get("event") == "exported":
+            entry["exported"] = entry.get("exported", []) + [record.get("file")]
+        elif record.get("event") == "deleted":
+            entry.update(status="deleted", deleted=record.get("time"))
+    return runs
+
+
+class RunCatalog:
+    """Reader/writer for generated_slides/.catalog/ (thread-safe; appends are single writes, pointers atomic)."""
+
+    def __init__(self, base_output):
+        self.base_output = Path(base_output)
+        self.dir = self.base_output / CATALOG_DIR
+        self.path = self.dir / CATALOG_NAME
+        self._lock = threading.Lock()
+
+    def run_id(self, run_dir) -> str:
+        run_dir = Path(run_dir)
+        try:
+            return run_dir.resolve().relative_to(self.base_output.resolve()).as_posix()
+        except ValueError:
+            return str(run_dir.resolve())
+
+    def run_dir(self, run_id: str) -> Path:
+        return self.base_output / run_id
+
+    # -- writing -------------------------------------------------------------
+
+    def _append(self, *records, point: bool = True):
+        self._ensure()
+        lines = "".join(json.dumps(record) + "\n" for record in records)
+        with self._lock:
+            # O_APPEND: concurrent writers (CLI runs, the render service) never interleave one write.
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            if not point:
+                return None
+            # The run's entry is usually what its outline's pointer already holds; only
+            # otherwise (an older run finishing after a newer one started) is the catalog read.
+            record = records[-1]
+            run = record["run"]
+            history = [record]
+            if record["event"] != "start":
+                current = _read_json(self.dir / LATEST_DIR / f"{_stem(run)}.json")
+                if current is not None and current.get("run") == run:
+                    history = [current, record]
+                else:
+                    history = [r for r in self.records() if r.get("run") == run]
+            entry = fold(history)[run]
+            self._point(entry)
+        return entry
+
+    def _point(self, entry: dict) -> None:
+        """Move the latest pointers to entry's run, unless a newer run already holds them."""
+        (self.dir / LATEST_DIR).mkdir(exist_ok=True)
+        for path in (self.dir / LATEST_NAME, self.dir / LATEST_DIR / f"{_stem(entry['run'])}.json"):
+            current = _read_json(path)
+            if current is None or _stamp(current.get("run", "")) <= _stamp(entry["run"]):
+                _write_json(path, entry)
+
+    def started(self, run_dir, outline, style_pack: str, mode: str, backend: str = "gemini", tier: str = "full") -> dict:
+        """
+        Record a run starting (or being resumed) in run_dir. If the outline's previous
+        run never finished and is no longer live, it is recorded as interrupted.
+        """
+        run = self.run_id(run_dir)
+        now = _now()
+        records = []
+        previous = _read_json(self.dir / LATEST_DIR / f"{_stem(run)}.json")
+        if previous is not None and previous.get("run") != run and not self.live(previous):
+            if previous.get("status") == "running":
+                records.append({"event": "interrupted", "run": previous["run"], "time": now})
+        records.append({
+            "event": "start",
+            "run": run,
+            "outline": str(outline),
+            "style_pack": style_pack,
+            "mode": mode,
+            "backend": backend,
+            "tier": tier,
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "time": now,
+        })
+        return self._append(*records)
+
+    def finished(self, run_dir, slides: int, generated: int, failed: int) -> dict:
+        """Record a run finishing; status is "failed" if any slide failed."""
+        return self._append({
+            "event": "finish",
+            "run": self.run_id(run_dir),
+            "status": "failed" if failed else "done",
+            "slides": slides,
+            "generated": generated,
+            "failed": failed,
+            "time": _now(),
+        })
+
+    def exported(self, run_dir, output_path) -> dict:
+        """Record that run_dir was exported (to a PPTX at output_path); run_gc keeps such runs."""
+        return self._append({"event": "exported", "run": self.run_id(run_dir), "file": str(output_path), "time": _now()})
+
+    def deleted(self, run_dirs) -> None:
+        """Record that run_dirs were deleted (by run_gc)."""
+        now = _now()
+        records = [{"event": "deleted", "run": self.run_id(run_dir), "time": now} for run_dir in run_dirs]
+        if records:
+            self._append(*records, point=False)
+
+    # -- reading -------------------------------------------------------------
+
+    def live(self, entry: dict) -> bool:
+        """Whether a run without a finish event is still being written (see the module docstring)."""
+        if entry.get("status") != "running":
+            return False
+        if entry.get("host") == socket.gethostname():
+            alive = _pid_alive(entry.get("pid"))
+            if alive is not None:
+                return alive
+        run_dir = self.run_dir(entry["run"])
+        mtimes = []
+        for path in (run_dir / JOURNAL_NAME, run_dir):
+            try:
+                mtimes.append(path.stat().st_mtime)
+            except OSError:
+                continue
+        return bool(mtimes) and datetime.now().timestamp() - max(mtimes) < STALE_AFTER
+
+    def _resolve(self, entry: dict) -> dict:
+        if entry.get("status") == "running" and not self.live(entry):
+            return dict(entry, status="interrupted")
+        return entry
+
+    def records(self) -> list:
+        self._ensure()
+        records = []
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue  # a line cut short by a crash
+        except OSError:
+            pass
+        return records
+
+    def runs(self, outline: str = None, deleted: bool = False) -> list:
+        """Folded run entries, oldest first; outline filters by yaml stem. Deleted runs are left out unless asked for."""
+        runs = sorted((self._resolve(e) for e in fold(self.records()).values()), key=lambda e: _stamp(e["run"]))
+        if not deleted:
+            runs = [e for e in runs if e.get("status") != "deleted"]
+        if outline:
+            runs = [e for e in runs if _stem(e["run"]) == outline]
+        return runs
+
+    def show(self, run_id: str):
+        """The folded entry for one run (run id or run directory), or None."""
+        if Path(run_id).is_absolute() or Path(run_id).exists():
+            run_id = self.run_id(run_id)
+        entry = fold(r for r in self.records() if r.get("run") == run_id).get(run_id)
+        return entry and self._resolve(entry)
+
+    def latest(self, outline: str = None, backend: str = None, tier: str = None):
+        """
+        Run directory of the most recently started run (of the outline with this yaml
+        stem, if given), or None. backend and tier, if given, pass over runs of other
+        backends and tiers: upscaling and export want the latest full Gemini run, not a
+        draft or preview made since. Reads one pointer file; only if that run has been
+        deleted or does not match does it fall back to the catalog.
+        """
+        self._ensure()
+        path = self.dir / LATEST_DIR / f"{outline}.json" if outline else self.dir / LATEST_NAME
+        entry = _read_json(path)
+        if entry is not None and _matches(entry, backend, tier) and self.run_dir(entry["run"]).is_dir():
+            return self.run_dir(entry["run"])
+        for entry in reversed(self.runs(outline)):
+            if _matches(entry, backend, tier) and self.run_dir(entry["run"]).is_dir():
+                if backend is None and tier is None:
+                    with self._lock:
+                        _write_json(path, entry)
+                return self.run_dir(entry["run"])
+        return None
+
+    # -- indexing a tree from before the catalog ---------------------------------
+
+    def _ensure(self) -> None:
+        if self.path.exists():
+            return
+        with self._lock:
+            if self.path.exists():
+                return
+            self.dir.mkdir(parents=True, exist_ok=True)
+            records = self._scan()
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+            os.replace(tmp, self.path)
+            for entry in fold(records).values():
+                self._point(entry)
+
+    def _scan(self) -> list:
+        records = []
+        if not self.base_output.is_dir():
+            return records
+        for stem in sorted(p for p in self.base_output.iterdir() if p.is_dir() and not p.name.startswith(".")):
+            for run_dir in sorted(p for p in stem.iterdir() if p.is_dir() and not p.name.startswith(".")):
+                records.extend(self._scan_run(run_dir))
+        return records
+
+    def _scan_run(self, run_dir: Path) -> list:
+        run = self.run_id(run_dir)
+        time = datetime.fromtimestamp(run_dir.stat().st_mtime).isoformat(timespec="seconds")
+        manifest = _read_json(run_dir / MANIFEST_NAME)
+        if manifest is not None:
+            start = {k: manifest.get(k) for k in ("outline", "style_pack", "mode")}
+            start.update(backend=manifest.get("backend", "gemini"), tier=manifest.get("tier", "full"))
+            done = len(manifest.get("slides", {}))
+            return [
+                dict(start, event="start", run=run, time=manifest.get("created", time)),
+                {"event": "finish", "run": run, "status": "done", "slides": done, "generated": done, "failed": 0, "time": time},
+            ]
+        try:
+            with open(run_dir / JOURNAL_NAME, encoding="utf-8") as f:
+                first = json.loads(f.readline())
+        except (OSError, ValueError):
+            return []
+        # Journal but no manifest: the run never finished.
+        tier = first.get("tier") or {}
+        return [{
+            "event": "start", "run": run, "outline": first.get("outline"), "style_pack": first.get("style_pack"),
+            "mode": first.get("mode"), "backend": first.get("backend", "gemini"), "tier": tier.get("name", "full"), "time": time,
+        }]
+
+
+def format_run(entry: dict) -> str:
+    counts = ""
+    if "slides" in entry:
+        counts = f"{entry['generated']}/{entry['slides']} slides"
+        if entry.get("failed"):
+            counts += f", {entry['failed']} failed"
+    tier = "" if entry.get("tier", "full") == "full" else f" [{entry['tier']}]"
+    backend = "" if entry.get("backend", "gemini") == "gemini" else f" ({entry['backend']})"
+    return f"{entry['run']:<40} {entry.get('status', '?'):<11} {counts:<24} {entry.get('style_pack') or ''}/{entry.get('mode') or ''}{tier}{backend}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List and inspect generation runs")
+    parser.add_argument("--base", default=str(Path(__file__).resolve().parent.parent / "generated_slides"), help="generated_slides directory")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_list = sub.add_parser("list", help="List runs, newest last.")
+    p_list.add_argument("--outline", default=None, help="Only runs of the outline with this yaml stem.")
+    p_list.add_argument("-n", "--limit", type=int, default=20, help="Show at most this many runs (default: 20; 0 for all).")
+    p_show = sub.add_parser("show", help="Show one run's catalog entry as JSON.")
+    p_show.add_argument("run", help="Run id (<yaml-stem>/<timestamp>) or run directory.")
+    p_latest = sub.add_parser("latest", help="Print the latest run directory.")
+    p_latest.add_argument("--outline", default=None, help="Latest run of the outline with this yaml stem.")
+    p_latest.add_argument("--backend", default=None, help="Only runs rendered by this backend (gemini or draft).")
+    p_latest.add_argument("--tier", default=None, help="Only runs of this tier (full or preview).")
+    args = parser.parse_args()
+
+    catalog = RunCatalog(args.base)
+    if args.cmd == "list":
+        runs = catalog.runs(args.outline)
+        for entry in runs[-args.limit:] if args.limit else runs:
+            print(format_run(entry))
+    elif args.cmd == "show":
+        entry = catalog.show(args.run)
+        if entry is None:
+            print(f"Error: no run {args.run} in the catalog.", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(dict(entry, path=str(catalog.run_dir(entry["run"]))), indent=2))
+    else:
+        latest = catalog.latest(args.outline, backend=args.backend, tier=args.tier)
+        if latest is None:
+            print("Error: no runs under generated_slides/.", file=sys.stderr)
+            sys.exit(1)
+        print(latest)
+
+
+if __name__ == "__main__":
+    main()
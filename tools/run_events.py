@@ -0,0 +1,70 @@
+"""
+Server-Sent Events for in-progress run galleries, served by start-server.py.
+
+GET /__events/<run-dir>/ streams `status` events for that run. Each carries
+{"state": ..., "parts": [{"id", "v", "html"}]} with the page parts (see
+run_gallery.render_parts) that changed since the last event on this
+connection, so a slide's <img> is only replaced when that slide changes. The
+first event carries every part; the page skips those whose version it already
+shows. Events are sent when RunWatcher reports a new status.json, with no
+debounce and no polling of our own.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from tornado import ioloop, iostream, web
+from tornado.concurrent import Future
+
+import run_gallery
+
+
+class RunEventsHandler(web.RequestHandler):
+    """text/event-stream of a run's gallery updates, driven by RunWatcher.subscribe()."""
+
+    def initialize(self, root, watcher):
+        self.root = root
+        self.watcher = watcher
+        self._sent = {}  # part id -> version last sent
+        self._closed = Future()
+        self._run_dir = None
+
+    async def get(self, path):
+        root = Path(self.root).resolve()
+        run_dir = Path(root, path).resolve()
+        if root not in run_dir.parents or not (run_dir / run_gallery.STATUS_NAME).is_file():
+            raise web.HTTPError(404)
+        # Same spelling as the watcher's own paths (relative to the server root).
+        self._run_dir = os.path.normpath(os.path.join(self.root, path))
+        self.set_header("Content-Type", "text/event-stream")
+        self.set_header("Cache-Control", "no-cache")
+        self.watcher.subscribe(self._run_dir, self._on_status)
+        try:
+            await self._send()
+            await self._closed
+        finally:
+            self.watcher.unsubscribe(self._run_dir, self._on_status)
+
+    def _on_status(self, path):
+        ioloop.IOLoop.current().add_callback(self._send)
+
+    async def _send(self):
+        status = run_gallery.load_status(self._run_dir)
+        if status is None or self._closed.done():
+            return
+        parts = [
+            {"id": part_id, "v": version, "html": html}
+            for part_id, version, html in run_gallery.render_parts(status)
+            if self._sent.get(part_id) != version
+        ]
+        self._sent.update((p["id"], p["v"]) for p in parts)
+        self.write(f"event: status\ndata: {json.dumps({'state': status['state'], 'parts': parts})}\n\n")
+        try:
+            await self.flush()
+        except iostream.StreamClosedError:
+            self.on_connection_close()
+
+    def on_connection_close(self):
+        if not self._closed.done():
+            self._closed.set_result(None)
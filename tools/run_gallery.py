@@ -0,0 +1,346 @@
+"""
+Thumbnail-backed index.html for a run directory.
+
+For every slide image, a process pool writes WebP thumbnails at THUMB_WIDTHS
+into <run>/thumbs/ and returns a small tile, and the tiles are joined into one
+contact sheet (thumbs/contact_sheet.webp). index.html then:
+
+  - shows each slide as a lazily loaded <img> with srcset (thumbnails, then the
+    original) and width/height, so nothing shifts while images arrive,
+  - paints the slide's tile from the contact sheet behind it, so the whole
+    gallery is visible after a single small download,
+  - links each slide to its full-size image.
+
+Thumbnails newer than their source are kept, so rebuilding the index after a
+resume or --promote only redoes the slides that changed.
+
+While a run is in progress, RunGallery keeps index.html and status.json current:
+each slide shows a placeholder once it is parsed and its image once it is
+rendered. The in-progress page follows status.json through start-server.py's
+/__events/<run>/ stream (Server-Sent Events), replacing only the parts whose
+version changed, and reloads once when the run finishes to pick up the
+contact sheet. Without the stream it reloads itself every few seconds.
+"""
+
+import hashlib
+import html
+import io
+import json
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from PIL import Image
+
+THUMBS_DIR = "thumbs"
+THUMB_WIDTHS = (480, 960)
+TILE_WIDTH = 192
+SHEET_COLUMNS = 8
+CONTACT_SHEET = "contact_sheet.webp"
+INDEX_NAME = "index.html"
+STATUS_NAME = "status.json"
+STATUS_VERSION = 1
+# Pool start-up costs more than it saves for a handful of slides.
+MIN_SLIDES_FOR_POOL = 4
+
+
+def _thumb_name(path: Path, width: int) -> str:
+    return f"{path.stem}_{width}.webp"
+
+
+def make_thumbnails(path, thumbs_dir) -> dict:
+    """
+    Write path's thumbnails into thumbs_dir (skipping up-to-date ones); returns
+    {name, width, height, thumbs: [(name, width)], tile: PNG bytes} or {name, error}.
+    """
+    path, thumbs_dir = Path(path), Path(thumbs_dir)
+    try:
+        source_mtime = path.stat().st_mtime
+        with Image.open(path) as im:
+            width, height = im.size
+            tile_size = (TILE_WIDTH, round(TILE_WIDTH * height / width))
+            wanted = [w for w in THUMB_WIDTHS if w < width]
+            stale = [
+                w for w in wanted
+                if not (thumbs_dir / _thumb_name(path, w)).exists()
+                or (thumbs_dir / _thumb_name(path, w)).stat().st_mtime < source_mtime
+            ]
+            if wanted and not stale:
+                # Everything is up to date: take the tile from the smallest thumbnail, not the source.
+                with Image.open(thumbs_dir / _thumb_name(path, wanted[0])) as small:
+                    tile = small.convert("RGB").resize(tile_size, Image.Resampling.LANCZOS)
+            else:
+                # Decode once, at the smallest scale that still covers the largest size needed.
+                largest = max(stale or [TILE_WIDTH])
+                im.draft("RGB", (largest, round(largest * height / width)))
+                im = im.convert("RGB")
+                for w in sorted(stale, reverse=True):
+                    im.thumbnail((w, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+                    target = thumbs_dir / _thumb_name(path, w)
+                    tmp = target.with_name(f".{target.name}.tmp")
+                    # method=0 encodes several times faster than the default at about the same size.
+                    im.save(tmp, format="WEBP", quality=80, method=0)
+                    os.replace(tmp, target)
+                tile = im.resize(tile_size, Image.Resampling.LANCZOS)
+        buf = io.BytesIO()
+        tile.save(buf, format="PNG", compress_level=1)
+        return {
+            "name": path.name,
+            "width": width,
+            "height": height,
+            "thumbs": [(_thumb_name(path, w), w) for w in wanted],
+            "tile": buf.getvalue(),
+        }
+    except Exception as e:
+        return {"name": path.name, "error": str(e)}
+
+
+def build_thumbnails(slide_paths, output_dir, workers=None) -> list:
+    """make_thumbnails for every slide (in a process pool for larger runs); results in slide order."""
+    thumbs_dir = Path(output_dir) / THUMBS_DIR
+    thumbs_dir.mkdir(exist_ok=True)
+    if len(slide_paths) < MIN_SLIDES_FOR_POOL:
+        return [make_thumbnails(p, thumbs_dir) for p in slide_paths]
+    workers = min(len(slide_paths), workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(make_thumbnails, slide_paths, [thumbs_dir] * len(slide_paths)))
+
+
+def write_contact_sheet(results, output_dir):
+    """Join the slides' tiles into thumbs/contact_sheet.webp; returns (columns, rows) or None."""
+    tiles = [r for r in results if "tile" in r]
+    if not tiles:
+        return None
+    tile_height = max(Image.open(io.BytesIO(r["tile"])).height for r in tiles)
+    columns = min(SHEET_COLUMNS, len(results))
+    rows = (len(results) + columns - 1) // columns
+    sheet = Image.new("RGB", (columns * TILE_WIDTH, rows * tile_height), (247, 247, 247))
+    for i, r in enumerate(results):
+        if "tile" in r:
+            sheet.paste(Image.open(io.BytesIO(r["tile"])), ((i % columns) * TILE_WIDTH, (i // columns) * tile_height))
+    path = Path(output_dir) / THUMBS_DIR / CONTACT_SHEET
+    tmp = path.with_name(f".{path.name}.tmp")
+    sheet.save(tmp, format="WEBP", quality=70)
+    os.replace(tmp, path)
+    return columns, rows
+
+
+def _tile_style(index: int, grid) -> str:
+    """CSS painting slide index's tile from the contact sheet, scaled to the element."""
+    columns, rows = grid
+    x = 100 * (index % columns) / (columns - 1) if columns > 1 else 0
+    y = 100 * (index // columns) / (rows - 1) if rows > 1 else 0
+    return (
+        f"background-image:url('{THUMBS_DIR}/{CONTACT_SHEET}');"
+        f"background-size:{columns * 100}% {rows * 100}%;background-position:{x:g}% {y:g}%"
+    )
+
+
+def _slide_number(name: str, default: int) -> int:
+    match = re.match(r"slide_(\d+)_", name)
+    return int(match.group(1)) if match else default
+
+
+def slide_entry(number: int, result: dict) -> dict:
+    """status.json entry for a finished slide from its make_thumbnails result (the tile is dropped)."""
+    entry = {key: value for key, value in result.items() if key != "tile"}
+    return dict(entry, number=number, state="done")
+
+
+def _part(part_id: str, tag: str, attrs: str, inner: str):
+    """(id, version, html) for one updatable part of the page; version changes whenever html does."""
+    version = hashlib.sha1(f"{attrs}\0{inner}".encode("utf-8")).hexdigest()[:12]
+    return part_id, version, f"<{tag} id='{part_id}' data-v='{version}'{attrs}>{inner}</{tag}>"
+
+
+def _slide_part(entry: dict, style: str = None):
+    number = entry["number"]
+    state = entry["state"]
+    name = html.escape(entry.get("name") or f"Slide {number}", quote=True)
+    if state == "pending":
+        inner = f"<h3>Slide {number}</h3><div class='placeholder'>Rendering&hellip;</div>"
+    elif state == "failed":
+        inner = f"<h3>Slide {number}</h3><div class='placeholder failed'>Failed: {html.escape(str(entry.get('error')))}</div>"
+    elif "error" in entry:
+        inner = f"<h3>{name}</h3><a href='{name}'><img src='{name}' alt='{name}' loading='lazy' /></a>"
+    else:
+        srcset = ", ".join(f"{THUMBS_DIR}/{html.escape(t, quote=True)} {w}w" for t, w in entry["thumbs"])
+        srcset += f"{', ' if srcset else ''}{name} {entry['width']}w"
+        style_attr = f" style=\"{style}\"" if style else ""
+        inner = (
+            f"<h3>{name}</h3><a href='{name}'{style_attr}>"
+            f"<img src='{name}' srcset='{srcset}' sizes='(max-width: 1008px) 100vw, 960px' "
+            f"width='{entry['width']}' height='{entry['height']}' alt='{name}' loading='lazy' decoding='async' /></a>"
+        )
+    return _part(f"slide-{number:02d}", "div", f" class='slide {state}'", inner)
+
+
+def _header_part(status: dict):
+    slides = status["slides"]
+    done = sum(1 for e in slides if e["state"] == "done")
+    failed = sum(1 for e in slides if e["state"] == "failed")
+    if status["state"] == "running":
+        title = f"Slides ({done} of {len(slides)} so far)"
+        note = " &middot; rendering, this page updates as slides finish"
+    else:
+        title = f"Slides ({done})"
+        note = ""
+    if failed:
+        note += f" &middot; {failed} failed"
+    inner = f"<h1>{title}</h1><p>Output directory: {html.escape(status['output_dir'])}{note}</p>"
+    return _part("run-header", "header", "", inner)
+
+
+def render_parts(status: dict, grid=None) -> list:
+    """The page's updatable parts as (id, version, html): the header, then one per slide in number order."""
+    parts = [_header_part(status)]
+    for i, entry in enumerate(status["slides"]):
+        parts.append(_slide_part(entry, _tile_style(i, grid) if grid and entry["state"] == "done" else None))
+    return parts
+
+
+# While a run is in progress the page patches itself from /__events/<run>/ (start-server.py);
+# without that endpoint (opened from disk, or another server) it reloads every few seconds.
+_LIVE_SCRIPT = """<script>(function(){
+  function later(){ setTimeout(function(){ location.reload(); }, 5000); }
+  if (!window.EventSource || location.protocol.indexOf('http') !== 0) { later(); return; }
+  var es = new EventSource('/__events' + location.pathname.replace(/[^/]*$/, ''));
+  es.addEventListener('status', function(e){
+    var s = JSON.parse(e.data);
+    s.parts.forEach(function(p){
+      var el = document.getElementById(p.id);
+      if (el && el.getAttribute('data-v') === p.v) return;
+      var t = document.createElement('template');
+      t.innerHTML = p.html;
+      if (el) el.replaceWith(t.content); else document.getElementById('slides').appendChild(t.content);
+    });
+    if (s.state !== 'running') { es.close(); location.reload(); }
+  });
+  es.onerror = function(){ es.close(); later(); };
+})();</script>"""
+
+
+def render_index(status: dict, grid=None) -> str:
+    parts = render_parts(status, grid)
+    lines = [
+        "<!doctype html>",
+        "<html><head><meta charset='utf-8'><title>Slides</title>",
+        "<style>body{font-family:sans-serif;background:#f7f7f7;color:#222;margin:24px;} .slide{margin-bottom:32px;max-width:960px;} "
+        ".slide a{display:block;background-repeat:no-repeat;} img{display:block;width:100%;height:auto;} "
+        ".placeholder{aspect-ratio:16/9;display:flex;align-items:center;justify-content:center;background:#e8e8e8;color:#777;} "
+        ".placeholder.failed{color:#a33;}</style>",
+        "</head><body>",
+        parts[0][2],
+        "<main id='slides'>",
+        *(part[2] for part in parts[1:]),
+        "</main>",
+    ]
+    if status["state"] == "running":
+        lines.append(_LIVE_SCRIPT)
+    lines.append("</body></html>")
+    return "\n".join(lines)
+
+
+def _write_text(path: Path, text: str) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def write_status(output_dir, status: dict, grid=None) -> Path:
+    """Write index.html, then status.json (so a client told about the new status finds the new page)."""
+    output_dir = Path(output_dir)
+    status = dict(
+        status, version=STATUS_VERSION, output_dir=str(output_dir), updated=datetime.now().isoformat(timespec="seconds")
+    )
+    index_path = output_dir / INDEX_NAME
+    _write_text(index_path, render_index(status, grid))
+    _write_text(output_dir / STATUS_NAME, json.dumps(status, indent=2))
+    return index_path
+
+
+def load_status(run_dir):
+    """Return the parsed status.json of run_dir, or None if missing/unreadable."""
+    try:
+        status = json.loads((Path(run_dir) / STATUS_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return status if status.get("version") == STATUS_VERSION else None
+
+
+def write_index(output_dir, slide_paths, workers=None, failed=()) -> Path:
+    """
+    Build thumbnails and the contact sheet, then write the finished run's index.html and
+    status.json. failed lists status entries for slides that did not render.
+    """
+    output_dir = Path(output_dir)
+    results = build_thumbnails(slide_paths, output_dir, workers)
+    grid = write_contact_sheet(results, output_dir)
+    entries = [slide_entry(_slide_number(r["name"], i + 1), r) for i, r in enumerate(results)]
+    # Failed slides go after the contact-sheet tiles, which are indexed by position.
+    shown = {e["number"] for e in entries}
+    entries += sorted((e for e in failed if e["number"] not in shown), key=lambda e: e["number"])
+    return write_status(output_dir, {"state": "finished", "slides": entries}, grid)
+
+
+class RunGallery:
+    """
+    index.html and status.json of a run in progress. Slides appear as placeholders when
+    they are parsed and are filled in (with thumbnails) as they finish, so the first
+    slides can be reviewed while later ones are still rendering. Updates are applied on
+    one background thread, so render workers and the async engine never wait on them.
+    """
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.thumbs_dir = self.output_dir / THUMBS_DIR
+        self.thumbs_dir.mkdir(exist_ok=True)
+        self._slides = {}  # number -> status entry; only touched on the update thread
+        self._queued = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gallery")
+        self._submit(lambda: None)
+
+    def _submit(self, update, *args) -> None:
+        with self._lock:
+            self._queued += 1
+        self._executor.submit(self._apply, update, *args)
+
+    def _apply(self, update, *args) -> None:
+        # Counted before the update runs, so an update that raises cannot stop later writes.
+        with self._lock:
+            self._queued -= 1
+            last = self._queued == 0
+        try:
+            update(*args)
+        except Exception as e:
+            print(f"Warning: failed to update {self.output_dir / INDEX_NAME}: {e}")
+        # A burst of updates (slides being parsed, several finishing at once) is written once.
+        if not last:
+            return
+        try:
+            slides = [self._slides[n] for n in sorted(self._slides)]
+            write_status(self.output_dir, {"state": "running", "slides": slides})
+        except Exception as e:
+            print(f"Warning: failed to update {self.output_dir / INDEX_NAME}: {e}")
+
+    def pending(self, number: int) -> None:
+        self._submit(self._set, {"number": number, "state": "pending"})
+
+    def done(self, number: int, path) -> None:
+        self._submit(lambda: self._set(slide_entry(number, make_thumbnails(path, self.thumbs_dir))))
+
+    def failed(self, number: int, error) -> None:
+        self._submit(self._set, {"number": number, "state": "failed", "error": error})
+
+    def _set(self, entry: dict) -> None:
+        self._slides[entry["number"]] = entry
+
+    def finish(self, slide_paths) -> Path:
+        """Wait for pending updates, then write the finished gallery (see write_index)."""
+        self._executor.shutdown(wait=True)
+        failed = [e for e in self._slides.values() if e["state"] == "failed"]
+        return write_index(self.output_dir, slide_paths, failed=failed)
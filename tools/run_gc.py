@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Reclaim space under generated_slides/: delete old runs by retention policy, then
+unused blobs.
+
+A run is kept if any of these holds:
+  - it is one of the newest --keep-last runs of its outline,
+  - it is still running: its process is alive (see run_catalog.RunCatalog.live);
+    runs that crashed or were killed ("interrupted") are not kept for that,
+  - it was exported to PPTX (an "exported" catalog event, or pptx/<run-name>.pptx
+    exists from before the catalog), unless --no-keep-exported.
+Runs outside generated_slides/ and directories the catalog does not know are
+never touched.
+
+Deleting a run frees only the files that nothing else links to. Images shared
+with kept runs, the render cache or the blob store stay where they are. After
+the runs are gone, blobs whose only link is the store's own are deleted. With
+--dry-run nothing is deleted and the same numbers are predicted from link
+counts. --dedupe first adds every kept run to the blob store (for runs written
+before the store existed).
+
+Examples:
+  python tools/run_gc.py --keep-last 5 --dry-run
+  python tools/run_gc.py --keep-last 3 --no-keep-exported
+  python tools/run_gc.py --dedupe --keep-last 10
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+from blob_store import BlobStore, summary
+from run_catalog import RunCatalog
+
+DEFAULT_KEEP_LAST = 5
+
+
+def plan(catalog: RunCatalog, keep_last: int = DEFAULT_KEEP_LAST, keep_exported: bool = True, pptx_dir=None):
+    """Split the catalog's runs into (keep, drop): lists of (entry, reason) and of entries."""
+    if keep_last < 1:
+        raise ValueError("keep_last must be at least 1")
+    by_outline = {}
+    for entry in catalog.runs():
+        by_outline.setdefault(entry["run"].split("/")[0], []).append(entry)
+    keep, drop = [], []
+    base = catalog.base_output.resolve()
+    for runs in by_outline.values():
+        for i, entry in enumerate(reversed(runs)):
+            run_dir = catalog.run_dir(entry["run"])
+            if not run_dir.is_dir():
+                continue
+            if base not in run_dir.resolve().parents:
+                reason = "outside generated_slides/"
+            elif i < keep_last:
+                reason = "recent"
+            elif catalog.live(entry):
+                reason = "running"
+            elif keep_exported and (entry.get("exported") or (pptx_dir and (Path(pptx_dir) / f"{run_dir.name}.pptx").exists())):
+                reason = "exported"
+            else:
+                drop.append(entry)
+                continue
+            keep.append((entry, reason))
+    return keep, drop
+
+
+def _walk(run_dir: Path):
+    for directory, _, files in os.walk(run_dir):
+        for name in files:
+            yield os.lstat(os.path.join(directory, name))
+
+
+def collect(catalog: RunCatalog, store: BlobStore, drop, dry_run: bool = False) -> dict:
+    """
+    Delete the runs in drop, then unused blobs. Returns {runs, files, blobs, reclaimed, seconds}.
+    Bytes are counted per inode, once its last link is gone.
+    """
+    start = time.monotonic()
+    stats = {"runs": 0, "files": 0, "blobs": 0, "reclaimed": 0}
+    # Links to each inode inside the dropped runs, to predict what --dry-run would free.
+    dropped_links = {}
+    # Every dropped run is walked before any is deleted: deleting one lowers the link
+    # counts seen in the next, and an inode they share would then be counted twice.
+    for entry in drop:
+        for st in _walk(catalog.run_dir(entry["run"])):
+            key = (st.st_dev, st.st_ino)
+            dropped_links[key] = dropped_links.get(key, 0) + 1
+            stats["files"] += 1
+            # The last link to this inode is in a dropped run: deleting the runs frees it.
+            if dropped_links[key] == st.st_nlink:
+                stats["reclaimed"] += st.st_size
+        stats["runs"] += 1
+    if not dry_run:
+        for entry in drop:
+            run_dir = catalog.run_dir(entry["run"])
+            shutil.rmtree(run_dir)
+            try:
+                run_dir.parent.rmdir()  # the outline's directory, once its last run is gone
+            except OSError:
+                pass
+        catalog.deleted(catalog.run_dir(e["run"]) for e in drop)
+
+    for path, st in store.blobs():
+        links = st.st_nlink - (dropped_links.get((st.st_dev, st.st_ino), 0) if dry_run else 0)
+        if links <= 1:
+            stats["blobs"] += 1
+            stats["reclaimed"] += st.st_size
+            if not dry_run:
+                path.unlink(missing_ok=True)
+    stats["seconds"] = time.monotonic() - start
+    return stats
+
+
+def main():
+    project_root = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description="Delete old runs by retention policy and unused blobs")
+    parser.add_argument("--base", default=str(project_root / "generated_slides"), help="generated_slides directory")
+    parser.add_argument("--keep-last", type=int, default=DEFAULT_KEEP_LAST, help=f"Runs to keep per outline (default: {DEFAULT_KEEP_LAST})")
+    parser.add_argument("--no-keep-exported", action="store_true", help="Also delete old runs that were exported to PPTX")
+    parser.add_argument("--pptx-dir", default=str(project_root / "pptx"), help="Where export_pptx.py writes decks (default: pptx/)")
+    parser.add_argument("--dedupe", action="store_true", help="Add every kept run to the blob store first")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted without deleting anything")
+    args = parser.parse_args()
+
+    catalog = RunCatalog(args.base)
+    store = BlobStore(args.base)
+    try:
+        keep, drop = plan(catalog, args.keep_last, not args.no_keep_exported, args.pptx_dir)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.dedupe and args.dry_run:
+        print("Note: --dedupe is skipped with --dry-run.")
+    elif args.dedupe:
+        total = {"files": 0, "bytes": 0, "deduplicated": 0}
+        start = time.monotonic()
+        for entry, _ in keep:
+            for key, value in store.ingest_run(catalog.run_dir(entry["run"])).items():
+                total[key] += value
+        elapsed = time.monotonic() - start
+        print(f"{summary(total)} ({total['bytes'] / 1e6 / elapsed if elapsed > 0 else 0:.0f} MB/s hashed)")
+
+    reasons = {}
+    for _, reason in keep:
+        reasons[reason] = reasons.get(reason, 0) + 1
+    kept = ", ".join(f"{n} {reason}" for reason, n in sorted(reasons.items()))
+    print(f"Keeping {len(keep)} run(s) ({kept or 'none'}); {'would delete' if args.dry_run else 'deleting'} {len(drop)}.")
+    for entry in drop:
+        print(f"  {entry['run']}" + (" (interrupted)" if entry.get("status") == "interrupted" else ""))
+
+    stats = collect(catalog, store, drop, dry_run=args.dry_run)
+    rate = stats["files"] / stats["seconds"] if stats["seconds"] > 0 else 0
+    print(
+        f"{'Would reclaim' if args.dry_run else 'Reclaimed'} {stats['reclaimed'] / 1e6:.1f} MB from {stats['runs']} run(s) "
+        f"({stats['files']} file(s)) and {stats['blobs']} unused blob(s) in {stats['seconds']:.2f} s ({rate:.0f} files/s)."
+    )
+    after = store.stats()
+    print(
+        f"Blob store: {after['blobs']} blob(s), {after['stored'] / 1e6:.1f} MB stored for "
+        f"{after['referenced'] / 1e6:.1f} MB of linked files ({after['saved'] / 1e6:.1f} MB saved by deduplication)."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Checkpoint journal for resumable generation runs.
+
+While a run is in progress, <run-dir>/journal.jsonl is appended to (and synced)
+as each step completes:
+
+  {"event": "run", "outline": ..., "style_pack": ..., "mode": ..., "backend": ..., "tier": {...}}
+  {"event": "slide", "number": 3, "ok": true, "doc_hash": ..., "prompt_hash": ..., "files": [...]}
+  {"event": "slide", "number": 4, "ok": false, "error": ...}
+  {"event": "enlarged", "number": 3, "file": "slide_03_0_4k.jpg"}
+
+`generate_slides.py --resume <run-dir>` replays it to find the slides that are
+already done, and re-renders only those that are missing, failed, changed or
+whose image no longer decodes. Unlike manifest.json, which is written once at
+the end, the journal survives the run being killed part-way.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+from PIL import Image
+
+JOURNAL_NAME = "journal.jsonl"
+
+
+class RunJournal:
+    """Append-only, thread-safe writer for <run-dir>/journal.jsonl."""
+
+    def __init__(self, run_dir: Path):
+        self.path = Path(run_dir) / JOURNAL_NAME
+        self._lock = threading.Lock()
+
+    def _append(self, record: dict) -> None:
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def start(self, outline_path, style_pack: str, mode: str, backend: str = "gemini", tier: dict = None) -> None:
+        record = {"event": "run", "outline": str(outline_path), "style_pack": style_pack, "mode": mode, "backend": backend}
+        if tier is not None:
+            record["tier"] = tier
+        self._append(record)
+
+    def done(self, number: int, entry: dict) -> None:
+        """Record a finished slide; entry is its run manifest entry (doc_hash, prompt_hash, files)."""
+        self._append(dict(entry, event="slide", number=number, ok=True))
+
+    def failed(self, number: int, error) -> None:
+        self._append({"event": "slide", "number": number, "ok": False, "error": error})
+
+    def enlarged(self, number: int, output_path) -> None:
+        self._append({"event": "enlarged", "number": number, "file": Path(output_path).name})
+
+
+def load_journal(run_dir: Path):
+    """
+    Replay run_dir's journal. Returns (run_record, slides) where slides maps slide
+    number -> the latest successful slide record (with any 4K file appended to
+    its files), or (None, {}) if there is no journal.
+    A truncated last line (the process died mid-write) is ignored.
+    """
+    path = Path(run_dir) / JOURNAL_NAME
+    if not path.exists():
+        return None, {}
+    run_record = None
+    slides = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            event = record.get("event")
+            if event == "run":
+                run_record = record
+            elif event == "slide":
+                if record.get("ok"):
+                    slides[record["number"]] = record
+                else:
+                    slides.pop(record["number"], None)
+            elif event == "enlarged" and record.get("number") in slides:
+                files = slides[record["number"]]["files"]
+                if record["file"] not in files:
+                    files.append(record["file"])
+    return run_record, slides
+
+
+def image_ok(path: Path) -> bool:
+    """True if path is a non-empty image that Pillow can decode completely."""
+    try:
+        if Path(path).stat().st_size == 0:
+            return False
+        with Image.open(path) as im:
+            im.load()
+        return True
+    except Exception:
+        return False
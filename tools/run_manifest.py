@@ -0,0 +1,98 @@
+"""
+Per-run manifest used for incremental regeneration.
+
+Every generation run writes <run-dir>/manifest.json recording, per slide number,
+a hash of the normalized YAML document, the prompt hash (see
+render_cache.render_key) and the output files. An --incremental run compares the
+freshly parsed outline against the latest manifest for the same outline and only
+regenerates slides whose inputs changed.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from render_cache import link_or_copy
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def doc_hash(doc) -> str:
+    """Hash a parsed YAML slide document independent of key order and formatting."""
+    normalized = json.dumps(doc, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def write_manifest(
+    run_dir: Path, outline_path: Path, style_pack: str, mode: str, entries: dict, backend: str = "gemini", tier: str = "full"
+) -> Path:
+    """
+    Write manifest.json for run_dir. entries maps slide number -> {doc_hash, prompt_hash, files},
+    plus model and image_size for slides promoted from a preview run.
+    """
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "outline": str(outline_path),
+        "style_pack": style_pack,
+        "mode": mode,
+        "backend": backend,
+        "tier": tier,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "slides": {str(num): entries[num] for num in sorted(entries)},
+    }
+    path = Path(run_dir) / MANIFEST_NAME
+    # Atomic: a manifest means the run finished, so it must never be seen half-written.
+    tmp = path.with_name(f".{MANIFEST_NAME}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def load_manifest(run_dir: Path):
+    """Return the parsed manifest for run_dir, or None if missing/unreadable."""
+    path = Path(run_dir) / MANIFEST_NAME
+    if not path.exists():
+        return None
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def latest_manifest(outline_dir: Path, exclude: Path = None, backend: str = "gemini", tier: str = "full"):
+    """
+    Find the newest run under generated_slides/<yaml-stem>/ that has a manifest
+    written by backend at tier (draft and preview runs are skipped when looking
+    for full-quality Gemini renders).
+    Run directories are timestamped, so name order is chronological.
+    Returns (run_dir, manifest) or (None, None).
+    """
+    outline_dir = Path(outline_dir)
+    if not outline_dir.is_dir():
+        return None, None
+    for run_dir in sorted((p for p in outline_dir.iterdir() if p.is_dir()), reverse=True):
+        if exclude is not None and run_dir.resolve() == Path(exclude).resolve():
+            continue
+        manifest = load_manifest(run_dir)
+        if manifest is None:
+            continue
+        if manifest.get("backend", "gemini") == backend and manifest.get("tier", "full") == tier:
+            return run_dir, manifest
+    return None, None
+
+
+def reuse_entry(prev_run_dir: Path, entry: dict, output_dir: Path) -> bool:
+    """Hard-link an unchanged slide's files from a previous run; False if any are missing."""
+    files = entry.get("files") or []
+    sources = [Path(prev_run_dir) / name for name in files]
+    if not sources or not all(src.is_file() for src in sources):
+        return False
+    for src in sources:
+        link_or_copy(src, Path(output_dir) / src.name)
+    return True
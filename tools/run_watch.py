@@ -0,0 +1,365 @@
+"""
+Live-reload file watcher for start-server.py, scoped to the active run.
+
+livereload's default Watcher re-globs every watched pattern every 0.8 s, so
+watching generated_slides/**/* costs time in proportion to every image of every
+past run. RunWatcher plugs into livereload.Server(watcher=...) instead and only
+watches:
+
+  - the patterns passed to server.watch() (site files, the outline),
+  - the top level of generated_slides/ and of each generated_slides/<yaml-stem>/,
+    just to notice new runs being created,
+  - the files of the active run (the latest one, or a pinned one). When a new
+    run directory appears, the watch moves to it.
+
+On Linux it uses inotify (through ctypes, no extra dependency), so an idle
+server does no work at all; elsewhere it falls back to polling that small set
+of directories. Bursts of writes (many slides finishing at once) are debounced
+into one reload, and every reload reports how long after the first write it
+was sent.
+
+Browsers showing an in-progress run gallery can also subscribe() to a run
+directory (see run_events): each new status.json there is handed to them at
+once, and, while anyone is subscribed, the run's other writes (images,
+journal, index.html) no longer reload every page; the gallery patches itself
+instead. status.json never triggers a reload.
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+
+from livereload.watcher import Watcher
+from tornado import ioloop
+
+from run_catalog import RunCatalog
+from run_gallery import STATUS_NAME
+
+DEBOUNCE = 0.3  # seconds of quiet before a reload is sent
+MAX_WAIT = 2.0  # ...but never hold a reload longer than this during a steady stream of writes
+POLL_INTERVAL = 1.0
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+# Writes are seen once they are complete (close, or an atomic rename into place), not per chunk.
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+_EVENT = struct.Struct("iIII")
+
+
+class _Inotify:
+    """Minimal inotify binding: watch directories, read (directory, name, is_dir) events."""
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}  # watch descriptor -> directory
+
+    def add(self, directory: str) -> None:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self._dirs[wd] = directory
+
+    def remove(self, directory: str) -> None:
+        for wd, watched in list(self._dirs.items()):
+            if watched == directory:
+                self._libc.inotify_rm_watch(self.fd, wd)
+                del self._dirs[wd]
+
+    def read(self) -> list:
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            name = data[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0")
+            offset += _EVENT.size + length
+            directory = self._dirs.get(wd)
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+            if directory is not None and name:
+                events.append((directory, os.fsdecode(name), bool(mask & IN_ISDIR)))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class _Poller:
+    """Polling fallback with the same interface as _Inotify; read() diffs directory snapshots."""
+
+    def __init__(self, watcher):
+        self._watcher = watcher
+        self._snapshots = {}  # directory -> (directory mtime, {name: (mtime_ns, size, is_dir)})
+
+    def _scan(self, directory: str):
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+            previous = self._snapshots.get(directory)
+            # Directories with no file patterns (the per-outline run lists) only need
+            # checking for new entries, which always bump the directory's own mtime.
+            if previous is not None and previous[0] == mtime and not self._watcher._patterns.get(directory):
+                return previous
+            entries = {}
+            with os.scandir(directory) as it:
+                for entry in it:
+                    is_dir = entry.is_dir()
+                    if is_dir or self._watcher._matches(directory, entry.name):
+                        st = entry.stat()
+                        entries[entry.name] = (st.st_mtime_ns, st.st_size, is_dir)
+            return mtime, entries
+        except OSError:
+            return None
+
+    def add(self, directory: str) -> None:
+        self._snapshots[directory] = self._scan(directory) or (0, {})
+
+    def remove(self, directory: str) -> None:
+        self._snapshots.pop(directory, None)
+
+    def read(self) -> list:
+        events = []
+        for directory, (_, before) in list(self._snapshots.items()):
+            snapshot = self._scan(directory)
+            if snapshot is None:
+                continue
+            self._snapshots[directory] = snapshot
+            after = snapshot[1]
+            for name in sorted(after.keys() | before.keys()):
+                if after.get(name) == before.get(name):
+                    continue
+                is_dir = (after.get(name) or before.get(name))[2]
+                # As with inotify, only newly created subdirectories are reported.
+                if is_dir and (name in before or name not in after):
+                    continue
+                events.append((directory, name, is_dir))
+        return events
+
+    def close(self) -> None:
+        self._snapshots.clear()
+
+
+def _split_pattern(path: str):
+    """Split a livereload watch path into (base directory, file pattern, recursive)."""
+    if os.path.isdir(path):
+        return os.path.normpath(path), "*", True
+    head, tail = os.path.split(path)
+    if "**" in head:
+        return os.path.normpath(head.split("**")[0] or "."), tail, True
+    return os.path.normpath(head or "."), tail, False
+
+
+def latest_run(runs_base: Path):
+    """Newest run directory under runs_base (generated_slides/), from the run catalog; or None."""
+    return RunCatalog(runs_base).latest() if Path(runs_base).is_dir() else None
+
+
+class RunWatcher(Watcher):
+    """
+    livereload Watcher that is told about changes (inotify, or polling as a fallback)
+    instead of re-globbing every pattern, and that follows the active run directory.
+    """
+
+    def __init__(self, debounce: float = DEBOUNCE, max_wait: float = MAX_WAIT, use_inotify: bool = True, log=print):
+        super().__init__()
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.log = log
+        self.active_run = None
+        self.backend = "polling"
+        self._use_inotify = use_inotify and sys.platform.startswith("linux")
+        self._source = None
+        self._patterns = {}  # directory -> set of file patterns
+        self._recursive = {}  # base directory -> file patterns, applied to its subdirectories too
+        self._runs_base = None
+        self._pinned = False
+        self._callback = None
+        self._loop = None
+        self._pending = []  # (path, detected at) since the last reload
+        self._flush_handle = None
+        self._subscribers = {}  # run directory -> callbacks for its status.json
+
+    # -- registration --------------------------------------------------------
+
+    def watch(self, path, func=None, delay=None, ignore=None):
+        """Watch a file, directory or glob pattern ('js/**/*.js'); func and ignore are not supported."""
+        base, pattern, recursive = _split_pattern(path)
+        if recursive:
+            self._recursive.setdefault(base, set()).add(pattern)
+            for directory, dirs, _ in os.walk(base):
+                dirs[:] = [d for d in dirs if not d.startswith(".")]
+                self._add_dir(directory, {pattern})
+        else:
+            self._add_dir(base, {pattern})
+        self._tasks[path] = {"func": None, "delay": delay, "ignore": None, "mtimes": {}}
+
+    def watch_runs(self, runs_base, run_dir=None) -> None:
+        """
+        Watch the active run under runs_base (generated_slides/): run_dir if given,
+        otherwise the latest run, switching to each new run as it is created.
+        """
+        self._runs_base = os.path.normpath(runs_base)
+        self._pinned = run_dir is not None
+        base = Path(self._runs_base)
+        base.mkdir(exist_ok=True)
+        # Files directly in generated_slides/ (older runs wrote there), and new outline directories.
+        self._add_dir(self._runs_base, {"*"})
+        for stem in base.iterdir():
+            if stem.is_dir() and not stem.name.startswith("."):
+                self._add_dir(str(stem), set())
+        run = Path(run_dir) if run_dir is not None else latest_run(base)
+        if run is not None:
+            self._switch_run(os.path.normpath(run))
+
+    def _add_dir(self, directory: str, patterns: set) -> None:
+        new = directory not in self._patterns
+        self._patterns.setdefault(directory, set()).update(patterns)
+        if new and self._source is not None:
+            try:
+                self._source.add(directory)
+            except OSError as e:
+                self.log(f"Watch: cannot watch {directory}: {e}")
+
+    def _remove_dir(self, directory: str) -> None:
+        self._patterns.pop(directory, None)
+        if self._source is not None:
+            self._source.remove(directory)
+
+    def _switch_run(self, run_dir: str) -> None:
+        if run_dir == self.active_run:
+            return
+        if self.active_run is not None:
+            if self.active_run in self._subscribers:
+                self._patterns[self.active_run] = {STATUS_NAME}
+            else:
+                self._remove_dir(self.active_run)
+        self.active_run = run_dir
+        self._add_dir(run_dir, {"*"})
+        self.log(f"Watch: following run {run_dir}")
+
+    def subscribe(self, run_dir: str, callback) -> None:
+        """Call callback(path) whenever run_dir's status.json is written (run_dir need not be the active run)."""
+        self._subscribers.setdefault(run_dir, set()).add(callback)
+        self._add_dir(run_dir, {STATUS_NAME})
+
+    def unsubscribe(self, run_dir: str, callback) -> None:
+        callbacks = self._subscribers.get(run_dir, set())
+        callbacks.discard(callback)
+        if not callbacks:
+            self._subscribers.pop(run_dir, None)
+            if run_dir != self.active_run:
+                self._remove_dir(run_dir)
+
+    def _matches(self, directory: str, name: str) -> bool:
+        if name.startswith(".") or self.ignore(name):
+            return False
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self._patterns.get(directory, ()))
+
+    # -- livereload Watcher interface ----------------------------------------
+
+    def start(self, callback):
+        """Start delivering changes; always event-driven from livereload's point of view."""
+        self._callback = callback
+        self._loop = ioloop.IOLoop.current()
+        if self._use_inotify:
+            try:
+                self._source = _Inotify()
+                self.backend = "inotify"
+            except (OSError, AttributeError) as e:
+                self.log(f"Watch: inotify unavailable ({e}); polling every {POLL_INTERVAL:g} s instead.")
+        if self._source is None:
+            self._source = _Poller(self)
+        for directory in list(self._patterns):
+            try:
+                self._source.add(directory)
+            except OSError as e:
+                self.log(f"Watch: cannot watch {directory}: {e}")
+        if self.backend == "inotify":
+            self._loop.add_handler(self._source.fd, lambda fd, events: self._on_events(), ioloop.IOLoop.READ)
+        else:
+            ioloop.PeriodicCallback(self._on_events, POLL_INTERVAL * 1000).start()
+        self.log(f"Watch: {len(self._patterns)} director(ies) via {self.backend}.")
+        # Deliver the server's own pending '__livereload__' reload.
+        callback()
+        return True
+
+    def examine(self):
+        if self._changes:
+            return self._changes.pop()
+        return None, None
+
+    # -- change handling -----------------------------------------------------
+
+    def _on_events(self) -> None:
+        now = time.monotonic()
+        for directory, name, is_dir in self._source.read():
+            path = os.path.join(directory, name)
+            if is_dir:
+                self._on_new_dir(directory, path)
+            elif name == STATUS_NAME:
+                for callback in list(self._subscribers.get(directory, ())):
+                    callback(path)
+            elif directory in self._subscribers:
+                # A gallery page is following this run and patches itself from status.json.
+                continue
+            elif self._matches(directory, name):
+                self._pending.append((path, now))
+        if self._pending:
+            self._schedule_flush(now)
+
+    def _on_new_dir(self, parent: str, path: str) -> None:
+        if not os.path.isdir(path) or os.path.basename(path).startswith("."):
+            return
+        if parent == self._runs_base:
+            self._add_dir(path, set())
+        elif self._runs_base is not None and os.path.dirname(parent) == self._runs_base:
+            if not self._pinned:
+                self._switch_run(path)
+        else:
+            for base, patterns in self._recursive.items():
+                if parent == base or parent.startswith(base.rstrip(os.sep) + os.sep):
+                    self._add_dir(path, patterns)
+
+    def _schedule_flush(self, now: float) -> None:
+        deadline = min(now + self.debounce, self._pending[0][1] + self.max_wait)
+        if self._flush_handle is not None:
+            self._loop.remove_timeout(self._flush_handle)
+        self._flush_handle = self._loop.call_later(max(0.0, deadline - now), self._flush)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        path, first = pending[-1][0], pending[0][1]
+        # For files that still exist, count from the write itself (this includes polling delay).
+        written = [os.path.getmtime(p) for p, _ in pending if os.path.exists(p)]
+        since_write = time.time() - min(written) if written else None
+        paths = {p for p, _ in pending}
+        report = f"Reload: {len(paths)} changed file(s), latest {path}; sent {time.monotonic() - first:.2f} s after the first event"
+        if since_write is not None:
+            report += f", {since_write:.2f} s after the first write"
+        self.log(report + ".")
+        self.filepath = path
+        self._changes.append((path, None))
+        self._callback()
@@ -0,0 +1,320 @@
+"""
+Rate-limit-aware scheduler for image model calls.
+
+Sits in front of gemini_generate_image.generate / generate_async (and enlarge):
+
+- paces request starts with a requests-per-minute token bucket,
+- retries transient failures (429/5xx, dropped connections) with jittered
+  exponential backoff,
+- adapts how many calls may be in flight with AIMD: the limit grows by roughly
+  one slot per window of fast successes and is cut multiplicatively when the
+  API throttles us.
+
+The same Scheduler instance can be used from worker threads (call) or from an
+asyncio event loop (call_async). Controller decisions are printed with a
+"[scheduler]" prefix.
+"""
+
+import asyncio
+import random
+import re
+import threading
+import time
+from collections import deque
+
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+THROTTLE_STATUS = {429, 503}
+# Status texts, or 429/503 where they are plainly a status code: bare digits also turn up
+# in slide numbers, byte counts and request ids.
+THROTTLE_PATTERN = re.compile(
+    r"\bRESOURCE_EXHAUSTED\b|\bUNAVAILABLE\b"
+    r"|(?i:too many requests|service unavailable|rate limit|quota)"
+    r"|(?i:\b(?:http|status|status_code|code|error)\b[\s:=]*)(?:429|503)\b"
+)
+
+
+def _status_code(exc):
+    for attr in ("code", "status_code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def classify_error(exc) -> str:
+    """Return 'throttle', 'transient' or 'fatal' for an exception raised by a model call."""
+    code = _status_code(exc)
+    if code in THROTTLE_STATUS:
+        return "throttle"
+    if code in TRANSIENT_STATUS:
+        return "transient"
+    message = str(exc)
+    if THROTTLE_PATTERN.search(message):
+        return "throttle"
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return "transient"
+    return "fatal"
+
+
+class TokenBucket:
+    """Thread-safe token bucket; reserve() returns how long the caller must wait before starting."""
+
+    def __init__(self, rate_per_minute, burst=None):
+        self.rate = rate_per_minute / 60.0 if rate_per_minute else None
+        self.capacity = float(burst or 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.rate is None:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1.0
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class FairQueue:
+    """
+    Thread-safe round-robin queue over several job sources (e.g. one per deck).
+    get() takes the next job from the next source that still has work, so one
+    large source cannot starve the others of request slots.
+    """
+
+    def __init__(self):
+        self._queues = {}
+        self._order = deque()
+        self._lock = threading.Lock()
+
+    def put(self, key, item) -> None:
+        with self._lock:
+            if key not in self._queues:
+                self._queues[key] = deque()
+                self._order.append(key)
+            self._queues[key].append(item)
+
+    def get(self):
+        """Return (key, item) for the next job, or None when every source is empty."""
+        with self._lock:
+            if not self._order:
+                return None
+            key = self._order.popleft()
+            queue = self._queues[key]
+            item = queue.popleft()
+            if queue:
+                self._order.append(key)
+            else:
+                del self._queues[key]
+            return key, item
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(q) for q in self._queues.values())
+
+
+class _AsyncWaiter:
+    """A coroutine waiting in Scheduler._acquire_async; granted is set (under the lock) with its slot."""
+
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+
+
+def _wake(future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class Scheduler:
+    def __init__(
+        self,
+        rpm=None,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        max_retries: int = 5,
+        base_backoff: float = 2.0,
+        max_backoff: float = 60.0,
+        decrease_factor: float = 0.5,
+        latency_slowdown: float = 2.0,
+        log=print,
+        bucket=None,
+    ):
+        # Pass another scheduler's bucket to share one request quota between stages.
+        self.bucket = bucket if bucket is not None else TokenBucket(rpm)
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.limit = float(min(max(initial_concurrency, self.min_concurrency), self.max_concurrency))
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.decrease_factor = decrease_factor
+        self.latency_slowdown = latency_slowdown
+        self.log = log
+
+        self.in_flight = 0
+        self.calls = 0
+        self.retries = 0
+        self.throttled = 0
+        self.failures = 0
+        self.peak_limit = int(self.limit)
+        self._latency_ewma = None
+        self._latency_floor = None
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._waiters = deque()  # _AsyncWaiter, oldest first
+
+    # -- AIMD controller -------------------------------------------------
+
+    def _current_limit(self) -> int:
+        return max(self.min_concurrency, int(self.limit))
+
+    def _on_success(self, latency: float) -> None:
+        with self._lock:
+            self._latency_ewma = latency if self._latency_ewma is None else 0.8 * self._latency_ewma + 0.2 * latency
+            if self._latency_floor is None or self._latency_ewma < self._latency_floor:
+                self._latency_floor = self._latency_ewma
+            if self._latency_ewma > self.latency_slowdown * self._latency_floor:
+                # Latency is climbing without explicit throttling: hold the limit.
+                return
+            before = self._current_limit()
+            self.limit = min(self.max_concurrency, self.limit + 1.0 / self.limit)
+            after = self._current_limit()
+            self.peak_limit = max(self.peak_limit, after)
+            if after != before:
+                self._grant_waiters()
+                self._slot_freed.notify_all()
+        if after != before:
+            self.log(f"[scheduler] increase concurrency {before} -> {after} (latency {self._latency_ewma:.2f}s)")
+
+    def _on_throttle(self, reason: str) -> None:
+        with self._lock:
+            self.throttled += 1
+            now = time.monotonic()
+            # A burst of 429s from requests already in flight counts as one congestion signal.
+            if now - self._last_decrease < (self._latency_ewma or self.base_backoff):
+                return
+            self._last_decrease = now
+            before = self._current_limit()
+            self.limit = max(float(self.min_concurrency), self.limit * self.decrease_factor)
+            after = self._current_limit()
+        self.log(f"[scheduler] throttled ({reason}); decrease concurrency {before} -> {after}")
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(cap, base * 2^attempt)].
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+
+    def _handle_failure(self, exc, attempt: int, label: str):
+        """Return the delay before retrying, or re-raise if the error is fatal or retries are exhausted."""
+        kind = classify_error(exc)
+        if kind == "throttle":
+            self._on_throttle(f"{label}: {exc}")
+        if kind == "fatal" or attempt >= self.max_retries:
+            with self._lock:
+                self.failures += 1
+            raise exc
+        delay = self._backoff(attempt)
+        with self._lock:
+            self.retries += 1
+        self.log(f"[scheduler] {label}: {kind} error, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s ({exc})")
+        return delay
+
+    # -- Thread API ------------------------------------------------------
+
+    def _acquire(self) -> None:
+        with self._slot_freed:
+            while self.in_flight >= self._current_limit():
+                self._slot_freed.wait()
+            self.in_flight += 1
+            self.calls += 1
+
+    def _release(self) -> None:
+        with self._slot_freed:
+            self.in_flight -= 1
+            self._grant_waiters()
+            self._slot_freed.notify_all()
+
+    def _grant_waiters(self) -> None:
+        """Hand free slots to waiting coroutines, oldest first (the caller holds the lock)."""
+        while self._waiters and self.in_flight < self._current_limit():
+            waiter = self._waiters.popleft()
+            try:
+                waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+            except RuntimeError:
+                continue  # its event loop has been closed
+            waiter.granted = True
+            self.in_flight += 1
+            self.calls += 1
+
+    def call(self, fn, *args, label: str = "request", **kwargs):
+        """Run fn(*args, **kwargs) under pacing, adaptive concurrency and retries."""
+        attempt = 0
+        while True:
+            self._acquire()
+            try:
+                time.sleep(self.bucket.reserve())
+                start = time.monotonic()
+                result = fn(*args, **kwargs)
+                self._on_success(time.monotonic() - start)
+                return result
+            except Exception as e:
+                error = e
+            finally:
+                self._release()
+            time.sleep(self._handle_failure(error, attempt, label))
+            attempt += 1
+
+    # -- asyncio API -----------------------------------------------------
+
+    async def _acquire_async(self) -> None:
+        # Waiters are woken by _release (from any thread or loop) in FIFO order, not by polling.
+        with self._lock:
+            if not self._waiters and self.in_flight < self._current_limit():
+                self.in_flight += 1
+                self.calls += 1
+                return
+            waiter = _AsyncWaiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+            if granted:
+                self._release()  # the slot arrived as we were cancelled: pass it on
+            raise
+
+    async def call_async(self, fn, *args, label: str = "request", **kwargs):
+        """Await fn(*args, **kwargs) under pacing, adaptive concurrency and retries."""
+        attempt = 0
+        while True:
+            await self._acquire_async()
+            try:
+                await asyncio.sleep(self.bucket.reserve())
+                start = time.monotonic()
+                result = await fn(*args, **kwargs)
+                self._on_success(time.monotonic() - start)
+                return result
+            except Exception as e:
+                error = e
+            finally:
+                self._release()
+            await asyncio.sleep(self._handle_failure(error, attempt, label))
+            attempt += 1
+
+    def summary(self) -> str:
+        return (
+            f"Scheduler: {self.calls} call(s), {self.retries} retry(ies), {self.throttled} throttled, "
+            f"{self.failures} failed; concurrency now {self._current_limit()} (peak {self.peak_limit})"
+        )